@@ -0,0 +1,33 @@
+"""add keyset pagination indexes"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_orders_created_at_id", "orders", ["created_at", "id"]),
+    ("ix_orders_partner_id_created_at_id", "orders", ["partner_id", "created_at", "id"]),
+    ("ix_partners_created_at_id", "partners", ["created_at", "id"]),
+    ("ix_products_created_at_id", "products", ["created_at", "id"]),
+    ("ix_accounts_created_at_id", "accounts", ["created_at", "id"]),
+    ("ix_financial_transactions_created_at_id", "financial_transactions", ["created_at", "id"]),
+    (
+        "ix_financial_transactions_account_id_created_at_id",
+        "financial_transactions",
+        ["account_id", "created_at", "id"],
+    ),
+    ("ix_production_jobs_created_at_id", "production_jobs", ["created_at", "id"]),
+    ("ix_production_jobs_status_created_at_id", "production_jobs", ["status", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""notify on production station change"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Workers cache the station list; any change, however it is made, tells them to reload.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_station_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('station_changed', COALESCE(NEW.code, OLD.code));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_production_stations_notify
+        AFTER INSERT OR UPDATE OR DELETE ON production_stations
+        FOR EACH ROW EXECUTE FUNCTION notify_station_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_production_stations_notify ON production_stations")
+    op.execute("DROP FUNCTION IF EXISTS notify_station_changed()")
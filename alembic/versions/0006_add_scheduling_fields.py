@@ -0,0 +1,46 @@
+"""add scheduling fields and notify on production job change"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "production_stations",
+        sa.Column("capacity_per_hour", sa.Integer(), server_default="60", nullable=False),
+    )
+    op.add_column("production_jobs", sa.Column("due_date", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "production_jobs",
+        sa.Column("priority", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Workers keep the production schedule in memory and refresh only the jobs named here.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_production_job_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('production_job_changed', COALESCE(NEW.id, OLD.id)::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_production_jobs_notify
+        AFTER INSERT OR UPDATE OR DELETE ON production_jobs
+        FOR EACH ROW EXECUTE FUNCTION notify_production_job_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_production_jobs_notify ON production_jobs")
+    op.execute("DROP FUNCTION IF EXISTS notify_production_job_changed()")
+    op.drop_column("production_jobs", "priority")
+    op.drop_column("production_jobs", "due_date")
+    op.drop_column("production_stations", "capacity_per_hour")
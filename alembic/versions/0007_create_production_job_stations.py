@@ -0,0 +1,49 @@
+"""create per-station production job counters"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "production_job_stations",
+        sa.Column(
+            "job_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("production_jobs.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column(
+            "station_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("production_stations.id"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("quantity_produced", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.execute(
+        """
+        INSERT INTO production_job_stations (job_id, station_id, quantity_produced)
+        SELECT job_id, station_id, SUM(quantity)
+        FROM production_logs
+        GROUP BY job_id, station_id
+        """
+    )
+    op.create_index(
+        "ix_production_logs_job_id_created_at_id",
+        "production_logs",
+        ["job_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_production_logs_job_id_created_at_id", table_name="production_logs")
+    op.drop_table("production_job_stations")
@@ -0,0 +1,54 @@
+"""create production rollups and index logs by completion time"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+ROLLUPS = {"production_rollups_hourly": "hour", "production_rollups_daily": "day"}
+
+
+def upgrade() -> None:
+    op.create_index("ix_production_logs_completed_at", "production_logs", ["completed_at"])
+    for table, unit in ROLLUPS.items():
+        op.create_table(
+            table,
+            sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+            sa.Column(
+                "station_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("production_stations.id"),
+                primary_key=True,
+                nullable=False,
+            ),
+            sa.Column(
+                "user_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("users.id"),
+                primary_key=True,
+                nullable=False,
+            ),
+            sa.Column("quantity", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("log_count", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("first_completed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("last_completed_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.execute(
+            f"""
+            INSERT INTO {table}
+                (bucket_start, station_id, user_id, quantity, log_count, first_completed_at, last_completed_at)
+            SELECT date_trunc('{unit}', completed_at), station_id, user_id,
+                   SUM(quantity), COUNT(*), MIN(completed_at), MAX(completed_at)
+            FROM production_logs
+            GROUP BY 1, 2, 3
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in ROLLUPS:
+        op.drop_table(table)
+    op.drop_index("ix_production_logs_completed_at", table_name="production_logs")
@@ -0,0 +1,97 @@
+"""partition production logs by month of completed_at"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = """
+    id UUID NOT NULL,
+    job_id UUID NOT NULL REFERENCES production_jobs (id),
+    station_id UUID NOT NULL REFERENCES production_stations (id),
+    user_id UUID NOT NULL REFERENCES users (id),
+    completed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    quantity INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
+
+def _add_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_production_logs_job_id_created_at_id", "production_logs", ["job_id", "created_at", "id"])
+    op.create_index("ix_production_logs_station_id_completed_at", "production_logs", ["station_id", "completed_at"])
+    op.create_index("ix_production_logs_completed_at", "production_logs", ["completed_at"])
+
+
+def _drop_indexes() -> None:
+    op.drop_index("ix_production_logs_completed_at", table_name="production_logs")
+    op.drop_index("ix_production_logs_station_id_completed_at", table_name="production_logs")
+    op.drop_index("ix_production_logs_job_id_created_at_id", table_name="production_logs")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute("ALTER TABLE production_logs RENAME TO production_logs_legacy")
+    op.execute("ALTER TABLE production_logs_legacy DROP CONSTRAINT production_logs_pkey")
+    op.drop_index("ix_production_logs_job_id_created_at_id", table_name="production_logs_legacy")
+    op.drop_index("ix_production_logs_completed_at", table_name="production_logs_legacy")
+
+    # The partition key has to be part of the primary key.
+    op.execute(
+        f"""
+        CREATE TABLE production_logs ({COLUMNS}, PRIMARY KEY (id, completed_at))
+        PARTITION BY RANGE (completed_at)
+        """
+    )
+    oldest = bind.execute(sa.text("SELECT min(completed_at) FROM production_logs_legacy")).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = (oldest.astimezone(timezone.utc).date() if oldest else today).replace(day=1)
+    last = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _add_month(last)
+    while month <= last:
+        following = _add_month(month)
+        op.execute(
+            f"CREATE TABLE production_logs_p{month:%Y_%m} PARTITION OF production_logs "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{following.isoformat()} 00:00+00')"
+        )
+        month = following
+    # Catches rows outside every month partition if maintenance falls behind.
+    op.execute("CREATE TABLE production_logs_default PARTITION OF production_logs DEFAULT")
+
+    op.execute(
+        """
+        INSERT INTO production_logs (id, job_id, station_id, user_id, completed_at, quantity, created_at)
+        SELECT id, job_id, station_id, user_id, completed_at, quantity, created_at
+        FROM production_logs_legacy
+        """
+    )
+    op.execute("DROP TABLE production_logs_legacy")
+    # Declared on the parent, so every partition, present and future, gets its own copy.
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _drop_indexes()
+    op.execute("ALTER TABLE production_logs RENAME TO production_logs_partitioned")
+    op.execute("ALTER TABLE production_logs_partitioned DROP CONSTRAINT production_logs_pkey")
+    op.execute(f"CREATE TABLE production_logs ({COLUMNS}, PRIMARY KEY (id))")
+    op.execute(
+        """
+        INSERT INTO production_logs (id, job_id, station_id, user_id, completed_at, quantity, created_at)
+        SELECT id, job_id, station_id, user_id, completed_at, quantity, created_at
+        FROM production_logs_partitioned
+        """
+    )
+    op.execute("DROP TABLE production_logs_partitioned CASCADE")
+    op.create_index("ix_production_logs_job_id_created_at_id", "production_logs", ["job_id", "created_at", "id"])
+    op.create_index("ix_production_logs_completed_at", "production_logs", ["completed_at"])
@@ -0,0 +1,37 @@
+"""create account balance snapshots"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_balance_snapshots",
+        sa.Column(
+            "account_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("accounts.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("as_of", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        sa.Column("balance", sa.Numeric(14, 2), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    # Snapshots start empty: run ``python -m app.workers.balance_snapshots rebuild`` after upgrading.
+    op.create_index(
+        "ix_financial_transactions_account_id_transaction_date",
+        "financial_transactions",
+        ["account_id", "transaction_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financial_transactions_account_id_transaction_date", table_name="financial_transactions")
+    op.drop_table("account_balance_snapshots")
@@ -0,0 +1,24 @@
+"""add statement line hash to financial transactions"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("financial_transactions", sa.Column("line_hash", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ux_financial_transactions_line_hash",
+        "financial_transactions",
+        ["line_hash"],
+        unique=True,
+        postgresql_where=sa.text("line_hash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_financial_transactions_line_hash", table_name="financial_transactions")
+    op.drop_column("financial_transactions", "line_hash")
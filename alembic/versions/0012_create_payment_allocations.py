@@ -0,0 +1,56 @@
+"""create payment allocations for reconciliation"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_allocations",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column(
+            "transaction_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("financial_transactions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "order_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("orders.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="PROPOSED"),
+        sa.Column("rule", sa.String(length=20), nullable=False),
+        sa.Column("confidence", sa.Numeric(3, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('PROPOSED','ACCEPTED','REJECTED')",
+            name="ck_payment_allocations_status",
+        ),
+        sa.CheckConstraint("amount > 0", name="ck_payment_allocations_amount"),
+    )
+    op.create_index(
+        "ix_payment_allocations_status_created_at_id",
+        "payment_allocations",
+        ["status", "created_at", "id"],
+    )
+    op.create_index("ix_payment_allocations_transaction_id", "payment_allocations", ["transaction_id"])
+    op.create_index("ix_payment_allocations_order_id", "payment_allocations", ["order_id"])
+    # Amounts already paid per order are summed on every reconciliation run.
+    op.create_index("ix_financial_transactions_order_id", "financial_transactions", ["order_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financial_transactions_order_id", table_name="financial_transactions")
+    op.drop_index("ix_payment_allocations_order_id", table_name="payment_allocations")
+    op.drop_index("ix_payment_allocations_transaction_id", table_name="payment_allocations")
+    op.drop_index("ix_payment_allocations_status_created_at_id", table_name="payment_allocations")
+    op.drop_table("payment_allocations")
@@ -0,0 +1,38 @@
+"""notify on changes to orders and incoming payments"""
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+TABLES = ("orders", "financial_transactions", "payment_allocations")
+
+
+def upgrade() -> None:
+    # Workers cache the receivables aging report. One notification per statement keeps
+    # bulk imports cheap; identical notifications in a transaction are delivered once.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_receivables_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('receivables_changed', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_notify_receivables
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_receivables_changed()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_notify_receivables ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_receivables_changed()")
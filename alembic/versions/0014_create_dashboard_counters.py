@@ -0,0 +1,130 @@
+"""create dashboard counters maintained by triggers"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+SHARDS = 16
+
+# Per table: the counter deltas of a set of rows ``r`` whose ``sign`` is 1 for
+# new rows and -1 for old ones.
+DELTAS = {
+    "financial_transactions": """
+        SELECT CASE WHEN r.direction = 'IN' THEN 'revenue:' ELSE 'expense:' END
+                   || to_char(r.transaction_date AT TIME ZONE 'UTC', 'YYYY-MM') AS name,
+               r.sign * r.amount AS delta
+        FROM {rows} r
+        UNION ALL
+        SELECT 'cash_balance', r.sign * CASE WHEN r.direction = 'IN' THEN r.amount ELSE -r.amount END
+        FROM {rows} r
+    """,
+    "orders": """
+        SELECT 'orders:' || r.status AS name, r.sign AS delta FROM {rows} r
+    """,
+    "production_jobs": """
+        SELECT 'jobs:' || r.status AS name, r.sign AS delta FROM {rows} r
+    """,
+}
+
+# Orders reaching delivery today, counted once per transition and never taken back.
+COMPLETED_TODAY = {
+    "INSERT": """
+        SELECT 'orders_completed:' || to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD'), 1
+        FROM new_rows n WHERE n.status = 'TESLIM EDILDI'
+    """,
+    "UPDATE": """
+        SELECT 'orders_completed:' || to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD'), 1
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.status = 'TESLIM EDILDI' AND o.status <> n.status
+    """,
+}
+
+ROWS = {
+    "INSERT": "(SELECT *, 1 AS sign FROM new_rows)",
+    "DELETE": "(SELECT *, -1 AS sign FROM old_rows)",
+    "UPDATE": "(SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 AS sign FROM old_rows)",
+}
+
+REFERENCING = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+}
+
+
+def _apply(deltas: str) -> str:
+    # Each connection writes its own shard, so concurrent writers rarely wait on one row.
+    return f"""
+            INSERT INTO dashboard_counters (name, shard, value)
+            SELECT d.name, pg_backend_pid() % {SHARDS}, SUM(d.delta)
+            FROM ({deltas}) AS d (name, delta)
+            GROUP BY d.name
+            HAVING SUM(d.delta) <> 0
+            ORDER BY d.name
+            ON CONFLICT (name, shard) DO UPDATE SET value = dashboard_counters.value + EXCLUDED.value;
+    """
+
+
+def _function_body(table: str) -> str:
+    branches = []
+    for operation, rows in ROWS.items():
+        deltas = DELTAS[table].format(rows=rows)
+        if table == "orders" and operation in COMPLETED_TODAY:
+            deltas += f" UNION ALL {COMPLETED_TODAY[operation]}"
+        branches.append(f"IF TG_OP = '{operation}' THEN {_apply(deltas)} END IF;")
+    return "\n".join(branches)
+
+
+BACKFILL = """
+    INSERT INTO dashboard_counters (name, shard, value)
+    SELECT name, 0, SUM(delta) FROM (
+        {deltas}
+    ) AS d (name, delta)
+    GROUP BY name
+    HAVING SUM(delta) <> 0
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_counters",
+        sa.Column("name", sa.String(length=100), primary_key=True, nullable=False),
+        sa.Column("shard", sa.SmallInteger(), primary_key=True, nullable=False),
+        sa.Column("value", sa.Numeric(16, 2), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_orders_status_updated_at", "orders", ["status", "updated_at"])
+    for table in DELTAS:
+        op.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION dashboard_count_{table}() RETURNS trigger AS $$
+            BEGIN
+                {_function_body(table)}
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        # A trigger with transition tables can only fire on one event.
+        for operation in ROWS:
+            op.execute(
+                f"""
+                CREATE TRIGGER trg_{table}_dashboard_{operation.lower()}
+                AFTER {operation} ON {table}
+                {REFERENCING[operation]}
+                FOR EACH STATEMENT EXECUTE FUNCTION dashboard_count_{table}()
+                """
+            )
+    for table, deltas in DELTAS.items():
+        op.execute(BACKFILL.format(deltas=deltas.format(rows=f"(SELECT *, 1 AS sign FROM {table})")))
+
+
+def downgrade() -> None:
+    for table in DELTAS:
+        for operation in ROWS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_dashboard_{operation.lower()} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS dashboard_count_{table}()")
+    op.drop_index("ix_orders_status_updated_at", table_name="orders")
+    op.drop_table("dashboard_counters")
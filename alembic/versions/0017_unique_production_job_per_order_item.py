@@ -0,0 +1,26 @@
+"""one production job per order item"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(
+        sa.text("SELECT count(*) FROM (SELECT 1 FROM production_jobs GROUP BY order_item_id HAVING count(*) > 1) d")
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} order items have more than one production job; merge them before upgrading"
+        )
+    # Lets the outbox handler insert with ON CONFLICT DO NOTHING when an event is redelivered.
+    op.create_index(
+        "ux_production_jobs_order_item_id", "production_jobs", ["order_item_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_production_jobs_order_item_id", table_name="production_jobs")
@@ -0,0 +1,56 @@
+"""record when orders are delivered"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True))
+    # Set on the transition itself, so later edits to a delivered order and
+    # Core-level updates that bypass updated_at do not move it.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_order_delivered_at() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status <> 'TESLIM EDILDI' THEN
+                NEW.delivered_at := NULL;
+            ELSIF TG_OP = 'INSERT' THEN
+                NEW.delivered_at := COALESCE(NEW.delivered_at, now());
+            ELSIF OLD.status IS DISTINCT FROM NEW.status THEN
+                NEW.delivered_at := now();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_orders_delivered_at
+        BEFORE INSERT OR UPDATE OF status ON orders
+        FOR EACH ROW EXECUTE FUNCTION set_order_delivered_at()
+        """
+    )
+    # Best guess for orders delivered before the column existed.
+    op.execute(
+        "UPDATE orders SET delivered_at = COALESCE(updated_at, created_at) WHERE status = 'TESLIM EDILDI'"
+    )
+    op.drop_index("ix_orders_status_updated_at", table_name="orders")
+    op.create_index(
+        "ix_orders_delivered_at",
+        "orders",
+        ["delivered_at"],
+        postgresql_where=sa.text("delivered_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_delivered_at", table_name="orders")
+    op.create_index("ix_orders_status_updated_at", "orders", ["status", "updated_at"])
+    op.execute("DROP TRIGGER IF EXISTS trg_orders_delivered_at ON orders")
+    op.execute("DROP FUNCTION IF EXISTS set_order_delivered_at()")
+    op.drop_column("orders", "delivered_at")
@@ -0,0 +1,20 @@
+"""index financial transactions by transaction date"""
+from alembic import op
+
+revision = "0019"
+down_revision = "0018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the transaction export, which ranges and sorts on (transaction_date, id).
+    op.create_index(
+        "ix_financial_transactions_transaction_date_id",
+        "financial_transactions",
+        ["transaction_date", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_financial_transactions_transaction_date_id", table_name="financial_transactions")
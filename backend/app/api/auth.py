@@ -1,23 +1,42 @@
 """Authentication and user management endpoints."""
 
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.passwords import PasswordHasherBusy
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.user import LoginRequest, Token, UserCreate, UserPublic
-from app.services.user_service import authenticate_user, create_user, get_user_by_email
+from app.services.user_service import (
+    Principal,
+    authenticate_user,
+    cached_principal,
+    create_user,
+    get_user_by_email,
+    load_principal,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 SECRET_KEY = "secret"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_SIZE = 10_000
+
+# Verified tokens by SHA-256 digest: (subject, expiry as a Unix timestamp).
+token_cache = TTLCache("access_tokens", max_entries=TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+metrics.register("access_token_cache", token_cache.stats)
 
 
 def get_db():
@@ -35,35 +54,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(OAuth2PasswordBearer(tokenUrl="/api/auth/login")), db: Session = Depends(get_db)) -> User:
+def _token_subject(token: str) -> UUID:
+    """The token's subject, verifying the signature only the first time a token is seen."""
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    try:
+        subject = UUID(payload["sub"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise JWTError("Token has no valid subject") from exc
+    # Never kept past the token's own expiry.
+    token_cache.set(key, (subject, payload.get("exp", 0)))
+    return subject
+
+
+def get_current_user(token: str = Depends(OAuth2PasswordBearer(tokenUrl="/api/auth/login"))) -> Principal:
+    """The authenticated user; cached principals are served without opening a session."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        user_id = _token_subject(token)
     except JWTError as exc:  # pragma: no cover - explicit for clarity
         raise credentials_exception from exc
-    user = db.query(User).get(user_id)
-    if user is None:
+    principal = cached_principal(user_id)
+    if principal is None:
+        db = SessionLocal()
+        try:
+            principal = load_principal(db, user_id)
+        finally:
+            db.close()
+    if principal is None or not principal.is_active:
         raise credentials_exception
-    return user
+    return principal
+
+
+def _busy(exc: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers={"Retry-After": "1"}
+    )
 
 
 @router.post("/register", response_model=UserPublic)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> User:
-    existing = get_user_by_email(db, user_in.email)
+async def register(user_in: UserCreate, db: Session = Depends(get_db)) -> User:
+    existing = await run_in_threadpool(get_user_by_email, db, user_in.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    return create_user(db, user_in)
+    try:
+        return await create_user(db, user_in)
+    except PasswordHasherBusy as exc:
+        raise _busy(exc)
 
 
 @router.post("/login", response_model=Token)
-def login(login_in: LoginRequest, db: Session = Depends(get_db)) -> Token:
-    user = authenticate_user(db, login_in.email, login_in.password)
+async def login(login_in: LoginRequest, db: Session = Depends(get_db)) -> Token:
+    """Password checks run in the hashing pool; 503 with ``Retry-After`` when it is saturated."""
+    try:
+        user = await authenticate_user(db, login_in.email, login_in.password)
+    except PasswordHasherBusy as exc:
+        raise _busy(exc)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
     token = create_access_token({"sub": str(user.id)})
@@ -71,5 +123,5 @@ def login(login_in: LoginRequest, db: Session = Depends(get_db)) -> Token:
 
 
 @router.get("/me", response_model=UserPublic)
-def read_me(current_user: User = Depends(get_current_user)) -> User:
+def read_me(current_user: Principal = Depends(get_current_user)) -> Principal:
     return current_user
@@ -1,26 +1,28 @@
 """Dashboard summary endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.services.dashboard_service import finance_summary, operations_summary
 
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
 
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 @router.get("/finance/summary")
-def finance_summary():
-    return {
-        "revenue": 125000,
-        "expense": 83000,
-        "profit": 42000,
-        "currency": "TRY",
-    }
+def finance_summary_endpoint(db: Session = Depends(get_db)):
+    return finance_summary(db)
 
 
 @router.get("/operations/summary")
-def operations_summary():
-    return {
-        "orders_pending": 7,
-        "orders_in_progress": 12,
-        "orders_completed_today": 5,
-        "stations_active": 2,
-    }
+def operations_summary_endpoint(db: Session = Depends(get_db)):
+    return operations_summary(db)
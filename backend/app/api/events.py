@@ -0,0 +1,51 @@
+"""Server-sent event stream of production and order events."""
+
+import asyncio
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.services.event_service import EVENT_TYPES, broker
+
+HEARTBEAT_SECONDS = 15.0
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    types: str | None = None,
+    job_id: UUID | None = None,
+    station_id: UUID | None = None,
+) -> StreamingResponse:
+    """Push events as they are committed; ``types`` is a comma-separated subset of the event types."""
+    requested = frozenset(types.split(",")) if types else EVENT_TYPES
+    unknown = requested - EVENT_TYPES
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown event types: {', '.join(sorted(unknown))}",
+        )
+    subscription = broker.subscribe(requested, job_id, station_id)
+
+    async def frames():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    frame = ": keep-alive\n\n"
+                yield frame
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
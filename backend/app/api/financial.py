@@ -1,10 +1,13 @@
 """Financial accounts and transactions endpoints."""
 
+from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import AsyncIterator, List, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -16,7 +19,13 @@ from app.schemas.financial import (
     FinancialTransactionCreate,
     FinancialTransactionUpdate,
     FinancialTransactionPublic,
+    PaymentAllocationPublic,
+    ReceivablesAgingReport,
+    ReconciliationReview,
+    ReconciliationRun,
+    StatementImportReport,
 )
+from app.services.export_service import MEDIA_TYPES, stream_export, transactions_export_statement
 from app.services.financial_service import (
     create_account,
     get_account,
@@ -30,6 +39,25 @@ from app.services.financial_service import (
     update_transaction,
     delete_transaction,
     create_payment_for_order,
+    create_payment_for_order_once,
+    create_transaction_once,
+)
+from app.services.idempotency_service import IdempotencyKeyReused, IdempotentResult
+from app.services.ledger_service import balance_as_of
+from app.services.pagination import set_next_cursor
+from app.services.receivables_service import receivables_aging
+from app.services.reconciliation_service import (
+    accept_proposals,
+    list_proposals,
+    review_payment,
+    run_reconciliation,
+)
+from app.services.statement_import_service import (
+    MAX_REPORTED_ERRORS,
+    STATEMENT_BATCH_SIZE,
+    StatementParser,
+    account_exists,
+    import_statement_batch,
 )
 
 router = APIRouter()
@@ -63,8 +91,20 @@ def read_account(account_id: UUID, db: Session = Depends(get_db)) -> AccountPubl
 
 
 @accounts_router.get("/", response_model=List[AccountPublic])
-def list_accounts(page: int = 1, page_size: int = 10, db: Session = Depends(get_db)) -> List[AccountPublic]:
-    return get_accounts(db, page, page_size)
+def list_accounts(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
+    page_size: int = 10,
+    db: Session = Depends(get_db),
+) -> List[AccountPublic]:
+    try:
+        accounts = get_accounts(db, page, page_size, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, accounts, page_size)
+    return accounts
 
 
 @accounts_router.put("/{account_id}", response_model=AccountPublic)
@@ -85,30 +125,136 @@ def delete_account_endpoint(account_id: UUID, db: Session = Depends(get_db)) ->
 
 class BalanceResponse(BaseModel):
     balance: Decimal
+    as_of: datetime | None = None
+    snapshot_as_of: datetime | None = None
+    transactions_scanned: int | None = None
 
 
 @accounts_router.get("/{account_id}/balance", response_model=BalanceResponse)
-def account_balance(account_id: UUID, db: Session = Depends(get_db)) -> BalanceResponse:
+def account_balance(
+    account_id: UUID, as_of: datetime | None = None, db: Session = Depends(get_db)
+) -> BalanceResponse:
+    """Current balance, or with ``as_of`` the balance over transactions dated up to then."""
+    if as_of is not None:
+        result = balance_as_of(db, account_id, as_of)
+        if result is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+        return BalanceResponse(**result)
     balance = get_account_balance(db, account_id)
     if balance is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
     return BalanceResponse(balance=balance)
 
 
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig")
+    if buffer:
+        yield buffer.decode("utf-8-sig")
+
+
+@accounts_router.post("/{account_id}/statements", response_model=StatementImportReport)
+async def import_statement(
+    account_id: UUID,
+    request: Request,
+    fmt: Literal["csv", "mt940"] = Query("csv", alias="format"),
+    db: Session = Depends(get_db),
+) -> StatementImportReport:
+    """Import a CSV or MT940 bank statement streamed in the request body.
+
+    Lines already imported for the account are counted as duplicates and skipped.
+    """
+    if not await run_in_threadpool(account_exists, db, account_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+    parser = StatementParser(fmt, account_id)
+    imported = duplicates = failed = 0
+    errors: list[str] = []
+    pending = []
+
+    def collect(lines, line_errors) -> None:
+        nonlocal failed
+        pending.extend(lines)
+        failed += len(line_errors)
+        errors.extend(line_errors[: MAX_REPORTED_ERRORS - len(errors)])
+
+    async def flush() -> None:
+        nonlocal imported, duplicates
+        batch = pending[:]
+        pending.clear()
+        added, skipped = await run_in_threadpool(import_statement_batch, db, account_id, batch)
+        imported += added
+        duplicates += skipped
+
+    async for line in _iter_lines(request):
+        try:
+            collect(*parser.feed(line))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        if len(pending) >= STATEMENT_BATCH_SIZE:
+            await flush()
+    collect(*parser.finish())
+    if pending:
+        await flush()
+    return StatementImportReport(imported=imported, duplicates=duplicates, failed=failed, errors=errors)
+
+
 # ---------------------------------------------------------------------------
 # Financial transaction endpoints
 # ---------------------------------------------------------------------------
 transactions_router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
 
+IdempotencyKey = Header(
+    None,
+    alias="Idempotency-Key",
+    max_length=255,
+    description="Retries with the same key get the first response instead of a second write.",
+)
+
+
+def _replayable(response: Response, result: IdempotentResult):
+    if result.replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result.body
+
+
 @transactions_router.post("/", response_model=FinancialTransactionPublic)
-def create_transaction_endpoint(transaction_in: FinancialTransactionCreate, db: Session = Depends(get_db)) -> FinancialTransactionPublic:
+def create_transaction_endpoint(
+    transaction_in: FinancialTransactionCreate,
+    response: Response,
+    idempotency_key: str | None = IdempotencyKey,
+    db: Session = Depends(get_db),
+) -> FinancialTransactionPublic:
     try:
+        if idempotency_key:
+            return _replayable(response, create_transaction_once(db, transaction_in, idempotency_key))
         return create_transaction(db, transaction_in)
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
+@transactions_router.get("/export")
+def export_transactions(
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    account_id: UUID | None = None,
+) -> StreamingResponse:
+    """Stream transactions dated in ``[date_from, date_to)``."""
+    statement = transactions_export_statement(date_from, date_to, account_id)
+    return StreamingResponse(
+        stream_export(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{fmt}"'},
+    )
+
+
 @transactions_router.get("/{transaction_id}", response_model=FinancialTransactionPublic)
 def read_transaction(transaction_id: UUID, db: Session = Depends(get_db)) -> FinancialTransactionPublic:
     transaction = get_transaction(db, transaction_id)
@@ -119,13 +265,21 @@ def read_transaction(transaction_id: UUID, db: Session = Depends(get_db)) -> Fin
 
 @transactions_router.get("/", response_model=List[FinancialTransactionPublic])
 def list_transactions_endpoint(
-    page: int = 1,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
     page_size: int = 10,
     account_id: UUID | None = None,
     direction: str | None = None,
     db: Session = Depends(get_db),
 ) -> List[FinancialTransactionPublic]:
-    return list_transactions(db, page, page_size, account_id, direction)
+    try:
+        transactions = list_transactions(db, page, page_size, account_id, direction, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, transactions, page_size)
+    return transactions
 
 
 @transactions_router.put("/{transaction_id}", response_model=FinancialTransactionPublic)
@@ -159,9 +313,23 @@ class OrderPaymentCreate(BaseModel):
 
 @router.post("/api/orders/{order_id}/payments", response_model=FinancialTransactionPublic, tags=["orders"])
 def create_payment_for_order_endpoint(
-    order_id: UUID, payment_in: OrderPaymentCreate, db: Session = Depends(get_db)
+    order_id: UUID,
+    payment_in: OrderPaymentCreate,
+    response: Response,
+    idempotency_key: str | None = IdempotencyKey,
+    db: Session = Depends(get_db),
 ) -> FinancialTransactionPublic:
     try:
+        if idempotency_key:
+            result = create_payment_for_order_once(
+                db,
+                order_id,
+                payment_in.account_id,
+                payment_in.amount,
+                payment_in.description,
+                idempotency_key,
+            )
+            return _replayable(response, result)
         return create_payment_for_order(
             db,
             order_id=order_id,
@@ -169,10 +337,88 @@ def create_payment_for_order_endpoint(
             amount=payment_in.amount,
             description=payment_in.description,
         )
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
 
 
+# ---------------------------------------------------------------------------
+# Reconciliation endpoints
+# ---------------------------------------------------------------------------
+reconciliation_router = APIRouter(prefix="/api/reconciliation", tags=["reconciliation"])
+
+
+@reconciliation_router.post("/runs", response_model=ReconciliationRun)
+def run_reconciliation_endpoint(db: Session = Depends(get_db)) -> ReconciliationRun:
+    """Match unallocated incoming payments to open orders, replacing pending proposals."""
+    return ReconciliationRun(**run_reconciliation(db))
+
+
+@reconciliation_router.get("/proposals", response_model=List[PaymentAllocationPublic])
+def list_proposals_endpoint(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
+    page_size: int = 10,
+    min_confidence: Decimal | None = None,
+    db: Session = Depends(get_db),
+) -> List[PaymentAllocationPublic]:
+    try:
+        proposals = list_proposals(db, page, page_size, cursor, min_confidence)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, proposals, page_size)
+    return proposals
+
+
+@reconciliation_router.post("/proposals/accept", response_model=ReconciliationReview)
+def accept_proposals_endpoint(
+    min_confidence: Decimal = Query(Decimal("0.9"), ge=0, le=1), db: Session = Depends(get_db)
+) -> ReconciliationReview:
+    """Accept every payment whose proposals all reach ``min_confidence``."""
+    return ReconciliationReview(**accept_proposals(db, min_confidence))
+
+
+def _review(db: Session, transaction_id: UUID, accept: bool) -> List[PaymentAllocationPublic]:
+    try:
+        allocations = review_payment(db, transaction_id, accept)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if allocations is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+    return allocations
+
+
+@reconciliation_router.post("/transactions/{transaction_id}/accept", response_model=List[PaymentAllocationPublic])
+def accept_payment_endpoint(transaction_id: UUID, db: Session = Depends(get_db)) -> List[PaymentAllocationPublic]:
+    return _review(db, transaction_id, accept=True)
+
+
+@reconciliation_router.post("/transactions/{transaction_id}/reject", response_model=List[PaymentAllocationPublic])
+def reject_payment_endpoint(transaction_id: UUID, db: Session = Depends(get_db)) -> List[PaymentAllocationPublic]:
+    return _review(db, transaction_id, accept=False)
+
+
+# ---------------------------------------------------------------------------
+# Report endpoints
+# ---------------------------------------------------------------------------
+reports_router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+@reports_router.get("/receivables-aging", response_model=ReceivablesAgingReport)
+def receivables_aging_endpoint(
+    partner_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=100_000),
+    db: Session = Depends(get_db),
+) -> ReceivablesAgingReport:
+    """Amounts due per partner by order age, largest exposure first."""
+    return ReceivablesAgingReport(**receivables_aging(db, partner_id, limit))
+
+
 # Include sub-routers
 router.include_router(accounts_router)
 router.include_router(transactions_router)
+router.include_router(reconciliation_router)
+router.include_router(reports_router)
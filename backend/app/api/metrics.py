@@ -0,0 +1,13 @@
+"""In-process metrics endpoint."""
+
+from fastapi import APIRouter
+
+from app.core import metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/")
+def read_metrics():
+    """Counters of this worker process only; each uvicorn worker answers for itself."""
+    return metrics.snapshot()
@@ -1,13 +1,28 @@
 """Order CRUD endpoints."""
 
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
-from app.schemas.order import OrderCreate, OrderUpdate, OrderPublic, OrderStatus
+from app.schemas.order import (
+    OrderCreate,
+    OrderImportReport,
+    OrderQuote,
+    OrderQuoteRequest,
+    OrderUpdate,
+    OrderPublic,
+    OrderStatus,
+)
+from app.services.export_service import MEDIA_TYPES, orders_export_statement, stream_export
+from app.services.order_import_service import OrderBatcher, OrderLineParser, import_order_batch
+from app.services.pagination import set_next_cursor
+from app.services.pricing_service import quote_order_items
 from app.services.order_service import (
     create_order,
     get_order,
@@ -35,15 +50,99 @@ def create_order_endpoint(order_in: OrderCreate, db: Session = Depends(get_db))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
+@router.post("/quote", response_model=OrderQuote)
+def quote_order(quote_in: OrderQuoteRequest, db: Session = Depends(get_db)) -> OrderQuote:
+    """Price order lines without creating the order or its production jobs."""
+    try:
+        return quote_order_items(db, quote_in.order_items)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig")
+    if buffer:
+        yield buffer.decode("utf-8-sig")
+
+
+@router.post("/bulk", response_model=OrderImportReport)
+async def bulk_import_orders(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] | None = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+) -> OrderImportReport:
+    """Import an NDJSON or CSV order book streamed in the request body."""
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    parser = OrderLineParser(fmt)
+    batcher = OrderBatcher()
+    results = []
+    async for line in _iter_lines(request):
+        expects_header = parser.expects_header
+        try:
+            row = parser.parse(line)
+        except ValueError as exc:
+            if expects_header:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+            batch = batcher.add(None, error=str(exc))
+        else:
+            if row is None:
+                continue
+            batch = batcher.add(row)
+        if batch:
+            results.extend(await run_in_threadpool(import_order_batch, db, batch))
+    try:
+        parser.finish()
+    except ValueError as exc:
+        batch = batcher.add(None, error=str(exc))
+        if batch:
+            results.extend(await run_in_threadpool(import_order_batch, db, batch))
+    batch = batcher.flush()
+    if batch:
+        results.extend(await run_in_threadpool(import_order_batch, db, batch))
+    succeeded = sum(1 for result in results if result.success)
+    return OrderImportReport(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
 @router.get("/", response_model=List[OrderPublic])
 def list_orders(
-    page: int = 1,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
     page_size: int = 10,
     partner_id: UUID | None = None,
-    status: OrderStatus | None = None,
+    status_filter: OrderStatus | None = Query(None, alias="status"),
     db: Session = Depends(get_db),
 ) -> List[OrderPublic]:
-    return get_orders(db, page, page_size, partner_id, status)
+    try:
+        orders = get_orders(db, page, page_size, partner_id, status_filter, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, orders, page_size)
+    return orders
+
+
+@router.get("/export")
+def export_orders(
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    status_filter: OrderStatus | None = Query(None, alias="status"),
+) -> StreamingResponse:
+    """Stream orders with their items, one row per item, created in ``[date_from, date_to)``."""
+    statement = orders_export_statement(date_from, date_to, status_filter)
+    return StreamingResponse(
+        stream_export(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="orders.{fmt}"'},
+    )
 
 
 @router.get("/{order_id}", response_model=OrderPublic)
@@ -3,11 +3,12 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
 from app.schemas.partner import PartnerCreate, PartnerUpdate, PartnerPublic
+from app.services.pagination import set_next_cursor
 from app.services.partner_service import (
     create_partner,
     get_partner,
@@ -44,12 +45,20 @@ def read_partner(partner_id: UUID, db: Session = Depends(get_db)) -> PartnerPubl
 
 @router.get("/", response_model=List[PartnerPublic])
 def list_partners(
-    page: int = 1,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
     page_size: int = 10,
     search_query: str | None = None,
     db: Session = Depends(get_db),
 ) -> List[PartnerPublic]:
-    return get_partners(db, page, page_size, search_query)
+    try:
+        partners = get_partners(db, page, page_size, search_query, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, partners, page_size)
+    return partners
 
 
 @router.put("/{partner_id}", response_model=PartnerPublic)
@@ -1,22 +1,47 @@
 """Production job and log endpoints."""
 
-from typing import List
+from datetime import datetime
+from typing import List, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
 from app.schemas.production import (
+    AnalyticsBucket,
+    CutPlan,
     ProductionJobPublic,
+    ProductionJobUpdate,
+    ProductionLogBatch,
+    ProductionLogBatchResult,
     ProductionLogCreate,
     ProductionLogPublic,
+    StationSchedule,
 )
+from app.services.analytics_service import production_analytics
+from app.services.cutting_service import (
+    DEFAULT_SHEET_HEIGHT,
+    DEFAULT_SHEET_WIDTH,
+    build_cut_plans,
+)
+from app.services.export_service import (
+    MEDIA_TYPES,
+    production_logs_export_statement,
+    stream_export,
+)
+from app.services.outbox_service import outbox_lag
+from app.services.pagination import set_next_cursor
 from app.services.production_service import (
     get_jobs,
     get_job_detail,
+    get_job_logs,
+    log_production_batch,
     log_production_step,
+    update_job,
 )
+from app.services.scheduling_service import production_scheduler
 
 router = APIRouter(prefix="/api/production", tags=["production"])
 
@@ -31,12 +56,66 @@ def get_db():
 
 @router.get("/jobs", response_model=List[ProductionJobPublic])
 def list_jobs(
-    page: int = 1,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
     page_size: int = 10,
-    status: str | None = None,
+    status_filter: str | None = Query(None, alias="status"),
     db: Session = Depends(get_db),
 ) -> List[ProductionJobPublic]:
-    return get_jobs(db, page, page_size, status)
+    try:
+        jobs = get_jobs(db, page, page_size, status_filter, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, jobs, page_size)
+    return jobs
+
+
+@router.get("/cut-plans", response_model=List[CutPlan])
+def list_cut_plans(
+    product_id: UUID | None = None,
+    sheet_width: int = Query(DEFAULT_SHEET_WIDTH, gt=0),
+    sheet_height: int = Query(DEFAULT_SHEET_HEIGHT, gt=0),
+    kerf: int = Query(0, ge=0),
+    allow_rotation: bool = True,
+    db: Session = Depends(get_db),
+) -> List[CutPlan]:
+    """Guillotine cutting plans for pending jobs, one per product."""
+    return build_cut_plans(db, product_id, sheet_width, sheet_height, kerf, allow_rotation)
+
+
+@router.get("/schedule", response_model=List[StationSchedule])
+def read_schedule(
+    station_code: str | None = None,
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+) -> List[StationSchedule]:
+    """Per-station job queues ordered by latest start, with estimated finish times."""
+    return production_scheduler.schedule(db, station_code, limit)
+
+
+@router.get("/analytics", response_model=List[AnalyticsBucket])
+def read_analytics(
+    date_from: datetime,
+    date_to: datetime,
+    granularity: Literal["hour", "day", "week", "month"] = "hour",
+    group_by: Literal["station", "user"] = "station",
+    station_id: UUID | None = None,
+    user_id: UUID | None = None,
+    db: Session = Depends(get_db),
+) -> List[AnalyticsBucket]:
+    """Throughput, cycle time, utilisation and OEE per station or operator, from the rollups."""
+    try:
+        return production_analytics(db, date_from, date_to, granularity, group_by, station_id, user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/outbox")
+def read_outbox_lag(db: Session = Depends(get_db)):
+    """Backlog of deferred job creation: pending events and age of the oldest one."""
+    return outbox_lag(db)
 
 
 @router.get("/jobs/{job_id}", response_model=ProductionJobPublic)
@@ -47,6 +126,34 @@ def read_job(job_id: UUID, db: Session = Depends(get_db)) -> ProductionJobPublic
     return job
 
 
+@router.put("/jobs/{job_id}", response_model=ProductionJobPublic)
+def update_job_endpoint(
+    job_id: UUID, job_in: ProductionJobUpdate, db: Session = Depends(get_db)
+) -> ProductionJobPublic:
+    job = update_job(db, job_id, job_in)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/logs", response_model=List[ProductionLogPublic])
+def list_job_logs(
+    job_id: UUID,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page_size: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> List[ProductionLogPublic]:
+    """Log history of one job, newest first."""
+    try:
+        logs = get_job_logs(db, job_id, page_size, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, logs, page_size)
+    return logs
+
+
 @router.post("/jobs/{job_id}/logs", response_model=ProductionLogPublic)
 def create_log(
     job_id: UUID, log_in: ProductionLogCreate, db: Session = Depends(get_db)
@@ -55,3 +162,30 @@ def create_log(
         return log_production_step(db, job_id, log_in)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.post("/logs/batch", response_model=ProductionLogBatchResult)
+def create_log_batch(
+    batch: ProductionLogBatch, db: Session = Depends(get_db)
+) -> ProductionLogBatchResult:
+    """Apply scans for many jobs at once; either all of them are recorded or none."""
+    try:
+        return log_production_batch(db, batch.logs)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/logs/export")
+def export_production_logs(
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    station_id: UUID | None = None,
+) -> StreamingResponse:
+    """Stream production logs completed in ``[date_from, date_to)``."""
+    statement = production_logs_export_statement(date_from, date_to, station_id)
+    return StreamingResponse(
+        stream_export(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="production_logs.{fmt}"'},
+    )
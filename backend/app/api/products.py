@@ -3,11 +3,12 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
 from app.schemas.product import ProductCreate, ProductUpdate, ProductPublic
+from app.services.pagination import set_next_cursor
 from app.services.product_service import (
     create_product,
     get_product,
@@ -44,12 +45,20 @@ def read_product(product_id: UUID, db: Session = Depends(get_db)) -> ProductPubl
 
 @router.get("/", response_model=List[ProductPublic])
 def list_products(
-    page: int = 1,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    page: int = Query(1, deprecated=True),
     page_size: int = 10,
     search_query: str | None = None,
     db: Session = Depends(get_db),
 ) -> List[ProductPublic]:
-    return get_products(db, page, page_size, search_query)
+    try:
+        products = get_products(db, page, page_size, search_query, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    set_next_cursor(request, response, products, page_size)
+    return products
 
 
 @router.put("/{product_id}", response_model=ProductPublic)
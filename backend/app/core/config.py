@@ -7,6 +7,13 @@ from functools import lru_cache
 class Settings:
     app_env: str
     database_url: str
+    product_cache_ttl_seconds: float = 300.0
+    product_cache_max_entries: int = 10_000
+    principal_cache_ttl_seconds: float = 60.0
+    principal_cache_max_entries: int = 10_000
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
 
 
 @lru_cache
@@ -17,4 +24,11 @@ def get_settings() -> Settings:
     return Settings(
         app_env=os.getenv("APP_ENV", "development"),
         database_url=database_url,
+        product_cache_ttl_seconds=float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "300")),
+        product_cache_max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "10000")),
+        principal_cache_ttl_seconds=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+        principal_cache_max_entries=int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000")),
+        password_hash_rounds=int(os.getenv("PASSWORD_HASH_ROUNDS", "12")),
+        password_hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(max((os.cpu_count() or 2) // 2, 1)))),
+        password_hash_max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
     )
@@ -0,0 +1,14 @@
+"""Registry of in-process counters exposed through ``/api/metrics``."""
+
+from typing import Any, Callable, Dict
+
+_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, source: Callable[[], Dict[str, Any]]) -> None:
+    """Publish ``source()`` under ``name``; it is called on every metrics read."""
+    _sources[name] = source
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: source() for name, source in _sources.items()}
@@ -0,0 +1,155 @@
+"""bcrypt hashing in a dedicated process pool.
+
+bcrypt is slow on purpose, and a login storm at shift change would otherwise
+fill the server's threads with hashing. Hashes run in
+``password_hash_workers`` processes that requests await without holding a
+thread. At most ``password_hash_max_pending`` calls may wait or run at
+once; beyond that ``PasswordHasherBusy`` is raised at once, so callers can
+answer 503 instead of queueing without bound.
+
+Queue time (submission until a worker picks the call up) and run time are
+kept for the last ``TIMING_WINDOW`` calls and published in ``/api/metrics``.
+If a worker dies the pool is replaced and the call retried once.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.hash import bcrypt
+
+from app.core import metrics
+from app.core.config import get_settings
+
+TIMING_WINDOW = 1000
+
+settings = get_settings()
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many hashes are already waiting."""
+
+
+def _hash(password: str, rounds: int) -> Tuple[str, float]:
+    started = time.time()
+    return bcrypt.using(rounds=rounds).hash(password), started
+
+
+def _verify(password: str, hashed: str, rounds: int) -> Tuple[Tuple[bool, bool], float]:
+    started = time.time()
+    valid = bcrypt.verify(password, hashed)
+    return (valid, valid and bcrypt.using(rounds=rounds).needs_update(hashed)), started
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 1)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, rounds: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.completed = 0
+        self.rejected = 0
+        self.peak_pending = 0
+        self.restarts = 0
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue_times: deque = deque(maxlen=TIMING_WINDOW)
+        self._run_times: deque = deque(maxlen=TIMING_WINDOW)
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the server process runs threads (the notification listener).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next ``start`` creates a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another call already replaced it
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Too many logins in progress, try again shortly")
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+        try:
+            for attempt in range(2):
+                executor = self.start()
+                submitted = time.time()
+                try:
+                    result, started = await asyncio.wrap_future(executor.submit(fn, *args))
+                    break
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    if attempt:
+                        raise
+            finished = time.time()
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.completed += 1
+            self._queue_times.append(max(started - submitted, 0.0))
+            self._run_times.append(finished - started)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, bool]:
+        """Whether ``password`` matches, and whether the hash should be redone at the current rounds."""
+        return await self._run(_verify, password, hashed, self.rounds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queue_times = list(self._queue_times)
+            run_times = list(self._run_times)
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "queue_ms_p50": _percentile(queue_times, 0.5),
+                "queue_ms_p99": _percentile(queue_times, 0.99),
+                "run_ms_p50": _percentile(run_times, 0.5),
+                "run_ms_p99": _percentile(run_times, 0.99),
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    rounds=settings.password_hash_rounds,
+)
+metrics.register("password_hashing", password_hasher.stats)
@@ -0,0 +1,140 @@
+"""PostgreSQL LISTEN/NOTIFY helpers that keep per-process state in sync.
+
+Writers call ``notify`` inside their transaction; PostgreSQL delivers the
+message to every listening connection only once the transaction commits.
+Each worker process runs one ``NotificationListener`` thread that holds a
+dedicated psycopg2 connection and dispatches messages to subscribers.
+"""
+
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], None]
+
+
+def notify(db: Session, channel: str, payload: str = "") -> None:
+    """Queue ``payload`` on ``channel``; it is sent when ``db`` commits."""
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def notify_many(db: Session, channel: str, payloads: Iterable[str]) -> None:
+    """Queue every payload on ``channel`` with a single statement."""
+    payloads = list(payloads)
+    if payloads:
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": channel, "payloads": payloads},
+        )
+
+
+class NotificationListener:
+    """Background thread dispatching NOTIFY messages to subscribed handlers.
+
+    ``on_reset`` callbacks run whenever the connection starts listening,
+    because anything may have changed while no connection was listening.
+    """
+
+    def __init__(self, poll_interval: float = 5.0, retry_delay: float = 2.0) -> None:
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.received = 0
+        self.reconnects = 0
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._reset_handlers: List[Callable[[], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connected_once = False
+        self._listening = threading.Event()
+
+    def subscribe(
+        self, channel: str, handler: Handler, on_reset: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._handlers[channel].append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    def start(self) -> None:
+        if self._thread is not None or not self._handlers:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-notify-listener", daemon=True)
+        self._thread.start()
+
+    def wait_until_listening(self, timeout: float) -> bool:
+        """Block until the first LISTEN is in place; ``False`` on timeout."""
+        return self._listening.wait(timeout)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "channels": sorted(self._handlers),
+            "running": self._thread is not None and self._thread.is_alive(),
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:  # pragma: no cover - depends on the database going away
+                logger.exception("Notification listener lost its connection, retrying")
+                self._stop.wait(self.retry_delay)
+
+    def _listen(self) -> None:
+        connection = engine.raw_connection()
+        try:
+            raw = connection.dbapi_connection
+            raw.autocommit = True
+            cursor = raw.cursor()
+            for channel in self._handlers:
+                cursor.execute(f'LISTEN "{channel}"')
+            if self._connected_once:
+                self.reconnects += 1
+            # Also on the first connect: caches warmed before it cannot have
+            # seen the changes made in between.
+            self._reset()
+            self._connected_once = True
+            self._listening.set()
+            while not self._stop.is_set():
+                if select.select([raw], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    message = raw.notifies.pop(0)
+                    self._dispatch(message.channel, message.payload)
+        finally:
+            connection.invalidate()
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        self.received += 1
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Notification handler for %s failed", channel)
+
+    def _reset(self) -> None:
+        for reset in self._reset_handlers:
+            try:
+                reset()
+            except Exception:
+                logger.exception("Notification reset handler failed")
+
+
+listener = NotificationListener()
@@ -0,0 +1,47 @@
+"""Retry whole service transactions that lost a race in the database.
+
+PostgreSQL aborts one side of a deadlock (``40P01``) and, under
+``REPEATABLE READ`` or ``SERIALIZABLE``, transactions whose snapshot went
+stale (``40001``). Both are safe to run again from the start, so service
+functions that take ``db`` first and commit themselves can be wrapped with
+``retry_on_conflict``.
+"""
+
+import functools
+import logging
+import random
+import time
+
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.01
+
+
+def is_retryable(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "pgcode", None) in RETRYABLE_SQLSTATES
+
+
+def retry_on_conflict(fn=None, *, attempts: int = MAX_ATTEMPTS):
+    """Roll back and rerun ``fn(db, ...)`` on serialization failures and deadlocks."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return fn(db, *args, **kwargs)
+                except DBAPIError as exc:
+                    if not is_retryable(exc) or attempt == attempts:
+                        raise
+                    db.rollback()
+                    delay = BASE_DELAY * 2 ** (attempt - 1)
+                    logger.info("%s lost a race (attempt %d), retrying", fn.__name__, attempt)
+                    time.sleep(delay + random.uniform(0, delay))
+
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
@@ -1,5 +1,8 @@
 """FastAPI application entry point."""
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -10,8 +13,50 @@ from app.api.orders import router as orders_router
 from app.api.production import router as production_router
 from app.api.financial import router as financial_router
 from app.api.dashboard import router as dashboard_router
+from app.api.events import router as events_router
+from app.api.metrics import router as metrics_router
+from app.core import metrics
+from app.core.passwords import password_hasher
+from app.db.notify import listener
+from app.db.session import SessionLocal
+from app.services.log_partition_service import ensure_log_partitions
+from app.services.product_service import warm_product_cache
+from app.services.station_registry import station_registry
+
+logger = logging.getLogger(__name__)
+
+LISTENER_STARTUP_TIMEOUT = 10.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Listen before warming caches, so a change committed meanwhile still
+    # invalidates what the warm-up loads.
+    listener.start()
+    if not listener.wait_until_listening(timeout=LISTENER_STARTUP_TIMEOUT):
+        logger.warning("Notification listener not connected yet; warming caches anyway")
+    db = SessionLocal()
+    try:
+        warm_product_cache(db)
+        station_registry.load(db)
+        try:
+            ensure_log_partitions(db)
+        except Exception:
+            # Best effort: the log_partitions cron worker owns this, and a
+            # failure here must not keep the API from starting.
+            db.rollback()
+            logger.exception("Could not create production log partitions at startup")
+    finally:
+        db.close()
+    password_hasher.start()
+    yield
+    password_hasher.shutdown()
+    listener.stop()
+
+
+metrics.register("notifications", listener.stats)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
@@ -21,6 +66,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # List endpoints advertise their next page in these.
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
 app.include_router(auth_router)
@@ -30,3 +77,5 @@ app.include_router(orders_router)
 app.include_router(production_router)
 app.include_router(financial_router)
 app.include_router(dashboard_router)
+app.include_router(events_router)
+app.include_router(metrics_router)
@@ -8,16 +8,25 @@ from .order_item import OrderItem
 from .production_station import ProductionStation
 from .production_job import ProductionJob
 from .production_log import ProductionLog
+from .production_job_station import ProductionJobStation
+from .production_rollup import ProductionRollupDaily, ProductionRollupHourly
 from .material import Material
 from .product import Product
 from .purchase_order import PurchaseOrder
 from .purchase_order_item import PurchaseOrderItem
 from .account import Account
+from .account_balance_snapshot import AccountBalanceSnapshot
 from .financial_transaction import FinancialTransaction
+from .payment_allocation import PaymentAllocation
+from .outbox_event import OutboxEvent
+from .dashboard_counter import DashboardCounter
+from .idempotency_key import IdempotencyKey
 
 __all__ = [
     'Organization', 'User', 'Role', 'Partner', 'Order', 'OrderItem',
-    'ProductionStation', 'ProductionJob', 'ProductionLog', 'Material',
-    'Product', 'PurchaseOrder', 'PurchaseOrderItem', 'Account',
-    'FinancialTransaction'
+    'ProductionStation', 'ProductionJob', 'ProductionLog', 'ProductionJobStation',
+    'ProductionRollupHourly', 'ProductionRollupDaily', 'Material',
+    'Product', 'PurchaseOrder', 'PurchaseOrderItem', 'Account', 'AccountBalanceSnapshot',
+    'FinancialTransaction', 'PaymentAllocation', 'OutboxEvent', 'DashboardCounter',
+    'IdempotencyKey'
 ]
@@ -0,0 +1,19 @@
+"""Account balance snapshot model."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class AccountBalanceSnapshot(Base):
+    __tablename__ = "account_balance_snapshots"
+
+    account_id = Column(
+        UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Balance of every transaction dated strictly before ``as_of``.
+    as_of = Column(DateTime(timezone=True), primary_key=True)
+    balance = Column(Numeric(14, 2), nullable=False)
+    transaction_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,15 @@
+"""Dashboard counter model."""
+
+from sqlalchemy import Column, Numeric, SmallInteger, String
+
+from app.db.base import Base
+
+
+class DashboardCounter(Base):
+    """One shard of a running total kept by database triggers; a counter is the sum of its shards."""
+
+    __tablename__ = "dashboard_counters"
+
+    name = Column(String(100), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    value = Column(Numeric(16, 2), nullable=False, server_default="0")
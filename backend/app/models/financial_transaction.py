@@ -7,9 +7,11 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Numeric,
     String,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -31,10 +33,23 @@ class FinancialTransaction(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     transaction_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     description = Column(String(255))
+    # Set for lines imported from bank statements, to skip them when re-imported.
+    line_hash = Column(String(64))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     __table_args__ = (
+        Index("ix_financial_transactions_created_at_id", "created_at", "id"),
+        Index("ix_financial_transactions_account_id_created_at_id", "account_id", "created_at", "id"),
+        Index("ix_financial_transactions_account_id_transaction_date", "account_id", "transaction_date"),
+        Index("ix_financial_transactions_transaction_date_id", "transaction_date", "id"),
+        Index("ix_financial_transactions_order_id", "order_id"),
+        Index(
+            "ux_financial_transactions_line_hash",
+            "line_hash",
+            unique=True,
+            postgresql_where=text("line_hash IS NOT NULL"),
+        ),
         CheckConstraint("direction IN ('IN','OUT')", name="ck_financial_transactions_direction"),
     )
 
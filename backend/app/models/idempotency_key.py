@@ -0,0 +1,23 @@
+"""Idempotency key model."""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """A client-supplied request key and the response stored for replays."""
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # Written in the same transaction as the claim, so committed rows always have them.
+    status_code = Column(Integer)
+    response = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
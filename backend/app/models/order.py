@@ -2,8 +2,9 @@
 
 import uuid
 
-from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Numeric, String, func
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Index, Numeric, String, func, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
@@ -22,8 +23,17 @@ class Order(Base):
     grand_total = Column(Numeric(10, 2), nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Maintained by trg_orders_delivered_at when the status becomes TESLIM EDILDI.
+    delivered_at = Column(DateTime(timezone=True))
+
+    order_items = relationship(
+        "OrderItem", back_populates="order", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_partner_id_created_at_id", "partner_id", "created_at", "id"),
+        Index("ix_orders_delivered_at", "delivered_at", postgresql_where=text("delivered_at IS NOT NULL")),
         CheckConstraint(
             "status IN ('TEKLIF','SIPARIS','URETIMDE','TESLIM EDILDI')",
             name="ck_orders_status",
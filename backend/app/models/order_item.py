@@ -4,6 +4,7 @@ import uuid
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
@@ -25,3 +26,7 @@ class OrderItem(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    order = relationship("Order", back_populates="order_items")
+    # Jobs keep their history; the database FK decides whether an item may go.
+    production_jobs = relationship("ProductionJob", back_populates="order_item", passive_deletes="all")
+
@@ -2,7 +2,7 @@
 
 import uuid
 
-from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, String, func
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
@@ -22,6 +22,7 @@ class Partner(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     __table_args__ = (
+        Index("ix_partners_created_at_id", "created_at", "id"),
         CheckConstraint("type IN ('CUSTOMER','SUPPLIER','BOTH')", name="ck_partners_type"),
     )
 
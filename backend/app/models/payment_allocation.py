@@ -0,0 +1,37 @@
+"""Payment allocation model."""
+
+import uuid
+
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Index, Numeric, String, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class PaymentAllocation(Base):
+    """Part of an incoming transaction applied to an order, as proposed by reconciliation."""
+
+    __tablename__ = "payment_allocations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    transaction_id = Column(
+        UUID(as_uuid=True), ForeignKey("financial_transactions.id", ondelete="CASCADE"), nullable=False
+    )
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    status = Column(String(20), nullable=False, server_default="PROPOSED")
+    rule = Column(String(20), nullable=False)
+    confidence = Column(Numeric(3, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    reviewed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_payment_allocations_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_payment_allocations_transaction_id", "transaction_id"),
+        Index("ix_payment_allocations_order_id", "order_id"),
+        CheckConstraint(
+            "status IN ('PROPOSED','ACCEPTED','REJECTED')",
+            name="ck_payment_allocations_status",
+        ),
+        CheckConstraint("amount > 0", name="ck_payment_allocations_amount"),
+    )
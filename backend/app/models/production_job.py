@@ -2,8 +2,9 @@
 
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
@@ -19,6 +20,19 @@ class ProductionJob(Base):
     quantity_required = Column(Integer, nullable=False)
     quantity_produced = Column(Integer, nullable=False, server_default="0")
     status = Column(String(50), nullable=False, server_default="PENDING")
+    due_date = Column(DateTime(timezone=True))
+    priority = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_production_jobs_created_at_id", "created_at", "id"),
+        Index("ix_production_jobs_status_created_at_id", "status", "created_at", "id"),
+        Index("ux_production_jobs_order_item_id", "order_item_id", unique=True),
+    )
+
+    order_item = relationship("OrderItem", back_populates="production_jobs")
+    stations = relationship(
+        "ProductionJobStation", back_populates="job", cascade="all, delete-orphan", passive_deletes=True
+    )
+
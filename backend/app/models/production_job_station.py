@@ -0,0 +1,20 @@
+"""Per-station progress counter of a production job."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class ProductionJobStation(Base):
+    __tablename__ = "production_job_stations"
+
+    job_id = Column(
+        UUID(as_uuid=True), ForeignKey("production_jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    station_id = Column(UUID(as_uuid=True), ForeignKey("production_stations.id"), primary_key=True)
+    quantity_produced = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    job = relationship("ProductionJob", back_populates="stations")
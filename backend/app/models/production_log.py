@@ -2,7 +2,7 @@
 
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
@@ -15,7 +15,17 @@ class ProductionLog(Base):
     job_id = Column(UUID(as_uuid=True), ForeignKey("production_jobs.id"), nullable=False)
     station_id = Column(UUID(as_uuid=True), ForeignKey("production_stations.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    completed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Part of the key because the table is partitioned by month of completion.
+    completed_at = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
+    )
     quantity = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_production_logs_job_id_created_at_id", "job_id", "created_at", "id"),
+        Index("ix_production_logs_station_id_completed_at", "station_id", "completed_at"),
+        Index("ix_production_logs_completed_at", "completed_at"),
+        {"postgresql_partition_by": "RANGE (completed_at)"},
+    )
+
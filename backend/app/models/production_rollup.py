@@ -0,0 +1,24 @@
+"""Hourly and daily production rollups per station and operator."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class _ProductionRollup:
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    station_id = Column(UUID(as_uuid=True), ForeignKey("production_stations.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False, server_default="0")
+    log_count = Column(Integer, nullable=False, server_default="0")
+    first_completed_at = Column(DateTime(timezone=True), nullable=False)
+    last_completed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ProductionRollupHourly(_ProductionRollup, Base):
+    __tablename__ = "production_rollups_hourly"
+
+
+class ProductionRollupDaily(_ProductionRollup, Base):
+    __tablename__ = "production_rollups_daily"
@@ -18,6 +18,7 @@ class ProductionStation(Base):
     name = Column(String(255), nullable=False)
     code = Column(String(50), unique=True, nullable=False)
     order_index = Column(Integer, nullable=False)
+    capacity_per_hour = Column(Integer, nullable=False, server_default="60")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
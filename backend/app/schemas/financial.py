@@ -1,6 +1,6 @@
 from decimal import Decimal
 from datetime import datetime
-from typing import Literal
+from typing import Dict, List, Literal
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -62,3 +62,66 @@ class FinancialTransactionPublic(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class StatementImportReport(BaseModel):
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[str]
+
+
+# Reconciliation schemas
+class PaymentAllocationPublic(BaseModel):
+    id: UUID
+    transaction_id: UUID
+    order_id: UUID
+    amount: Decimal
+    status: Literal["PROPOSED", "ACCEPTED", "REJECTED"]
+    rule: str
+    confidence: Decimal
+    created_at: datetime
+    reviewed_at: datetime | None
+
+    class Config:
+        orm_mode = True
+
+
+class ReconciliationRun(BaseModel):
+    payments: int
+    orders: int
+    proposals: int
+    matched_payments: int
+    matched_amount: Decimal
+    by_rule: Dict[str, int]
+    elapsed_seconds: float
+
+
+class ReconciliationReview(BaseModel):
+    accepted: int
+    skipped: int
+
+
+# Receivables aging schemas
+class AgingTotals(BaseModel):
+    days_0_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+    total_due: Decimal
+    credit: Decimal
+    exposure: Decimal
+
+
+class PartnerAging(AgingTotals):
+    partner_id: UUID
+    partner_name: str
+    open_orders: int
+    oldest_open_order: datetime | None
+
+
+class ReceivablesAgingReport(BaseModel):
+    as_of: datetime
+    totals: AgingTotals
+    partner_count: int
+    partners: List[PartnerAging]
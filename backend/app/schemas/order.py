@@ -33,3 +33,50 @@ class OrderPublic(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class OrderImportLine(BaseModel):
+    """One line of a bulk order import; lines sharing ``order_ref`` form an order."""
+
+    order_ref: str
+    partner_id: UUID
+    status: OrderStatus
+    product_id: UUID
+    width: int
+    height: int
+    quantity: int
+
+
+class OrderImportResult(BaseModel):
+    order_ref: str | None
+    order_id: UUID | None = None
+    line_count: int
+    success: bool
+    error: str | None = None
+
+
+class OrderImportReport(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[OrderImportResult]
+
+
+class OrderQuoteRequest(BaseModel):
+    order_items: List[OrderItemCreate]
+
+
+class OrderQuoteLine(BaseModel):
+    product_id: UUID
+    width: int
+    height: int
+    quantity: int
+    area_sqm: Decimal
+    unit_price: Decimal
+    total_price: Decimal
+
+
+class OrderQuote(BaseModel):
+    lines: List[OrderQuoteLine]
+    total_amount: Decimal
+    tax_amount: Decimal
+    grand_total: Decimal
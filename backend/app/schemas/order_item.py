@@ -12,6 +12,13 @@ class OrderItemCreate(BaseModel):
 
 
 class OrderItemUpdate(BaseModel):
+    """Incoming line of an order update.
+
+    Lines carrying ``id`` update that item; lines without it are matched to an
+    identical existing item, or inserted when there is none.
+    """
+
+    id: UUID | None = None
     product_id: UUID
     width: int
     height: int
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr
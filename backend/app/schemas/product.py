@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel
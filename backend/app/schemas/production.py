@@ -13,6 +13,26 @@ class ProductionLogCreate(BaseModel):
     quantity: int
 
 
+class ProductionLogBatchItem(ProductionLogCreate):
+    job_id: UUID
+
+
+class ProductionLogBatch(BaseModel):
+    logs: List[ProductionLogBatchItem]
+
+
+class JobProgress(BaseModel):
+    id: UUID
+    quantity_required: int
+    quantity_produced: int
+    status: JobStatus
+
+
+class ProductionLogBatchResult(BaseModel):
+    logs_created: int
+    jobs: List[JobProgress]
+
+
 class ProductionLogPublic(BaseModel):
     id: UUID
     job_id: UUID
@@ -25,6 +45,14 @@ class ProductionLogPublic(BaseModel):
         orm_mode = True
 
 
+class JobStationProgress(BaseModel):
+    station_id: UUID
+    quantity_produced: int
+
+    class Config:
+        orm_mode = True
+
+
 class ProductionJobCreate(BaseModel):
     order_item_id: UUID
     quantity_required: int
@@ -32,7 +60,8 @@ class ProductionJobCreate(BaseModel):
 
 class ProductionJobUpdate(BaseModel):
     status: JobStatus | None = None
-    quantity_produced: int | None = None
+    due_date: datetime | None = None
+    priority: int | None = None
 
 
 class ProductionJobPublic(BaseModel):
@@ -42,7 +71,69 @@ class ProductionJobPublic(BaseModel):
     quantity_required: int
     quantity_produced: int
     status: JobStatus
-    logs: List[ProductionLogPublic]
+    due_date: datetime | None = None
+    priority: int = 0
+    stations: List[JobStationProgress]
 
     class Config:
         orm_mode = True
+
+
+class CutPlacement(BaseModel):
+    order_item_id: UUID
+    x: int
+    y: int
+    width: int
+    height: int
+    rotated: bool
+
+
+class CutSheet(BaseModel):
+    index: int
+    used_area: int
+    waste_percentage: float
+    placements: List[CutPlacement]
+
+
+class CutPlan(BaseModel):
+    product_id: UUID
+    piece_count: int
+    sheet_count: int
+    waste_percentage: float
+    unplaced_order_item_ids: List[UUID]
+    sheets: List[CutSheet]
+
+
+class AnalyticsBucket(BaseModel):
+    bucket_start: datetime
+    station_id: UUID | None = None
+    user_id: UUID | None = None
+    quantity: int
+    log_count: int
+    active_hours: float
+    pieces_per_hour: float
+    cycle_time_seconds: float | None = None
+    utilisation: float
+    oee: float | None = None
+
+
+class ScheduleEntry(BaseModel):
+    job_id: UUID
+    remaining: int
+    ready: bool
+    due_date: datetime
+    priority: int
+    estimated_start: datetime
+    estimated_finish: datetime
+    late: bool
+
+
+class StationSchedule(BaseModel):
+    station_id: UUID
+    code: str
+    name: str
+    capacity_per_hour: int
+    queued_jobs: int
+    remaining_pieces: int
+    backlog_hours: float
+    entries: List[ScheduleEntry]
@@ -0,0 +1,170 @@
+"""Station and operator throughput from hourly and daily rollups.
+
+Every logging transaction folds its new logs into ``production_rollups_hourly``
+and ``production_rollups_daily`` with one upsert each, keyed by bucket,
+station and operator. Reads never touch ``production_logs``: hourly queries
+use the hourly table, coarser ones re-bucket the daily table.
+
+Active time in a bucket is the span between its first and last log, so the
+figures are estimates: ``utilisation`` is active time over the time covered,
+``cycle_time_seconds`` is active time per piece and ``oee`` is output over
+what the station's ``capacity_per_hour`` allows in the time covered (quality
+is not tracked, so it counts as perfect).
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import extract, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.production_log import ProductionLog
+from app.models.production_rollup import ProductionRollupDaily, ProductionRollupHourly
+from app.services.station_registry import station_registry
+
+ROLLUPS = {"hour": ProductionRollupHourly, "day": ProductionRollupDaily}
+GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def record_logs(db: Session, log_ids: Iterable[UUID]) -> None:
+    """Fold the logs ``log_ids``, already inserted in this transaction, into the rollups.
+
+    The logs must carry the default ``completed_at``, the transaction's
+    ``now()``; matching on it lets PostgreSQL read only the current month's
+    partition instead of probing every partition's key index.
+    """
+    log_ids = list(log_ids)
+    if not log_ids:
+        return
+    for unit, model in ROLLUPS.items():
+        rollup = model.__table__
+        bucket = func.date_trunc(unit, ProductionLog.completed_at)
+        # Ordered so concurrent writers lock shared rollup rows in the same order.
+        rows = (
+            select(
+                bucket,
+                ProductionLog.station_id,
+                ProductionLog.user_id,
+                func.sum(ProductionLog.quantity),
+                func.count(),
+                func.min(ProductionLog.completed_at),
+                func.max(ProductionLog.completed_at),
+            )
+            .where(ProductionLog.completed_at == func.now(), ProductionLog.id.in_(log_ids))
+            .group_by(bucket, ProductionLog.station_id, ProductionLog.user_id)
+            .order_by(bucket, ProductionLog.station_id, ProductionLog.user_id)
+        )
+        statement = pg_insert(rollup).from_select(
+            [
+                "bucket_start",
+                "station_id",
+                "user_id",
+                "quantity",
+                "log_count",
+                "first_completed_at",
+                "last_completed_at",
+            ],
+            rows,
+        )
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollup.c.bucket_start, rollup.c.station_id, rollup.c.user_id],
+            set_={
+                "quantity": rollup.c.quantity + excluded.quantity,
+                "log_count": rollup.c.log_count + excluded.log_count,
+                "first_completed_at": func.least(rollup.c.first_completed_at, excluded.first_completed_at),
+                "last_completed_at": func.greatest(rollup.c.last_completed_at, excluded.last_completed_at),
+            },
+        )
+        db.execute(statement)
+
+
+def _bucket_end(start: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def production_analytics(
+    db: Session,
+    date_from: datetime,
+    date_to: datetime,
+    granularity: str = "hour",
+    group_by: str = "station",
+    station_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+) -> List[dict]:
+    """Throughput per ``granularity`` bucket and station or operator in ``[date_from, date_to)``.
+
+    Only rollup buckets (hours, or days above hourly) starting inside the
+    range count, so unaligned bounds drop the partial bucket at the start.
+    Naive datetimes are taken as UTC.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularity must be one of {', '.join(GRANULARITIES)}")
+    if group_by not in ("station", "user"):
+        raise ValueError("group_by must be station or user")
+    if date_from.tzinfo is None:
+        date_from = date_from.replace(tzinfo=timezone.utc)
+    if date_to.tzinfo is None:
+        date_to = date_to.replace(tzinfo=timezone.utc)
+    if date_to <= date_from:
+        raise ValueError("date_to must be after date_from")
+    model = ROLLUPS["hour" if granularity == "hour" else "day"]
+    key = model.station_id if group_by == "station" else model.user_id
+    bucket = func.date_trunc(granularity, model.bucket_start).label("bucket_start")
+    query = (
+        db.query(
+            bucket,
+            key.label("key"),
+            func.sum(model.quantity),
+            func.sum(model.log_count),
+            func.sum(extract("epoch", model.last_completed_at - model.first_completed_at)),
+        )
+        .filter(
+            model.bucket_start >= date_from,
+            model.bucket_start < date_to,
+        )
+        .group_by(bucket, key)
+        .order_by(bucket, key)
+    )
+    if station_id:
+        query = query.filter(model.station_id == station_id)
+    if user_id:
+        query = query.filter(model.user_id == user_id)
+
+    now = datetime.now(timezone.utc)
+    results = []
+    for bucket_start, row_key, quantity, log_count, active_seconds in query:
+        start = max(bucket_start, date_from)
+        end = min(_bucket_end(bucket_start, granularity), date_to, now)
+        hours = max((end - start).total_seconds() / 3600, 1 / 3600)
+        active_seconds = float(active_seconds or 0)
+        oee = None
+        if group_by == "station":
+            station = station_registry.by_id(db, row_key)
+            if station is not None and station.capacity_per_hour:
+                oee = round(quantity / (hours * station.capacity_per_hour), 4)
+        results.append(
+            {
+                "bucket_start": bucket_start,
+                "station_id": row_key if group_by == "station" else None,
+                "user_id": row_key if group_by == "user" else None,
+                "quantity": quantity,
+                "log_count": log_count,
+                "active_hours": round(active_seconds / 3600, 3),
+                "pieces_per_hour": round(quantity / hours, 2),
+                "cycle_time_seconds": round(active_seconds / quantity, 2) if active_seconds and quantity else None,
+                "utilisation": round(min(active_seconds / 3600 / hours, 1.0), 4),
+                "oee": oee,
+            }
+        )
+    return results
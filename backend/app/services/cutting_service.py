@@ -0,0 +1,268 @@
+"""Glass cutting plans for the ``CAM_KESIM`` station.
+
+Pending pieces of one product are packed onto identical stock sheets with a
+guillotine packer: every placement splits a free rectangle into two smaller
+ones with a single edge-to-edge cut, so any plan can be cut on a guillotine
+table. Pieces go largest first, sheets are tried first-fit, and within a
+sheet the free rectangle leaving the least area wins (best area fit). The
+packing runs once per split rule and the plan using fewer sheets is kept.
+
+Plans depend only on the multiset of piece sizes and the sheet settings, so
+they are memoized on that key and reused for identical item sets.
+"""
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.models.order_item import OrderItem
+from app.models.production_job import ProductionJob
+
+DEFAULT_SHEET_WIDTH = 6000
+DEFAULT_SHEET_HEIGHT = 3210
+PLAN_CACHE_SIZE = 256
+PLAN_CACHE_TTL = 3600.0
+
+Size = Tuple[int, int]
+
+plan_cache = TTLCache("cut_plans", max_entries=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL)
+metrics.register("cut_plan_cache", plan_cache.stats)
+
+
+@dataclass(frozen=True)
+class Placement:
+    piece: int
+    sheet: int
+    x: int
+    y: int
+    width: int
+    height: int
+    rotated: bool
+
+
+@dataclass
+class PackingResult:
+    sheet_count: int
+    placements: List[Placement]
+    used_area: List[int]
+    unplaced: List[int] = field(default_factory=list)
+
+
+class _Sheet:
+    __slots__ = ("free", "used_area", "split_longer")
+
+    def __init__(self, width: int, height: int, split_longer: bool) -> None:
+        self.free: List[List[int]] = [[0, 0, width, height]]
+        self.used_area = 0
+        self.split_longer = split_longer
+
+    def best_fit(self, width: int, height: int, allow_rotation: bool):
+        best = None
+        best_score = None
+        for index, (_, _, free_w, free_h) in enumerate(self.free):
+            for w, h, rotated in ((width, height, False), (height, width, True)):
+                if rotated and (not allow_rotation or width == height):
+                    continue
+                if w <= free_w and h <= free_h:
+                    score = (free_w * free_h - w * h, min(free_w - w, free_h - h))
+                    if best_score is None or score < best_score:
+                        best, best_score = (index, w, h, rotated), score
+        return best
+
+    def place(self, index: int, width: int, height: int, min_side: int) -> Tuple[int, int]:
+        x, y, free_w, free_h = self.free.pop(index)
+        leftover_w, leftover_h = free_w - width, free_h - height
+        # The shorter-axis rule keeps the bigger remainder whole, which suits mixed
+        # sizes; the longer-axis rule builds strips, which suits repeated sizes.
+        if (leftover_w < leftover_h) != self.split_longer:
+            parts = ((x + width, y, leftover_w, height), (x, y + height, free_w, leftover_h))
+        else:
+            parts = ((x + width, y, leftover_w, free_h), (x, y + height, width, leftover_h))
+        for part in parts:
+            if part[2] >= min_side and part[3] >= min_side:
+                self.free.append(list(part))
+        self.used_area += width * height
+        return x, y
+
+    def prune(self, min_side: int) -> None:
+        self.free = [rect for rect in self.free if rect[2] >= min_side and rect[3] >= min_side]
+
+
+def pack_pieces(
+    sizes: Sequence[Size],
+    sheet_width: int = DEFAULT_SHEET_WIDTH,
+    sheet_height: int = DEFAULT_SHEET_HEIGHT,
+    kerf: int = 0,
+    allow_rotation: bool = True,
+) -> PackingResult:
+    """Pack ``sizes`` (width, height in mm) onto sheets; ``piece`` indexes into ``sizes``."""
+    best = None
+    for split_longer in (False, True):
+        result = _pack(sizes, sheet_width, sheet_height, kerf, allow_rotation, split_longer)
+        if best is None or result.sheet_count < best.sheet_count:
+            best = result
+    return best
+
+
+def _pack(
+    sizes: Sequence[Size],
+    sheet_width: int,
+    sheet_height: int,
+    kerf: int,
+    allow_rotation: bool,
+    split_longer: bool,
+) -> PackingResult:
+    order = sorted(
+        range(len(sizes)),
+        key=lambda i: (-sizes[i][0] * sizes[i][1], -max(sizes[i]), sizes[i]),
+    )
+    # Each piece occupies its size plus one kerf; the sheet gets one extra kerf
+    # so the pieces on its far edges do not lose a cut they do not need.
+    bin_w, bin_h = sheet_width + kerf, sheet_height + kerf
+    padded = [(sizes[i][0] + kerf, sizes[i][1] + kerf) for i in order]
+    # Smallest side still to come, for discarding free rectangles nothing fits in.
+    suffix_min = [0] * (len(order) + 1)
+    suffix_min[-1] = max(bin_w, bin_h) + 1
+    for position in range(len(order) - 1, -1, -1):
+        suffix_min[position] = min(suffix_min[position + 1], min(padded[position]))
+
+    sheets: List[_Sheet] = []
+    placements: List[Placement] = []
+    unplaced: List[int] = []
+    start_sheet: Dict[Size, int] = {}
+    for position, piece in enumerate(order):
+        width, height = padded[position]
+        min_side = suffix_min[position + 1]
+        fits_stock = (width <= bin_w and height <= bin_h) or (
+            allow_rotation and height <= bin_w and width <= bin_h
+        )
+        if not fits_stock:
+            unplaced.append(piece)
+            continue
+        # Sheets that had no room for this size will not have room for it later either.
+        first = start_sheet.get((width, height), 0)
+        target = None
+        for sheet_index in range(first, len(sheets)):
+            fit = sheets[sheet_index].best_fit(width, height, allow_rotation)
+            if fit is not None:
+                target = (sheet_index, fit)
+                break
+        if target is None:
+            sheets.append(_Sheet(bin_w, bin_h, split_longer))
+            sheet_index = len(sheets) - 1
+            target = (sheet_index, sheets[sheet_index].best_fit(width, height, allow_rotation))
+        sheet_index, (free_index, placed_w, placed_h, rotated) = target
+        start_sheet[(width, height)] = sheet_index
+        x, y = sheets[sheet_index].place(free_index, placed_w, placed_h, min_side)
+        placements.append(
+            Placement(piece, sheet_index, x, y, placed_w - kerf, placed_h - kerf, rotated)
+        )
+        if min_side > suffix_min[position]:
+            for sheet in sheets:
+                sheet.prune(min_side)
+
+    used = [0] * len(sheets)
+    for placement in placements:
+        used[placement.sheet] += placement.width * placement.height
+    return PackingResult(len(sheets), placements, used, unplaced)
+
+
+def _plan_key(sizes: Sequence[Size], sheet_width: int, sheet_height: int, kerf: int, allow_rotation: bool) -> str:
+    canonical = ",".join(f"{w}x{h}" for w, h in sorted(sizes))
+    raw = f"{sheet_width}x{sheet_height}|{kerf}|{int(allow_rotation)}|{canonical}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def plan_sheets(
+    sizes: Sequence[Size],
+    sheet_width: int = DEFAULT_SHEET_WIDTH,
+    sheet_height: int = DEFAULT_SHEET_HEIGHT,
+    kerf: int = 0,
+    allow_rotation: bool = True,
+) -> Tuple[List[Size], PackingResult]:
+    """Memoized ``pack_pieces`` over the sorted sizes; returns the sizes the plan indexes."""
+    canonical = sorted(sizes)
+    key = _plan_key(canonical, sheet_width, sheet_height, kerf, allow_rotation)
+    result = plan_cache.get(key)
+    if result is None:
+        result = pack_pieces(canonical, sheet_width, sheet_height, kerf, allow_rotation)
+        plan_cache.set(key, result)
+    return canonical, result
+
+
+def build_cut_plans(
+    db: Session,
+    product_id: Optional[UUID] = None,
+    sheet_width: int = DEFAULT_SHEET_WIDTH,
+    sheet_height: int = DEFAULT_SHEET_HEIGHT,
+    kerf: int = 0,
+    allow_rotation: bool = True,
+) -> List[dict]:
+    """Cutting plans for pending jobs, one per product."""
+    query = (
+        db.query(
+            OrderItem.id,
+            OrderItem.product_id,
+            OrderItem.width,
+            OrderItem.height,
+            ProductionJob.quantity_required,
+        )
+        .join(ProductionJob, ProductionJob.order_item_id == OrderItem.id)
+        .filter(ProductionJob.status == "PENDING")
+    )
+    if product_id:
+        query = query.filter(OrderItem.product_id == product_id)
+
+    pieces_by_product: Dict[UUID, List[Tuple[Size, UUID]]] = defaultdict(list)
+    for item_id, item_product_id, width, height, quantity in query:
+        pieces_by_product[item_product_id].extend([((width, height), item_id)] * quantity)
+
+    sheet_area = sheet_width * sheet_height
+    plans = []
+    for plan_product_id, pieces in pieces_by_product.items():
+        canonical, result = plan_sheets(
+            [size for size, _ in pieces], sheet_width, sheet_height, kerf, allow_rotation
+        )
+        # Hand out item ids to the canonical pieces of the same size.
+        ids_by_size: Dict[Size, List[UUID]] = defaultdict(list)
+        for size, item_id in pieces:
+            ids_by_size[size].append(item_id)
+        piece_ids = [ids_by_size[size].pop() for size in canonical]
+
+        sheets = [
+            {"index": index, "placements": [], "used_area": used, "waste_percentage": 0.0}
+            for index, used in enumerate(result.used_area)
+        ]
+        for placement in result.placements:
+            sheets[placement.sheet]["placements"].append(
+                {
+                    "order_item_id": piece_ids[placement.piece],
+                    "x": placement.x,
+                    "y": placement.y,
+                    "width": placement.width,
+                    "height": placement.height,
+                    "rotated": placement.rotated,
+                }
+            )
+        for sheet in sheets:
+            sheet["waste_percentage"] = round(100 * (1 - sheet["used_area"] / sheet_area), 2)
+        total_area = result.sheet_count * sheet_area
+        plans.append(
+            {
+                "product_id": plan_product_id,
+                "piece_count": len(pieces),
+                "sheet_count": result.sheet_count,
+                "waste_percentage": round(100 * (1 - sum(result.used_area) / total_area), 2)
+                if total_area
+                else 0.0,
+                "unplaced_order_item_ids": [piece_ids[piece] for piece in result.unplaced],
+                "sheets": sheets,
+            }
+        )
+    return plans
@@ -0,0 +1,115 @@
+"""Dashboard summaries read from trigger-maintained counters.
+
+Database triggers on ``financial_transactions``, ``orders`` and
+``production_jobs`` add each statement's net change to
+``dashboard_counters``, so every write path keeps them current and a
+summary reads a handful of counter rows instead of aggregating the tables:
+
+``revenue:YYYY-MM`` / ``expense:YYYY-MM``  ``IN`` / ``OUT`` amounts by month of transaction date
+``cash_balance``                           all ``IN`` less all ``OUT``
+``orders:<status>`` / ``jobs:<status>``    rows currently in each status
+``orders_completed:YYYY-MM-DD``            orders that reached ``TESLIM EDILDI`` that day
+
+Counters are split into shards, one per writing connection, and summed here.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.dashboard_counter import DashboardCounter
+from app.models.financial_transaction import FinancialTransaction
+from app.models.order import Order
+from app.models.partner import Partner
+from app.models.production_rollup import ProductionRollupHourly
+
+ORDER_STATUSES = ("TEKLIF", "SIPARIS", "URETIMDE", "TESLIM EDILDI")
+JOB_STATUSES = ("PENDING", "IN_PROGRESS", "COMPLETED")
+LAST_TRANSACTIONS = 5
+CURRENCY = "TRY"
+
+
+def read_counters(db: Session, names: Iterable[str]) -> Dict[str, Decimal]:
+    """Current value of each counter in ``names``; counters never written are zero."""
+    values = {name: Decimal("0") for name in names}
+    rows = (
+        db.query(DashboardCounter.name, func.sum(DashboardCounter.value))
+        .filter(DashboardCounter.name.in_(list(values)))
+        .group_by(DashboardCounter.name)
+    )
+    for name, value in rows:
+        values[name] = Decimal(value)
+    return values
+
+
+def finance_summary(db: Session) -> dict:
+    """This month's revenue and expense, the cash balance and the latest transactions."""
+    month = datetime.now(timezone.utc).strftime("%Y-%m")
+    counters = read_counters(db, [f"revenue:{month}", f"expense:{month}", "cash_balance"])
+    revenue = counters[f"revenue:{month}"]
+    expense = counters[f"expense:{month}"]
+    transactions = (
+        db.query(FinancialTransaction)
+        .order_by(FinancialTransaction.created_at.desc(), FinancialTransaction.id.desc())
+        .limit(LAST_TRANSACTIONS)
+        .all()
+    )
+    return {
+        "month": month,
+        "revenue": revenue,
+        "expense": expense,
+        "profit": revenue - expense,
+        "currency": CURRENCY,
+        "cashBalance": counters["cash_balance"],
+        "lastTransactions": [
+            {
+                "id": transaction.id,
+                "direction": transaction.direction,
+                "amount": transaction.amount,
+                "description": transaction.description,
+                "transaction_date": transaction.transaction_date,
+            }
+            for transaction in transactions
+        ],
+    }
+
+
+def operations_summary(db: Session) -> dict:
+    """Orders and jobs per status, today's deliveries and stations that logged work in the last hour."""
+    now = datetime.now(timezone.utc)
+    today = f"orders_completed:{now.date().isoformat()}"
+    counters = read_counters(
+        db,
+        [f"orders:{status}" for status in ORDER_STATUSES] + [f"jobs:{status}" for status in JOB_STATUSES] + [today],
+    )
+    orders = {status: int(counters[f"orders:{status}"]) for status in ORDER_STATUSES}
+    jobs = {status: int(counters[f"jobs:{status}"]) for status in JOB_STATUSES}
+    last_completed = (
+        db.query(Order.id, Order.delivered_at, Partner.name)
+        .join(Partner, Partner.id == Order.partner_id)
+        .filter(Order.delivered_at.isnot(None))
+        .order_by(Order.delivered_at.desc())
+        .first()
+    )
+    hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    stations_active = (
+        db.query(func.count(func.distinct(ProductionRollupHourly.station_id)))
+        .filter(ProductionRollupHourly.bucket_start >= hour)
+        .scalar()
+    )
+    return {
+        "orders_pending": orders["SIPARIS"],
+        "orders_in_progress": orders["URETIMDE"],
+        "orders_completed_today": int(counters[today]),
+        "stations_active": stations_active,
+        "orders_by_status": orders,
+        "jobs_by_status": jobs,
+        "inProgressJobs": jobs["IN_PROGRESS"],
+        "lastCompletedOrder": (
+            f"{last_completed.name} ({last_completed.delivered_at:%Y-%m-%d %H:%M})" if last_completed else None
+        ),
+        "lastCompletedOrderId": last_completed.id if last_completed else None,
+    }
@@ -0,0 +1,161 @@
+"""Live production and order events.
+
+Services call ``publish_event`` inside their transaction; the event travels
+as a NOTIFY on ``app_events`` and reaches every worker only once the
+transaction commits. In each worker the listener thread hands it to the
+``EventBroker``, which fans it out on the event loop to the subscribers whose
+filters match. A subscriber is just a bounded ``asyncio.Queue`` of encoded
+frames, so thousands of idle streams cost little more than their sockets.
+
+Events are small JSON objects with a ``type`` and the ids they concern::
+
+    job.progress   job_id, station_id, quantity, quantity_produced, status
+    job.status     job_id, status
+    order.created  order_id, partner_id, grand_total
+    payment.created  order_id, transaction_id, amount
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db.notify import listener, notify, notify_many
+
+EVENTS_CHANNEL = "app_events"
+EVENT_TYPES = frozenset({"job.progress", "job.status", "order.created", "payment.created"})
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def _encode(event_type: str, fields: dict) -> str:
+    payload = {"type": event_type}
+    payload.update({key: str(value) if isinstance(value, UUID) else value for key, value in fields.items()})
+    return json.dumps(payload, default=str)
+
+
+def publish_event(db: Session, event_type: str, **fields) -> None:
+    """Queue an event on ``db``'s transaction; it is delivered on commit."""
+    notify(db, EVENTS_CHANNEL, _encode(event_type, fields))
+
+
+def publish_events(db: Session, events: Iterable[dict]) -> None:
+    """Queue many events, each a dict with a ``type``, in one statement."""
+    notify_many(
+        db,
+        EVENTS_CHANNEL,
+        [_encode(event["type"], {key: value for key, value in event.items() if key != "type"}) for event in events],
+    )
+
+
+@dataclass(eq=False)
+class Subscription:
+    types: FrozenSet[str]
+    job_id: Optional[str] = None
+    station_id: Optional[str] = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    dropped: int = 0
+
+    def matches(self, event: dict) -> bool:
+        if event["type"] not in self.types:
+            return False
+        if self.job_id is not None and event.get("job_id") != self.job_id:
+            return False
+        if self.station_id is not None and event.get("station_id") != self.station_id:
+            return False
+        return True
+
+    def offer(self, frame: str) -> None:
+        # A slow reader loses its oldest frames rather than holding up everyone else.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+
+class EventBroker:
+    """Per-worker fan-out of events to live subscriptions.
+
+    Subscriptions filtered by job or station are indexed by that id, so an
+    event only visits the subscriptions that could want it.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unfiltered: Set[Subscription] = set()
+        self._by_job: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._by_station: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(
+        self,
+        types: FrozenSet[str] = EVENT_TYPES,
+        job_id: Optional[UUID] = None,
+        station_id: Optional[UUID] = None,
+    ) -> Subscription:
+        """Register a subscription; must be called from the event loop that reads it."""
+        subscription = Subscription(
+            frozenset(types),
+            str(job_id) if job_id else None,
+            str(station_id) if station_id else None,
+        )
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._bucket(subscription).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            bucket = self._bucket(subscription)
+            bucket.discard(subscription)
+            if not bucket and bucket is not self._unfiltered:
+                index = self._by_job if subscription.job_id else self._by_station
+                index.pop(subscription.job_id or subscription.station_id, None)
+
+    def _bucket(self, subscription: Subscription) -> Set[Subscription]:
+        if subscription.job_id:
+            return self._by_job[subscription.job_id]
+        if subscription.station_id:
+            return self._by_station[subscription.station_id]
+        return self._unfiltered
+
+    def dispatch(self, payload: str) -> None:
+        """Listener callback: hand the event to the loop that owns the subscriptions."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        self.published += 1
+        loop.call_soon_threadsafe(self._fan_out, payload)
+
+    def _fan_out(self, payload: str) -> None:
+        event = json.loads(payload)
+        frame = f"event: {event['type']}\ndata: {payload}\n\n"
+        with self._lock:
+            candidates = list(self._unfiltered)
+            if event.get("job_id") in self._by_job:
+                candidates.extend(self._by_job[event["job_id"]])
+            if event.get("station_id") in self._by_station:
+                candidates.extend(self._by_station[event["station_id"]])
+        for subscription in candidates:
+            if subscription.matches(event):
+                subscription.offer(frame)
+                self.delivered += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            subscribers = len(self._unfiltered) + sum(map(len, self._by_job.values())) + sum(
+                map(len, self._by_station.values())
+            )
+        return {"subscribers": subscribers, "published": self.published, "delivered": self.delivered}
+
+
+broker = EventBroker()
+listener.subscribe(EVENTS_CHANNEL, broker.dispatch)
+metrics.register("events", broker.stats)
@@ -0,0 +1,137 @@
+"""Service layer for streaming CSV/NDJSON extracts.
+
+Exports read plain rows (no ORM objects, no pydantic validation) from a
+server-side cursor and encode them in fixed-size chunks, so memory use does
+not depend on how many rows the extract contains. The generators open their
+own connection because they keep running after the endpoint has returned.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, select
+
+from app.db.session import engine
+from app.models.financial_transaction import FinancialTransaction
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.production_log import ProductionLog
+
+EXPORT_CHUNK_SIZE = 1000
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _encode(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _format_rows(columns: List[str], rows: Sequence, fmt: str) -> bytes:
+    if fmt == "ndjson":
+        lines = (json.dumps(dict(zip(columns, map(_encode, row)))) for row in rows)
+        return ("\n".join(lines) + "\n").encode()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else _encode(value) for value in row])
+    return buffer.getvalue().encode()
+
+
+def stream_export(statement: Select, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield ``statement``'s rows encoded as ``fmt``, ``chunk_size`` rows at a time."""
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, max_row_buffer=chunk_size
+        ).execute(statement)
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _format_rows(columns, [columns], fmt)
+        for rows in result.partitions(chunk_size):
+            yield _format_rows(columns, rows, fmt)
+
+
+def _between(statement: Select, column, date_from: datetime | None, date_to: datetime | None) -> Select:
+    if date_from is not None:
+        statement = statement.where(column >= date_from)
+    if date_to is not None:
+        statement = statement.where(column < date_to)
+    return statement
+
+
+def orders_export_statement(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    status: str | None = None,
+) -> Select:
+    """One row per order item, with the order columns repeated; orders without items get one row."""
+    statement = select(
+        Order.id.label("order_id"),
+        Order.partner_id,
+        Order.status,
+        Order.total_amount,
+        Order.tax_amount,
+        Order.grand_total,
+        Order.created_at,
+        OrderItem.id.label("order_item_id"),
+        OrderItem.product_id,
+        OrderItem.width,
+        OrderItem.height,
+        OrderItem.quantity,
+        OrderItem.unit_price,
+        OrderItem.total_price,
+    ).outerjoin(OrderItem, OrderItem.order_id == Order.id)
+    if status:
+        statement = statement.where(Order.status == status)
+    statement = _between(statement, Order.created_at, date_from, date_to)
+    return statement.order_by(Order.created_at, Order.id, OrderItem.id)
+
+
+def transactions_export_statement(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    account_id: UUID | None = None,
+) -> Select:
+    statement = select(
+        FinancialTransaction.id,
+        FinancialTransaction.account_id,
+        FinancialTransaction.partner_id,
+        FinancialTransaction.order_id,
+        FinancialTransaction.purchase_order_id,
+        FinancialTransaction.direction,
+        FinancialTransaction.amount,
+        FinancialTransaction.transaction_date,
+        FinancialTransaction.description,
+    )
+    if account_id:
+        statement = statement.where(FinancialTransaction.account_id == account_id)
+    statement = _between(statement, FinancialTransaction.transaction_date, date_from, date_to)
+    return statement.order_by(FinancialTransaction.transaction_date, FinancialTransaction.id)
+
+
+def production_logs_export_statement(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    station_id: UUID | None = None,
+) -> Select:
+    statement = select(
+        ProductionLog.id,
+        ProductionLog.job_id,
+        ProductionLog.station_id,
+        ProductionLog.user_id,
+        ProductionLog.quantity,
+        ProductionLog.completed_at,
+    )
+    if station_id:
+        statement = statement.where(ProductionLog.station_id == station_id)
+    statement = _between(statement, ProductionLog.completed_at, date_from, date_to)
+    return statement.order_by(ProductionLog.completed_at, ProductionLog.id)
@@ -1,12 +1,15 @@
 """Service layer for financial operations."""
 
 import uuid
+from collections import defaultdict
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.db.retry import retry_on_conflict
 from app.models.account import Account
 from app.models.financial_transaction import FinancialTransaction
 from app.models.order import Order
@@ -14,8 +17,13 @@ from app.schemas.financial import (
     AccountCreate,
     AccountUpdate,
     FinancialTransactionCreate,
+    FinancialTransactionPublic,
     FinancialTransactionUpdate,
 )
+from app.services.event_service import publish_event
+from app.services.idempotency_service import IdempotentResult, run_idempotent
+from app.services.ledger_service import invalidate_snapshots
+from app.services.pagination import paginate
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
@@ -39,8 +47,10 @@ def get_account(db: Session, account_id: UUID) -> Optional[Account]:
     return db.query(Account).filter(Account.id == account_id).first()
 
 
-def get_accounts(db: Session, page: int = 1, page_size: int = 10) -> List[Account]:
-    return db.query(Account).offset((page - 1) * page_size).limit(page_size).all()
+def get_accounts(
+    db: Session, page: int = 1, page_size: int = 10, cursor: str | None = None
+) -> List[Account]:
+    return paginate(db.query(Account), Account, page, page_size, cursor)
 
 
 def update_account(db: Session, account_id: UUID, account_in: AccountUpdate) -> Optional[Account]:
@@ -74,19 +84,33 @@ def get_account_balance(db: Session, account_id: UUID) -> Optional[Decimal]:
 # Financial transaction operations
 # ---------------------------------------------------------------------------
 
-def _apply_transaction_to_account(account: Account, direction: str, amount: Decimal) -> None:
-    if direction == "IN":
-        account.current_balance = Decimal(account.current_balance) + amount
-    else:
-        account.current_balance = Decimal(account.current_balance) - amount
+def _signed(direction: str, amount: Decimal) -> Decimal:
+    return Decimal(amount) if direction == "IN" else -Decimal(amount)
 
 
-def create_transaction(
-    db: Session, transaction_in: FinancialTransactionCreate
-) -> FinancialTransaction:
-    account = get_account(db, transaction_in.account_id)
-    if not account:
-        raise ValueError("Account not found")
+def _adjust_balances(db: Session, deltas: Dict[UUID, Decimal]) -> None:
+    """Add ``deltas`` to the accounts' balances in the database.
+
+    Each account is changed with ``current_balance = current_balance + delta``,
+    so concurrent writers never overwrite each other, and accounts are
+    touched in id order so two transactions cannot deadlock on them.
+    """
+    accounts = Account.__table__
+    for account_id in sorted(deltas):
+        updated = db.execute(
+            update(accounts)
+            .where(accounts.c.id == account_id)
+            .values(current_balance=accounts.c.current_balance + deltas[account_id])
+            .returning(accounts.c.id)
+        ).first()
+        if updated is None:
+            raise ValueError("Account not found")
+
+
+def _add_transaction(db: Session, transaction_in: FinancialTransactionCreate) -> FinancialTransaction:
+    _adjust_balances(
+        db, {transaction_in.account_id: _signed(transaction_in.direction, transaction_in.amount)}
+    )
     transaction = FinancialTransaction(
         organization_id=DEFAULT_ORGANIZATION_ID,
         account_id=transaction_in.account_id,
@@ -98,7 +122,14 @@ def create_transaction(
         description=transaction_in.description,
     )
     db.add(transaction)
-    _apply_transaction_to_account(account, transaction.direction, transaction.amount)
+    return transaction
+
+
+@retry_on_conflict
+def create_transaction(
+    db: Session, transaction_in: FinancialTransactionCreate
+) -> FinancialTransaction:
+    transaction = _add_transaction(db, transaction_in)
     db.commit()
     db.refresh(transaction)
     return transaction
@@ -114,39 +145,52 @@ def list_transactions(
     page_size: int = 10,
     account_id: UUID | None = None,
     direction: str | None = None,
+    cursor: str | None = None,
 ) -> List[FinancialTransaction]:
     query = db.query(FinancialTransaction)
     if account_id:
         query = query.filter(FinancialTransaction.account_id == account_id)
     if direction:
         query = query.filter(FinancialTransaction.direction == direction)
-    return query.offset((page - 1) * page_size).limit(page_size).all()
+    return paginate(query, FinancialTransaction, page, page_size, cursor)
+
+
+def _lock_transaction(db: Session, transaction_id: UUID) -> Optional[FinancialTransaction]:
+    return (
+        db.query(FinancialTransaction)
+        .filter(FinancialTransaction.id == transaction_id)
+        .with_for_update()
+        .first()
+    )
 
 
+@retry_on_conflict
 def update_transaction(
     db: Session, transaction_id: UUID, transaction_in: FinancialTransactionUpdate
 ) -> Optional[FinancialTransaction]:
-    transaction = get_transaction(db, transaction_id)
+    # Locking the row makes a concurrent edit wait and then reverse what this one applied.
+    transaction = _lock_transaction(db, transaction_id)
     if not transaction:
         return None
-    # Reverse old effect on account
-    account = get_account(db, transaction.account_id)
-    _apply_transaction_to_account(account, "OUT" if transaction.direction == "IN" else "IN", transaction.amount)
+    deltas: Dict[UUID, Decimal] = defaultdict(Decimal)
+    deltas[transaction.account_id] -= _signed(transaction.direction, transaction.amount)
     for field, value in transaction_in.dict(exclude_unset=True).items():
         setattr(transaction, field, value)
-    # Apply new effect
-    _apply_transaction_to_account(account, transaction.direction, transaction.amount)
+    deltas[transaction.account_id] += _signed(transaction.direction, transaction.amount)
+    _adjust_balances(db, deltas)
+    invalidate_snapshots(db, transaction.account_id, transaction.transaction_date)
     db.commit()
     db.refresh(transaction)
     return transaction
 
 
+@retry_on_conflict
 def delete_transaction(db: Session, transaction_id: UUID) -> bool:
-    transaction = get_transaction(db, transaction_id)
+    transaction = _lock_transaction(db, transaction_id)
     if not transaction:
         return False
-    account = get_account(db, transaction.account_id)
-    _apply_transaction_to_account(account, "OUT" if transaction.direction == "IN" else "IN", transaction.amount)
+    _adjust_balances(db, {transaction.account_id: -_signed(transaction.direction, transaction.amount)})
+    invalidate_snapshots(db, transaction.account_id, transaction.transaction_date)
     db.delete(transaction)
     db.commit()
     return True
@@ -156,7 +200,7 @@ def delete_transaction(db: Session, transaction_id: UUID) -> bool:
 # Business operations
 # ---------------------------------------------------------------------------
 
-def create_payment_for_order(
+def _add_payment_for_order(
     db: Session,
     order_id: UUID,
     account_id: UUID,
@@ -173,9 +217,73 @@ def create_payment_for_order(
         amount=amount,
         description=description,
     )
-    transaction = create_transaction(db, transaction_in)
+    transaction = _add_transaction(db, transaction_in)
+    db.flush()
     # Update order status
     order.status = "TESLIM EDILDI"
+    publish_event(
+        db,
+        "payment.created",
+        order_id=order_id,
+        transaction_id=transaction.id,
+        amount=str(transaction.amount),
+    )
+    return transaction
+
+
+@retry_on_conflict
+def create_payment_for_order(
+    db: Session,
+    order_id: UUID,
+    account_id: UUID,
+    amount: Decimal,
+    description: str | None = None,
+) -> FinancialTransaction:
+    transaction = _add_payment_for_order(db, order_id, account_id, amount, description)
     db.commit()
-    db.refresh(order)
+    db.refresh(transaction)
     return transaction
+
+
+# ---------------------------------------------------------------------------
+# Idempotent variants, for clients that retry on timeouts
+# ---------------------------------------------------------------------------
+
+def _public(db: Session, transaction: FinancialTransaction) -> FinancialTransactionPublic:
+    db.flush()
+    db.refresh(transaction)
+    return FinancialTransactionPublic(
+        **{field: getattr(transaction, field) for field in FinancialTransactionPublic.__fields__}
+    )
+
+
+def create_transaction_once(
+    db: Session, transaction_in: FinancialTransactionCreate, idempotency_key: str
+) -> IdempotentResult:
+    return run_idempotent(
+        db,
+        "transactions.create",
+        idempotency_key,
+        transaction_in,
+        lambda: _add_transaction(db, transaction_in),
+        lambda transaction: _public(db, transaction),
+    )
+
+
+def create_payment_for_order_once(
+    db: Session,
+    order_id: UUID,
+    account_id: UUID,
+    amount: Decimal,
+    description: str | None,
+    idempotency_key: str,
+) -> IdempotentResult:
+    payload = {"order_id": order_id, "account_id": account_id, "amount": amount, "description": description}
+    return run_idempotent(
+        db,
+        "orders.payments.create",
+        idempotency_key,
+        payload,
+        lambda: _add_payment_for_order(db, order_id, account_id, amount, description),
+        lambda transaction: _public(db, transaction),
+    )
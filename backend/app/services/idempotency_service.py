@@ -0,0 +1,123 @@
+"""Idempotent execution of write requests carrying an ``Idempotency-Key``.
+
+The key is claimed by inserting its row as the first statement of the
+request's transaction, and the response is written to the same row before
+commit. A duplicate arriving meanwhile blocks on that insert until the
+first request finishes: after a commit it finds the stored response and
+returns it without running the operation; after a rollback it claims the
+key and runs the operation itself. Keys expire after ``IDEMPOTENCY_TTL``.
+
+Purge expired keys daily: ``python -m app.workers.idempotency_keys purge``.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.retry import retry_on_conflict
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+PURGE_BATCH_SIZE = 10_000
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a request with a different body."""
+
+
+@dataclass
+class IdempotentResult:
+    status_code: int
+    body: Any
+    replayed: bool
+
+
+def request_fingerprint(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def _claim(db: Session, scope: str, key: str, fingerprint: str, now: datetime) -> bool:
+    """Insert the key's row; ``False`` if another request already committed it."""
+    keys = IdempotencyKey.__table__
+    claimed = db.execute(
+        pg_insert(keys)
+        .values(scope=scope, key=key, request_hash=fingerprint, expires_at=now + IDEMPOTENCY_TTL)
+        .on_conflict_do_nothing(index_elements=[keys.c.scope, keys.c.key])
+        .returning(keys.c.key)
+    ).first()
+    return claimed is not None
+
+
+@retry_on_conflict
+def run_idempotent(
+    db: Session,
+    scope: str,
+    key: str,
+    payload: Any,
+    operation: Callable[[], Any],
+    serialize: Callable[[Any], Any],
+    status_code: int = 200,
+) -> IdempotentResult:
+    """Run ``operation`` once per ``(scope, key)`` and return its serialized result.
+
+    ``operation`` must not commit; it runs inside the transaction that holds
+    the key. Replays of an earlier request with the same ``payload`` get the
+    stored response; a different ``payload`` raises ``IdempotencyKeyReused``.
+    """
+    fingerprint = request_fingerprint(payload)
+    now = datetime.now(timezone.utc)
+    if not _claim(db, scope, key, fingerprint, now):
+        stored = db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key).with_for_update()
+        ).scalar_one()
+        if stored.expires_at > now:
+            if stored.request_hash != fingerprint:
+                db.rollback()
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            result = IdempotentResult(stored.status_code, stored.response, replayed=True)
+            db.rollback()
+            return result
+        # Expired: the key is free again.
+        db.delete(stored)
+        db.flush()
+        _claim(db, scope, key, fingerprint, now)
+    try:
+        body = jsonable_encoder(serialize(operation()))
+    except Exception:
+        # Releases the key, so a retry of a failed request runs again.
+        db.rollback()
+        raise
+    db.execute(
+        IdempotencyKey.__table__.update()
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status_code=status_code, response=body)
+    )
+    db.commit()
+    return IdempotentResult(status_code, body, replayed=False)
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete expired keys in batches, committing each; returns the number deleted."""
+    deleted = 0
+    while True:
+        expired = (
+            select(IdempotencyKey.scope, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+            .limit(PURGE_BATCH_SIZE)
+        )
+        result = db.execute(
+            delete(IdempotencyKey).where(tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(expired))
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < PURGE_BATCH_SIZE:
+            return deleted
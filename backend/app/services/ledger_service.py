@@ -0,0 +1,199 @@
+"""Point-in-time account balances from ledger snapshots.
+
+A snapshot stores an account's balance over every transaction dated before
+its ``as_of``, a UTC midnight. Snapshots are taken for each day that had
+transactions, so a balance as of any instant is the nearest earlier snapshot
+plus at most one day of transactions (more only if the job has not run).
+
+Editing or deleting a transaction removes the account's snapshots that
+covered it; the next ``take_balance_snapshots`` run recomputes them from the
+latest snapshot still standing. Days are only snapshotted once they are
+``SNAPSHOT_DELAY`` old, so transactions still in flight at midnight are
+counted. ``verify_balance_snapshots`` recomputes everything from the ledger
+and, with ``rebuild``, replaces snapshots that disagree.
+
+Run daily: ``python -m app.workers.balance_snapshots take``.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
+from sqlalchemy.orm import Session
+
+from app.models.account import Account
+from app.models.account_balance_snapshot import AccountBalanceSnapshot
+from app.models.financial_transaction import FinancialTransaction
+
+SNAPSHOT_DELAY = timedelta(minutes=15)
+
+_SIGNED_AMOUNT = "CASE WHEN t.direction = 'IN' THEN t.amount ELSE -t.amount END"
+
+# Daily balances after the latest snapshot of each account, one row per day with transactions.
+_PENDING_SNAPSHOTS = f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (account_id) account_id, as_of, balance, transaction_count
+        FROM account_balance_snapshots
+        ORDER BY account_id, as_of DESC
+    ),
+    daily AS (
+        SELECT t.account_id,
+               date_trunc('day', t.transaction_date, 'UTC') + interval '1 day' AS as_of,
+               SUM({_SIGNED_AMOUNT}) AS delta,
+               COUNT(*) AS n
+        FROM financial_transactions t
+        LEFT JOIN latest l ON l.account_id = t.account_id
+        WHERE t.transaction_date >= COALESCE(l.as_of, '-infinity')
+        GROUP BY 1, 2
+    )
+    SELECT d.account_id,
+           d.as_of,
+           COALESCE(l.balance, 0) + SUM(d.delta) OVER w AS balance,
+           COALESCE(l.transaction_count, 0) + SUM(d.n) OVER w AS transaction_count
+    FROM daily d
+    LEFT JOIN latest l ON l.account_id = d.account_id
+    WHERE d.as_of <= :cutoff
+    WINDOW w AS (PARTITION BY d.account_id ORDER BY d.as_of)
+"""
+
+# Every snapshot recomputed from the whole ledger.
+_EXPECTED_SNAPSHOTS = f"""
+    WITH daily AS (
+        SELECT t.account_id,
+               date_trunc('day', t.transaction_date, 'UTC') + interval '1 day' AS as_of,
+               SUM({_SIGNED_AMOUNT}) AS delta,
+               COUNT(*) AS n
+        FROM financial_transactions t
+        GROUP BY 1, 2
+    )
+    SELECT account_id,
+           as_of,
+           SUM(delta) OVER w AS balance,
+           SUM(n) OVER w AS transaction_count
+    FROM daily
+    WINDOW w AS (PARTITION BY account_id ORDER BY as_of)
+"""
+
+
+def _cutoff() -> datetime:
+    return datetime.now(timezone.utc) - SNAPSHOT_DELAY
+
+
+def invalidate_snapshots(db: Session, account_id: UUID, since: datetime) -> None:
+    """Drop the account's snapshots covering transactions dated ``since`` or later."""
+    db.query(AccountBalanceSnapshot).filter(
+        AccountBalanceSnapshot.account_id == account_id,
+        AccountBalanceSnapshot.as_of > since,
+    ).delete(synchronize_session=False)
+
+
+def take_balance_snapshots(db: Session) -> int:
+    """Snapshot every finished day after each account's latest snapshot; returns rows written."""
+    result = db.execute(
+        text(
+            f"""
+            INSERT INTO account_balance_snapshots (account_id, as_of, balance, transaction_count)
+            {_PENDING_SNAPSHOTS}
+            ON CONFLICT (account_id, as_of) DO NOTHING
+            """
+        ),
+        {"cutoff": _cutoff()},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def verify_balance_snapshots(db: Session, rebuild: bool = False) -> dict:
+    """Compare stored snapshots and current balances with the ledger.
+
+    With ``rebuild``, every account with a wrong or missing snapshot gets all
+    of its snapshots recomputed.
+    """
+    params = {"cutoff": _cutoff()}
+    mismatched = db.execute(
+        text(
+            f"""
+            WITH expected AS ({_EXPECTED_SNAPSHOTS})
+            SELECT DISTINCT COALESCE(e.account_id, s.account_id) AS account_id
+            FROM (SELECT * FROM expected WHERE as_of <= :cutoff) e
+            FULL OUTER JOIN account_balance_snapshots s
+                ON s.account_id = e.account_id AND s.as_of = e.as_of
+            WHERE e.account_id IS NULL
+               OR s.account_id IS NULL
+               OR s.balance <> e.balance
+               OR s.transaction_count <> e.transaction_count
+            """
+        ).columns(account_id=PGUUID(as_uuid=True)),
+        params,
+    ).scalars().all()
+    signed = case(
+        (FinancialTransaction.direction == "IN", FinancialTransaction.amount),
+        else_=-FinancialTransaction.amount,
+    )
+    ledger = (
+        db.query(FinancialTransaction.account_id, func.sum(signed).label("total"))
+        .group_by(FinancialTransaction.account_id)
+        .subquery()
+    )
+    drifted = [
+        account_id
+        for (account_id,) in db.query(Account.id)
+        .outerjoin(ledger, ledger.c.account_id == Account.id)
+        .filter(Account.current_balance != func.coalesce(ledger.c.total, 0))
+    ]
+
+    rebuilt = 0
+    if rebuild and mismatched:
+        db.query(AccountBalanceSnapshot).filter(
+            AccountBalanceSnapshot.account_id.in_(mismatched)
+        ).delete(synchronize_session=False)
+        statement = text(
+            f"""
+            INSERT INTO account_balance_snapshots (account_id, as_of, balance, transaction_count)
+            SELECT account_id, as_of, balance, transaction_count
+            FROM ({_EXPECTED_SNAPSHOTS}) e
+            WHERE as_of <= :cutoff AND account_id = ANY(:accounts)
+            """
+        ).bindparams(bindparam("accounts", type_=ARRAY(PGUUID(as_uuid=True))))
+        rebuilt = db.execute(statement, {**params, "accounts": list(mismatched)}).rowcount
+        db.commit()
+    return {
+        "accounts_with_bad_snapshots": [str(account_id) for account_id in mismatched],
+        "accounts_with_balance_drift": [str(account_id) for account_id in drifted],
+        "snapshots_rebuilt": rebuilt,
+    }
+
+
+def balance_as_of(db: Session, account_id: UUID, as_of: datetime) -> Optional[dict]:
+    """Balance over transactions dated up to and including ``as_of``; ``None`` if no such account."""
+    if not db.query(Account.id).filter(Account.id == account_id).first():
+        return None
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    snapshot = (
+        db.query(AccountBalanceSnapshot)
+        .filter(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.as_of <= as_of)
+        .order_by(AccountBalanceSnapshot.as_of.desc())
+        .first()
+    )
+    signed = case(
+        (FinancialTransaction.direction == "IN", FinancialTransaction.amount),
+        else_=-FinancialTransaction.amount,
+    )
+    query = db.query(func.coalesce(func.sum(signed), 0), func.count(FinancialTransaction.id)).filter(
+        FinancialTransaction.account_id == account_id,
+        FinancialTransaction.transaction_date <= as_of,
+    )
+    if snapshot is not None:
+        query = query.filter(FinancialTransaction.transaction_date >= snapshot.as_of)
+    delta, scanned = query.one()
+    base = Decimal(snapshot.balance) if snapshot is not None else Decimal("0")
+    return {
+        "balance": base + Decimal(delta),
+        "as_of": as_of,
+        "snapshot_as_of": snapshot.as_of if snapshot is not None else None,
+        "transactions_scanned": scanned,
+    }
@@ -0,0 +1,109 @@
+"""Monthly partitions of ``production_logs``.
+
+Migration ``0009`` turns ``production_logs`` into a table partitioned by
+range of ``completed_at``, one partition per UTC month named
+``production_logs_pYYYY_MM`` plus ``production_logs_default`` for rows no
+month partition covers. ``ensure_log_partitions`` runs at startup and from
+``python -m app.workers.log_partitions ensure`` (cron) to keep months ahead
+created; ``archive_log_partitions`` detaches old months and moves them to the
+``archive`` schema or drops them. Rollups and per-station counters keep their
+totals, only the raw log history of archived months leaves the API.
+
+Creating a month fails if the default partition already holds rows for it;
+move those rows out first.
+"""
+
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+PARENT_TABLE = "production_logs"
+MONTHS_AHEAD = 3
+ARCHIVE_SCHEMA = "archive"
+# Serialises partition DDL between workers starting at the same time.
+PARTITION_LOCK_KEY = 727_001
+
+_PARTITION_NAME = re.compile(r"^production_logs_p(\d{4})_(\d{2})$")
+
+
+def _add_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def list_log_partitions(db: Session) -> List[dict]:
+    """Month partitions currently attached, oldest first, with estimated row counts."""
+    rows = db.execute(
+        text(
+            """
+            SELECT child.relname, child.reltuples
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = []
+    for name, reltuples in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(
+                {"name": name, "month": month, "estimated_rows": max(int(reltuples), 0)}
+            )
+    return sorted(partitions, key=lambda partition: partition["month"])
+
+
+def ensure_log_partitions(
+    db: Session, months_ahead: int = MONTHS_AHEAD, today: Optional[date] = None
+) -> List[str]:
+    """Create the partitions for this month and ``months_ahead`` more; returns those created."""
+    db.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+    existing = {partition["month"] for partition in list_log_partitions(db)}
+    month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+    created = []
+    for _ in range(months_ahead + 1):
+        following = _add_month(month)
+        if month not in existing:
+            name = _partition_name(month)
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') "
+                    f"TO ('{following.isoformat()} 00:00+00')"
+                )
+            )
+            created.append(name)
+        month = following
+    db.commit()
+    return created
+
+
+def archive_log_partitions(db: Session, before: date, drop: bool = False) -> List[str]:
+    """Detach every month partition ending on or before ``before``; returns their names.
+
+    Detached partitions move to the ``archive`` schema, or are dropped with ``drop``.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+    archived = []
+    for partition in list_log_partitions(db):
+        if _add_month(partition["month"]) > before:
+            continue
+        name = partition["name"]
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        else:
+            db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        archived.append(name)
+    db.commit()
+    return archived
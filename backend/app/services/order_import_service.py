@@ -0,0 +1,249 @@
+"""Service layer for bulk order imports.
+
+Dealer order books arrive as NDJSON or CSV streams where every line is one
+order item and consecutive lines sharing an ``order_ref`` make up one order.
+Lines are grouped into orders, orders into batches, and each batch is written
+with a handful of set-based statements instead of several round trips per
+line.
+"""
+
+import csv
+import json
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.outbox_event import OutboxEvent
+from app.models.partner import Partner
+from app.schemas.order import OrderImportLine, OrderImportResult
+from app.services.order_service import TAX_RATE, _line_total
+from app.services.product_service import get_product_prices
+from app.services.production_service import CREATE_JOBS_TOPIC, create_jobs_payload
+
+DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+IMPORT_BATCH_SIZE = 500
+CSV_FIELDS = ["order_ref", "partner_id", "status", "product_id", "width", "height", "quantity"]
+
+
+@dataclass
+class ImportedOrder:
+    order_ref: Optional[str]
+    lines: List[OrderImportLine] = field(default_factory=list)
+    error: Optional[str] = None
+    line_count: int = 0
+
+
+class OrderLineParser:
+    """Turns raw NDJSON or CSV lines into validated ``OrderImportLine`` objects.
+
+    A quoted CSV field may span lines; its record is parsed once the quotes
+    balance, so call ``finish`` at the end of the stream.
+    """
+
+    def __init__(self, fmt: str) -> None:
+        if fmt not in ("ndjson", "csv"):
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self._header: Optional[List[str]] = None
+        self._record: List[str] = []
+
+    @property
+    def expects_header(self) -> bool:
+        return self.fmt == "csv" and self._header is None
+
+    def parse(self, line: str) -> Optional[dict]:
+        """Return the raw row for ``line``, or ``None`` for blank, header and unfinished lines."""
+        if self.fmt == "ndjson":
+            line = line.strip()
+            if not line:
+                return None
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("Expected a JSON object per line")
+            return row
+        if self._record:
+            line = line.rstrip("\r\n")
+        else:
+            line = line.strip()
+            if not line:
+                return None
+        self._record.append(line)
+        # An odd number of quotes so far means a quoted field continues on the next line.
+        if sum(part.count('"') for part in self._record) % 2:
+            return None
+        record, self._record = self._record, []
+        values = next(csv.reader([f"{part}\n" for part in record]))
+        if self._header is None:
+            header = [value.strip() for value in values]
+            missing = set(CSV_FIELDS) - set(header)
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            self._header = header
+            return None
+        return dict(zip(self._header, values))
+
+    def finish(self) -> None:
+        """Raise ``ValueError`` if the stream ended inside a quoted field."""
+        if self._record:
+            self._record = []
+            raise ValueError("Unterminated quoted field")
+
+
+class OrderBatcher:
+    """Groups consecutive lines into orders and orders into import batches."""
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self._current: Optional[ImportedOrder] = None
+        self._batch: List[ImportedOrder] = []
+        self._rows_seen = 0
+
+    def add(self, row: Optional[dict], error: Optional[str] = None) -> Optional[List[ImportedOrder]]:
+        """Add a raw row (or a parse error) and return a batch once one is full."""
+        self._rows_seen += 1
+        if row is None:
+            # A line that failed to parse has no order_ref; it fails the order
+            # that is open, and the rest of that order's lines stay with it.
+            if self._current is None:
+                self._current = ImportedOrder(order_ref=None)
+        else:
+            order_ref = str(row["order_ref"]) if row.get("order_ref") is not None else None
+            if order_ref is None or self._current is None or order_ref != self._current.order_ref:
+                self._close_current()
+                self._current = ImportedOrder(order_ref=order_ref)
+        order = self._current
+        order.line_count += 1
+        if order.error:
+            return self._take_full_batch()
+        if error:
+            order.error = f"Row {self._rows_seen}: {error}"
+            return self._take_full_batch()
+        try:
+            order.lines.append(OrderImportLine(**row))
+        except ValidationError as exc:
+            order.error = f"Row {self._rows_seen}: {exc.errors()[0]['msg']}"
+        return self._take_full_batch()
+
+    def flush(self) -> List[ImportedOrder]:
+        self._close_current()
+        batch, self._batch = self._batch, []
+        return batch
+
+    def _close_current(self) -> None:
+        if self._current is not None:
+            self._batch.append(self._current)
+            self._current = None
+
+    def _take_full_batch(self) -> Optional[List[ImportedOrder]]:
+        if len(self._batch) < self.batch_size:
+            return None
+        batch, self._batch = self._batch, []
+        return batch
+
+
+def _failure(order: ImportedOrder, error: str) -> OrderImportResult:
+    return OrderImportResult(
+        order_ref=order.order_ref, line_count=order.line_count, success=False, error=error
+    )
+
+
+def import_order_batch(db: Session, orders: List[ImportedOrder]) -> List[OrderImportResult]:
+    """Insert a batch of parsed orders with one statement per table.
+
+    Products and partners referenced by the batch are resolved in one query
+    each; orders referring to unknown rows are reported as failures and the
+    remaining orders are still imported.
+    """
+    results: Dict[int, OrderImportResult] = {}
+    valid = []
+    for index, order in enumerate(orders):
+        if order.error:
+            results[index] = _failure(order, order.error)
+        elif not order.lines:
+            results[index] = _failure(order, "Order has no lines")
+        elif len({(line.partner_id, line.status) for line in order.lines}) > 1:
+            results[index] = _failure(order, "Order lines disagree on partner_id or status")
+        else:
+            valid.append((index, order))
+
+    product_ids = {line.product_id for _, order in valid for line in order.lines}
+    partner_ids = {order.lines[0].partner_id for _, order in valid}
+    prices = {}
+    known_partners = set()
+    if valid:
+        prices = get_product_prices(db, product_ids)
+        known_partners = {
+            partner_id for (partner_id,) in db.query(Partner.id).filter(Partner.id.in_(partner_ids))
+        }
+
+    order_rows, item_rows, outbox_rows = [], [], []
+    for index, order in valid:
+        head = order.lines[0]
+        if head.partner_id not in known_partners:
+            results[index] = _failure(order, "Partner not found")
+            continue
+        if any(line.product_id not in prices for line in order.lines):
+            results[index] = _failure(order, "Product not found")
+            continue
+        order_id = uuid.uuid4()
+        total_amount = Decimal("0")
+        item_ids = []
+        for line in order.lines:
+            item_id = uuid.uuid4()
+            unit_price = prices[line.product_id]
+            total_price = _line_total(unit_price, line.width, line.height, line.quantity)
+            total_amount += total_price
+            item_rows.append(
+                {
+                    "id": item_id,
+                    "organization_id": DEFAULT_ORGANIZATION_ID,
+                    "order_id": order_id,
+                    "product_id": line.product_id,
+                    "width": line.width,
+                    "height": line.height,
+                    "quantity": line.quantity,
+                    "unit_price": unit_price,
+                    "total_price": total_price,
+                }
+            )
+            item_ids.append(item_id)
+        outbox_rows.append(
+            {"id": uuid.uuid4(), "topic": CREATE_JOBS_TOPIC, "payload": create_jobs_payload(item_ids)}
+        )
+        tax_amount = total_amount * TAX_RATE
+        order_rows.append(
+            {
+                "id": order_id,
+                "organization_id": DEFAULT_ORGANIZATION_ID,
+                "partner_id": head.partner_id,
+                "status": head.status,
+                "total_amount": total_amount,
+                "tax_amount": tax_amount,
+                "grand_total": total_amount + tax_amount,
+            }
+        )
+        results[index] = OrderImportResult(
+            order_ref=order.order_ref, order_id=order_id, line_count=order.line_count, success=True
+        )
+
+    if order_rows:
+        try:
+            db.execute(insert(Order.__table__), order_rows)
+            db.execute(insert(OrderItem.__table__), item_rows)
+            db.execute(insert(OutboxEvent.__table__), outbox_rows)
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            error = f"Batch rejected by database: {exc.__class__.__name__}"
+            for index, result in results.items():
+                if result.success:
+                    results[index] = _failure(orders[index], error)
+    return [results[index] for index in range(len(orders))]
@@ -1,31 +1,66 @@
 """Service layer for order operations."""
 
 import uuid
-from decimal import Decimal
-from typing import List, Optional
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.order import Order
 from app.models.order_item import OrderItem
-from app.models.product import Product
+from app.models.production_log import ProductionLog
 from app.schemas.order import OrderCreate, OrderUpdate
-from app.services.production_service import create_job_from_order_item
+from app.schemas.order_item import OrderItemUpdate
+from app.services.event_service import publish_event
+from app.services.pagination import paginate
+from app.services.product_service import get_product_price
+from app.services.production_service import enqueue_job_creation, resize_job
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 TAX_RATE = Decimal("0.18")
+CENT = Decimal("0.01")
 
 
-def _create_order_item(db: Session, order_id: UUID, item_in) -> Decimal:
-    """Helper to create an order item and return its total price."""
-    product = db.query(Product).filter(Product.id == item_in.product_id).first()
-    if not product:
+def _line_total(unit_price: Decimal, width: int, height: int, quantity: int) -> Decimal:
+    """Price of ``quantity`` panes of ``width`` x ``height`` millimetres."""
+    area_sqm = (Decimal(width) * Decimal(height)) / Decimal(1_000_000)
+    return unit_price * area_sqm * quantity
+
+
+def _round_cents(amount: Decimal) -> Decimal:
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _item_total(item) -> Decimal:
+    """Unrounded line total of a stored or pending ``OrderItem``."""
+    return _line_total(Decimal(item.unit_price), item.width, item.height, item.quantity)
+
+
+def _order_totals(line_totals: Iterable[Decimal]) -> Tuple[Decimal, Decimal, Decimal]:
+    """Total, tax and grand total of unrounded line totals, each rounded to cents once.
+
+    This is the rounding the quote engine in ``pricing_service`` applies.
+    """
+    raw_total = sum(line_totals, Decimal("0"))
+    tax = raw_total * TAX_RATE
+    return _round_cents(raw_total), _round_cents(tax), _round_cents(raw_total + tax)
+
+
+def _set_totals(order: Order, items: Iterable[OrderItem]) -> None:
+    totals = _order_totals(_item_total(item) for item in items)
+    order.total_amount, order.tax_amount, order.grand_total = totals
+
+
+def _create_order_item(db: Session, order_id: UUID, item_in) -> OrderItem:
+    """Helper to create an order item; callers enqueue its production jobs."""
+    unit_price = get_product_price(db, item_in.product_id)
+    if unit_price is None:
         raise ValueError("Product not found")
-    unit_price = product.base_price_sqm
-    area_sqm = (Decimal(item_in.width) * Decimal(item_in.height)) / Decimal(1_000_000)
-    total_price = unit_price * area_sqm * item_in.quantity
+    total_price = _line_total(unit_price, item_in.width, item_in.height, item_in.quantity)
     order_item = OrderItem(
+        id=uuid.uuid4(),
         organization_id=DEFAULT_ORGANIZATION_ID,
         order_id=order_id,
         product_id=item_in.product_id,
@@ -33,12 +68,10 @@ def _create_order_item(db: Session, order_id: UUID, item_in) -> Decimal:
         height=item_in.height,
         quantity=item_in.quantity,
         unit_price=unit_price,
-        total_price=total_price,
+        total_price=_round_cents(total_price),
     )
     db.add(order_item)
-    db.flush()
-    create_job_from_order_item(db, order_item.id)
-    return total_price
+    return order_item
 
 
 def create_order(db: Session, order_in: OrderCreate) -> Order:
@@ -49,26 +82,29 @@ def create_order(db: Session, order_in: OrderCreate) -> Order:
     )
     db.add(order)
     db.flush()
-    total_amount = Decimal("0")
-    for item in order_in.order_items:
-        total_amount += _create_order_item(db, order.id, item)
-    order.total_amount = total_amount
-    order.tax_amount = total_amount * TAX_RATE
-    order.grand_total = order.total_amount + order.tax_amount
-    db.commit()
-    db.refresh(order)
-    order.order_items = (
-        db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    items = [_create_order_item(db, order.id, item) for item in order_in.order_items]
+    if items:
+        # One outbox row per order, as the bulk import writes.
+        enqueue_job_creation(db, [item.id for item in items])
+    _set_totals(order, items)
+    publish_event(
+        db,
+        "order.created",
+        order_id=order.id,
+        partner_id=order.partner_id,
+        grand_total=str(order.grand_total),
     )
-    return order
+    db.commit()
+    return get_order(db, order.id)
 
 
 def get_order(db: Session, order_id: UUID) -> Optional[Order]:
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        return None
-    order.order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
-    return order
+    return (
+        db.query(Order)
+        .options(selectinload(Order.order_items))
+        .filter(Order.id == order_id)
+        .first()
+    )
 
 
 def get_orders(
@@ -77,20 +113,87 @@ def get_orders(
     page_size: int = 10,
     partner_id: UUID | None = None,
     status: str | None = None,
+    cursor: str | None = None,
 ) -> List[Order]:
-    query = db.query(Order)
+    # Items for the whole page are fetched in one extra SELECT ... IN query.
+    query = db.query(Order).options(selectinload(Order.order_items))
     if partner_id:
         query = query.filter(Order.partner_id == partner_id)
     if status:
         query = query.filter(Order.status == status)
-    orders = query.offset((page - 1) * page_size).limit(page_size).all()
-    for order in orders:
-        order.order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-    return orders
+    return paginate(query, Order, page, page_size, cursor)
+
+
+def _item_key(item) -> tuple:
+    return (item.product_id, item.width, item.height, item.quantity)
+
+
+def _sync_order_items(db: Session, order: Order, items_in: List[OrderItemUpdate]) -> List[OrderItem]:
+    """Apply only the differences between the order's items and ``items_in``.
+
+    Returns the order's items after the change. Unchanged lines and their
+    production jobs are not touched.
+    """
+    existing = {item.id: item for item in order.order_items}
+    unmatched = dict(existing)
+    updates = []
+    pending = []
+    for item_in in items_in:
+        if item_in.id is None:
+            pending.append(item_in)
+            continue
+        item = unmatched.pop(item_in.id, None)
+        if item is None:
+            raise ValueError("Order item not found")
+        if _item_key(item) != _item_key(item_in):
+            updates.append((item, item_in))
+
+    by_key = defaultdict(list)
+    for item in unmatched.values():
+        by_key[_item_key(item)].append(item)
+    inserts = []
+    for item_in in pending:
+        same = by_key.get(_item_key(item_in))
+        if same:
+            unmatched.pop(same.pop().id)
+        else:
+            inserts.append(item_in)
+    removed = list(unmatched.values())
+
+    if removed:
+        job_ids = [job.id for item in removed for job in item.production_jobs]
+        if job_ids and db.query(ProductionLog.job_id).filter(ProductionLog.job_id.in_(job_ids)).first():
+            raise ValueError("Cannot remove an order item with production progress")
+        for item in removed:
+            for job in item.production_jobs:
+                db.delete(job)
+            order.order_items.remove(item)
+    for item, item_in in updates:
+        unit_price = get_product_price(db, item_in.product_id)
+        if unit_price is None:
+            raise ValueError("Product not found")
+        total_price = _line_total(unit_price, item_in.width, item_in.height, item_in.quantity)
+        item.product_id = item_in.product_id
+        item.width = item_in.width
+        item.height = item_in.height
+        item.quantity = item_in.quantity
+        item.unit_price = unit_price
+        item.total_price = _round_cents(total_price)
+        for job in item.production_jobs:
+            resize_job(job, item.quantity)
+    created = [_create_order_item(db, order.id, item_in) for item_in in inserts]
+    if created:
+        enqueue_job_creation(db, [item.id for item in created])
+    return list(order.order_items) + created
 
 
 def update_order(db: Session, order_id: UUID, order_in: OrderUpdate) -> Optional[Order]:
-    order = db.query(Order).filter(Order.id == order_id).first()
+    query = db.query(Order)
+    if order_in.order_items is not None:
+        query = query.options(
+            selectinload(Order.order_items).selectinload(OrderItem.production_jobs)
+        )
+    order = query.filter(Order.id == order_id).first()
     if not order:
         return None
     for field in ["partner_id", "status"]:
@@ -98,18 +201,10 @@ def update_order(db: Session, order_id: UUID, order_in: OrderUpdate) -> Optional
         if value is not None:
             setattr(order, field, value)
     if order_in.order_items is not None:
-        db.query(OrderItem).filter(OrderItem.order_id == order.id).delete()
-        db.flush()
-        total_amount = Decimal("0")
-        for item in order_in.order_items:
-            total_amount += _create_order_item(db, order.id, item)
-        order.total_amount = total_amount
-        order.tax_amount = total_amount * TAX_RATE
-        order.grand_total = order.total_amount + order.tax_amount
+        # Recomputed from every line, exactly as create_order prices a new order.
+        _set_totals(order, _sync_order_items(db, order, order_in.order_items))
     db.commit()
-    db.refresh(order)
-    order.order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-    return order
+    return get_order(db, order.id)
 
 
 def delete_order(db: Session, order_id: UUID) -> bool:
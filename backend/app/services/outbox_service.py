@@ -0,0 +1,130 @@
+"""Service layer for the transactional outbox.
+
+Request handlers ``enqueue`` events in the same transaction as the data they
+describe. Workers (``python -m app.workers.outbox_worker``) claim events with
+``FOR UPDATE SKIP LOCKED``, so any number of them can run side by side, and
+hand each topic's batch to the handler registered for it.
+"""
+
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+
+Handler = Callable[[Session, List[dict]], None]
+_handlers: Dict[str, Handler] = {}
+
+
+@dataclass
+class OutboxStats:
+    """Counters of the outbox worker running in this process."""
+
+    batches: int = 0
+    processed: int = 0
+    failed: int = 0
+    last_batch_seconds: float = 0.0
+    last_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+
+stats = OutboxStats()
+
+
+def register_handler(topic: str, handler: Handler) -> None:
+    """``handler(db, payloads)`` must apply a whole batch of events of ``topic``."""
+    _handlers[topic] = handler
+
+
+def enqueue(db: Session, topic: str, payload: dict) -> None:
+    db.add(OutboxEvent(id=uuid.uuid4(), topic=topic, payload=payload))
+
+
+def _apply(db: Session, topic: str, events: List[OutboxEvent]) -> List[OutboxEvent]:
+    """Run the handler for ``events``; returns the events that failed."""
+    handler = _handlers.get(topic)
+    if handler is None:
+        error = f"No handler for topic {topic}"
+        for event in events:
+            event.attempts += 1
+            event.last_error = error
+        return events
+    try:
+        with db.begin_nested():
+            handler(db, [event.payload for event in events])
+    except Exception as exc:
+        if len(events) == 1:
+            logger.exception("Outbox event %s failed", events[0].id)
+            events[0].attempts += 1
+            events[0].last_error = str(exc)[:255]
+            return events
+        # Find the offending events instead of failing the whole batch.
+        failed = []
+        for event in events:
+            failed.extend(_apply(db, topic, [event]))
+        return failed
+    for event in events:
+        db.delete(event)
+    return []
+
+
+def process_outbox_batch(db: Session, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """Claim up to ``limit`` events, apply them and commit; returns how many were claimed."""
+    started = time.monotonic()
+    events = (
+        db.query(OutboxEvent)
+        .filter(OutboxEvent.attempts < MAX_ATTEMPTS)
+        .order_by(OutboxEvent.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not events:
+        db.rollback()
+        return 0
+    now = datetime.now(timezone.utc)
+    lag = max((now - event.created_at).total_seconds() for event in events)
+
+    by_topic = defaultdict(list)
+    for event in events:
+        by_topic[event.topic].append(event)
+    failed = []
+    for topic, topic_events in by_topic.items():
+        failed.extend(_apply(db, topic, topic_events))
+    db.commit()
+
+    stats.batches += 1
+    stats.processed += len(events) - len(failed)
+    stats.failed += len(failed)
+    stats.last_batch_seconds = time.monotonic() - started
+    stats.last_lag_seconds = lag
+    stats.max_lag_seconds = max(stats.max_lag_seconds, lag)
+    return len(events)
+
+
+def outbox_lag(db: Session) -> dict:
+    """Backlog as seen from the database, independent of which worker reads it."""
+    pending, oldest = (
+        db.query(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at))
+        .filter(OutboxEvent.attempts < MAX_ATTEMPTS)
+        .one()
+    )
+    dead = db.query(func.count(OutboxEvent.id)).filter(OutboxEvent.attempts >= MAX_ATTEMPTS).scalar()
+    oldest_age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    return {"pending": pending, "oldest_pending_seconds": oldest_age, "dead": dead}
+
+
+def worker_stats() -> dict:
+    return asdict(stats)
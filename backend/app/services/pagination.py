@@ -0,0 +1,66 @@
+"""Keyset pagination helpers shared by the list services.
+
+Lists are ordered newest first on ``(created_at, id)``. A cursor is the
+url-safe base64 encoding of the last row's sort key; the next page starts
+strictly after it, so deep pages cost the same as the first one.
+
+List endpoints return a plain JSON array, as they always have, and advertise
+the next page in the ``X-Next-Cursor`` header and a ``Link: rel="next"``
+header, so clients that ignore them keep working.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def paginate(
+    query: Query, model, page: int = 1, page_size: int = 10, cursor: str | None = None
+) -> List:
+    """Apply the stable ordering plus either the cursor or the deprecated page offset."""
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size).all()
+
+
+def next_cursor(items: Sequence, page_size: int) -> Optional[str]:
+    """Cursor for the page after ``items``, or ``None`` when this page was the last."""
+    if not items or len(items) < page_size:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(request: Request, response: Response, items: Sequence, page_size: int) -> None:
+    """Point ``response`` at the page after ``items`` unless this page was the last."""
+    cursor = next_cursor(items, page_size)
+    if cursor is None:
+        return
+    url = request.url.remove_query_params("page").include_query_params(cursor=cursor)
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{url}>; rel="next"'
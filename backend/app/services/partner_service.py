@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.models.partner import Partner
 from app.schemas.partner import PartnerCreate, PartnerUpdate
+from app.services.pagination import paginate
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
@@ -34,11 +35,12 @@ def get_partners(
     page: int = 1,
     page_size: int = 10,
     search_query: str | None = None,
+    cursor: str | None = None,
 ) -> List[Partner]:
     query = db.query(Partner)
     if search_query:
         query = query.filter(Partner.name.ilike(f"%{search_query}%"))
-    return query.offset((page - 1) * page_size).limit(page_size).all()
+    return paginate(query, Partner, page, page_size, cursor)
 
 
 def update_partner(
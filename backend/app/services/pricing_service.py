@@ -0,0 +1,92 @@
+"""Service layer for pricing order lines without writing anything.
+
+Prices are computed column-wise over a whole batch of lines using integer
+fixed-point values: unit prices in cents and areas in square millimetres.
+A line's exact value is ``cents * width * height * quantity`` in units of
+1e-8, which is the same number ``_line_total`` produces with ``Decimal``.
+Rounding to cents happens once, half away from zero, matching how
+PostgreSQL stores the unrounded ``Decimal`` into ``Numeric(10, 2)``.
+"""
+
+from decimal import Decimal
+from typing import List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.schemas.order import OrderQuote, OrderQuoteLine
+from app.schemas.order_item import OrderItemCreate
+from app.services.order_service import TAX_RATE
+from app.services.product_service import get_product_prices
+
+SQMM_PER_SQM = 1_000_000
+_TAX_NUMERATOR, _TAX_DENOMINATOR = TAX_RATE.as_integer_ratio()
+
+
+def _round_div(numerator: int, denominator: int) -> int:
+    """Divide and round half away from zero, like PostgreSQL ``numeric``."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def _cents(amount: Decimal) -> int:
+    return int(amount.scaleb(2))
+
+
+def _money(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def price_lines(
+    unit_prices: Sequence[int],
+    widths: Sequence[int],
+    heights: Sequence[int],
+    quantities: Sequence[int],
+) -> Tuple[List[int], int, int, int]:
+    """Price a batch of lines given as parallel columns.
+
+    ``unit_prices`` are per square metre in cents, dimensions in millimetres.
+    Returns line totals plus order total, tax and grand total, all in cents.
+    """
+    raw = [p * w * h * q for p, w, h, q in zip(unit_prices, widths, heights, quantities)]
+    line_totals = [_round_div(value, SQMM_PER_SQM) for value in raw]
+    raw_total = sum(raw)
+    scale = SQMM_PER_SQM * _TAX_DENOMINATOR
+    total_amount = _round_div(raw_total, SQMM_PER_SQM)
+    tax_amount = _round_div(raw_total * _TAX_NUMERATOR, scale)
+    grand_total = _round_div(raw_total * (_TAX_DENOMINATOR + _TAX_NUMERATOR), scale)
+    return line_totals, total_amount, tax_amount, grand_total
+
+
+def quote_order_items(db: Session, items: List[OrderItemCreate]) -> OrderQuote:
+    product_ids = {item.product_id for item in items}
+    prices = get_product_prices(db, product_ids)
+    if len(prices) != len(product_ids):
+        raise ValueError("Product not found")
+
+    unit_prices = [_cents(prices[item.product_id]) for item in items]
+    widths = [item.width for item in items]
+    heights = [item.height for item in items]
+    quantities = [item.quantity for item in items]
+    line_totals, total_amount, tax_amount, grand_total = price_lines(
+        unit_prices, widths, heights, quantities
+    )
+    lines = [
+        OrderQuoteLine(
+            product_id=item.product_id,
+            width=item.width,
+            height=item.height,
+            quantity=item.quantity,
+            area_sqm=Decimal(item.width * item.height).scaleb(-6),
+            unit_price=_money(unit_price),
+            total_price=_money(line_total),
+        )
+        for item, unit_price, line_total in zip(items, unit_prices, line_totals)
+    ]
+    return OrderQuote(
+        lines=lines,
+        total_amount=_money(total_amount),
+        tax_amount=_money(tax_amount),
+        grand_total=_money(grand_total),
+    )
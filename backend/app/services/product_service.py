@@ -1,15 +1,75 @@
 """Service layer for product operations."""
 
 import uuid
-from typing import List, Optional
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
 
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db.notify import listener, notify
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.pagination import paginate
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+PRODUCT_CHANNEL = "product_changed"
+
+settings = get_settings()
+
+# Unit prices by product id, shared by every request in this worker.
+product_price_cache = TTLCache(
+    "product_prices",
+    max_entries=settings.product_cache_max_entries,
+    ttl=settings.product_cache_ttl_seconds,
+)
+
+
+def _on_product_changed(payload: str) -> None:
+    product_price_cache.invalidate(UUID(payload))
+
+
+listener.subscribe(PRODUCT_CHANNEL, _on_product_changed, on_reset=product_price_cache.clear)
+metrics.register("product_price_cache", product_price_cache.stats)
+
+
+def warm_product_cache(db: Session) -> int:
+    """Load the catalogue prices into the cache; returns the number of entries."""
+    generation = product_price_cache.generation
+    rows = (
+        db.query(Product.id, Product.base_price_sqm)
+        .limit(product_price_cache.max_entries)
+        .all()
+    )
+    for product_id, price in rows:
+        product_price_cache.set(product_id, price, generation)
+    return len(rows)
+
+
+def get_product_prices(db: Session, product_ids: Iterable[UUID]) -> Dict[UUID, Decimal]:
+    """Return ``base_price_sqm`` per product; unknown ids are simply absent."""
+    prices = {}
+    missing = []
+    for product_id in set(product_ids):
+        price = product_price_cache.get(product_id)
+        if price is None:
+            missing.append(product_id)
+        else:
+            prices[product_id] = price
+    if missing:
+        generation = product_price_cache.generation
+        rows = db.query(Product.id, Product.base_price_sqm).filter(Product.id.in_(missing))
+        for product_id, price in rows:
+            product_price_cache.set(product_id, price, generation)
+            prices[product_id] = price
+    return prices
+
+
+def get_product_price(db: Session, product_id: UUID) -> Optional[Decimal]:
+    return get_product_prices(db, [product_id]).get(product_id)
 
 
 def create_product(db: Session, product_in: ProductCreate) -> Product:
@@ -33,11 +93,12 @@ def get_products(
     page: int = 1,
     page_size: int = 10,
     search_query: str | None = None,
+    cursor: str | None = None,
 ) -> List[Product]:
     query = db.query(Product)
     if search_query:
         query = query.filter(Product.name.ilike(f"%{search_query}%"))
-    return query.offset((page - 1) * page_size).limit(page_size).all()
+    return paginate(query, Product, page, page_size, cursor)
 
 
 def update_product(
@@ -48,7 +109,9 @@ def update_product(
         return None
     for field, value in product_in.dict(exclude_unset=True).items():
         setattr(product, field, value)
+    notify(db, PRODUCT_CHANNEL, str(product_id))
     db.commit()
+    product_price_cache.invalidate(product_id)
     db.refresh(product)
     return product
 
@@ -58,5 +121,7 @@ def delete_product(db: Session, product_id: UUID) -> bool:
     if not product:
         return False
     db.delete(product)
+    notify(db, PRODUCT_CHANNEL, str(product_id))
     db.commit()
+    product_price_cache.invalidate(product_id)
     return True
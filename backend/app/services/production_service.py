@@ -1,51 +1,93 @@
-"""Service layer for production operations."""
+"""Service layer for production operations.
+
+Progress is applied with ``UPDATE ... SET quantity_produced =
+quantity_produced + x RETURNING`` and the status is derived in the same
+statement, so concurrent scans for one job never lose an increment.
+"""
 
 import uuid
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, case, column, func, insert, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.order_item import OrderItem
 from app.models.production_job import ProductionJob
+from app.models.production_job_station import ProductionJobStation
 from app.models.production_log import ProductionLog
-from app.models.production_station import ProductionStation
-from app.schemas.production import ProductionLogCreate
+from app.schemas.production import ProductionJobUpdate, ProductionLogBatchItem, ProductionLogCreate
+from app.services.analytics_service import record_logs
+from app.services.event_service import publish_event, publish_events
+from app.services.outbox_service import enqueue, register_handler
+from app.services.pagination import paginate
+from app.services.station_registry import station_registry
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
-DEFAULT_STATIONS = [
-    ("Cam Kesim", "CAM_KESIM", 1),
-    ("Pres", "PRES", 2),
-]
-
-
-def _ensure_default_stations(db: Session) -> None:
-    for name, code, order_index in DEFAULT_STATIONS:
-        exists = db.query(ProductionStation).filter(ProductionStation.code == code).first()
-        if not exists:
-            station = ProductionStation(
-                organization_id=DEFAULT_ORGANIZATION_ID,
-                name=name,
-                code=code,
-                order_index=order_index,
-            )
-            db.add(station)
-    db.flush()
+CREATE_JOBS_TOPIC = "production_jobs.create"
+MAX_LOG_BATCH_SIZE = 1000
+
+
+def _derive_job_status(quantity_produced: int, quantity_required: int) -> str:
+    if quantity_produced >= quantity_required:
+        return "COMPLETED"
+    if quantity_produced > 0:
+        return "IN_PROGRESS"
+    return "PENDING"
+
+
+def resize_job(job: ProductionJob, quantity_required: int) -> None:
+    """Point an existing job at a new required quantity, keeping its progress."""
+    job.quantity_required = quantity_required
+    job.status = _derive_job_status(job.quantity_produced, quantity_required)
+
+
+def create_jobs_payload(order_item_ids: Iterable[UUID]) -> dict:
+    return {"order_item_ids": [str(order_item_id) for order_item_id in order_item_ids]}
+
+
+def enqueue_job_creation(db: Session, order_item_ids: Iterable[UUID]) -> None:
+    """Defer job creation for ``order_item_ids`` to the outbox worker."""
+    enqueue(db, CREATE_JOBS_TOPIC, create_jobs_payload(order_item_ids))
 
 
-def create_job_from_order_item(db: Session, order_item_id: UUID) -> ProductionJob:
-    order_item = db.query(OrderItem).filter(OrderItem.id == order_item_id).first()
-    if not order_item:
-        raise ValueError("Order item not found")
-    _ensure_default_stations(db)
-    job = ProductionJob(
-        organization_id=DEFAULT_ORGANIZATION_ID,
-        order_item_id=order_item_id,
-        quantity_required=order_item.quantity,
+def create_jobs_for_order_items(db: Session, payloads: List[dict]) -> None:
+    """Outbox handler: create one job per order item, skipping items gone or already served."""
+    item_ids = {UUID(item_id) for payload in payloads for item_id in payload["order_item_ids"]}
+    if not item_ids:
+        return
+    items = (
+        db.query(OrderItem.id, OrderItem.quantity)
+        .filter(OrderItem.id.in_(item_ids))
+        .order_by(OrderItem.id)
+        .all()
     )
-    db.add(job)
-    db.flush()
-    return job
+    if not items:
+        return
+    jobs = ProductionJob.__table__
+    # The unique index on order_item_id makes a redelivered or concurrently
+    # handled event a no-op for the items that already have their job.
+    db.execute(
+        pg_insert(jobs)
+        .values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "organization_id": DEFAULT_ORGANIZATION_ID,
+                    "order_item_id": order_item_id,
+                    "quantity_required": quantity,
+                }
+                for order_item_id, quantity in items
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[jobs.c.order_item_id])
+    )
+
+
+register_handler(CREATE_JOBS_TOPIC, create_jobs_for_order_items)
 
 
 def get_jobs(
@@ -53,28 +95,133 @@ def get_jobs(
     page: int = 1,
     page_size: int = 10,
     status: str | None = None,
+    cursor: str | None = None,
 ) -> List[ProductionJob]:
-    query = db.query(ProductionJob)
+    query = db.query(ProductionJob).options(selectinload(ProductionJob.stations))
     if status:
         query = query.filter(ProductionJob.status == status)
-    jobs = query.offset((page - 1) * page_size).limit(page_size).all()
-    for job in jobs:
-        job.logs = []
-    return jobs
+    return paginate(query, ProductionJob, page, page_size, cursor)
 
 
 def get_job_detail(db: Session, job_id: UUID) -> Optional[ProductionJob]:
+    return (
+        db.query(ProductionJob)
+        .options(selectinload(ProductionJob.stations))
+        .filter(ProductionJob.id == job_id)
+        .first()
+    )
+
+
+def get_job_logs(
+    db: Session, job_id: UUID, page_size: int = 50, cursor: str | None = None
+) -> List[ProductionLog]:
+    query = db.query(ProductionLog).filter(ProductionLog.job_id == job_id)
+    return paginate(query, ProductionLog, 1, page_size, cursor)
+
+
+def update_job(db: Session, job_id: UUID, job_in: ProductionJobUpdate) -> Optional[ProductionJob]:
     job = db.query(ProductionJob).filter(ProductionJob.id == job_id).first()
     if not job:
         return None
-    job.logs = db.query(ProductionLog).filter(ProductionLog.job_id == job_id).all()
-    return job
+    status = job.status
+    for field, value in job_in.dict(exclude_unset=True).items():
+        setattr(job, field, value)
+    if job.status != status:
+        publish_event(db, "job.status", job_id=job_id, status=job.status)
+    db.commit()
+    return get_job_detail(db, job_id)
 
 
-def log_production_step(db: Session, job_id: UUID, log_in: ProductionLogCreate) -> ProductionLog:
-    job = db.query(ProductionJob).filter(ProductionJob.id == job_id).first()
-    if not job:
+def _increment_jobs(db: Session, increments: Dict[UUID, int]) -> List[dict]:
+    """Add ``increments`` to the jobs' produced quantities; returns their new progress.
+
+    Raises ``ValueError`` if any job does not exist.
+    """
+    jobs = ProductionJob.__table__
+    job_ids = sorted(increments)
+    if len(job_ids) > 1:
+        # Lock in a fixed order so two batches touching the same jobs cannot deadlock.
+        db.execute(select(jobs.c.id).where(jobs.c.id.in_(job_ids)).order_by(jobs.c.id).with_for_update())
+    delta = values(
+        column("job_id", PGUUID(as_uuid=True)), column("quantity", Integer), name="delta"
+    ).data([(job_id, increments[job_id]) for job_id in job_ids])
+    produced = jobs.c.quantity_produced + delta.c.quantity
+    statement = (
+        update(jobs)
+        .where(jobs.c.id == delta.c.job_id)
+        .values(
+            quantity_produced=produced,
+            status=case(
+                (produced >= jobs.c.quantity_required, "COMPLETED"),
+                (produced > 0, "IN_PROGRESS"),
+                else_="PENDING",
+            ),
+        )
+        .returning(jobs.c.id, jobs.c.quantity_required, jobs.c.quantity_produced, jobs.c.status)
+    )
+    progress = [dict(row._mapping) for row in db.execute(statement)]
+    if len(progress) != len(job_ids):
         raise ValueError("Job not found")
+    return progress
+
+
+def _increment_station_counters(db: Session, quantities: Dict[Tuple[UUID, UUID], int]) -> None:
+    """Upsert the per-(job, station) counters; callers hold the job rows' locks."""
+    counters = ProductionJobStation.__table__
+    statement = pg_insert(counters).values(
+        [
+            {"job_id": job_id, "station_id": station_id, "quantity_produced": quantity}
+            for (job_id, station_id), quantity in sorted(quantities.items())
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[counters.c.job_id, counters.c.station_id],
+        set_={
+            "quantity_produced": counters.c.quantity_produced + statement.excluded.quantity_produced,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
+
+def _publish_progress(
+    db: Session, progress: List[dict], quantities: Dict[Tuple[UUID, UUID], int]
+) -> None:
+    """Publish ``job.progress`` per (job, station) logged and ``job.status`` per job whose status moved.
+
+    All events go out in one statement, however many scans the batch held.
+    """
+    by_id = {row["id"]: row for row in progress}
+    added: Dict[UUID, int] = defaultdict(int)
+    events = []
+    for (job_id, station_id), quantity in quantities.items():
+        job = by_id[job_id]
+        added[job_id] += quantity
+        events.append(
+            {
+                "type": "job.progress",
+                "job_id": job_id,
+                "station_id": station_id,
+                "quantity": quantity,
+                "quantity_produced": job["quantity_produced"],
+                "status": job["status"],
+            }
+        )
+    for job_id, quantity in added.items():
+        job = by_id[job_id]
+        before = _derive_job_status(job["quantity_produced"] - quantity, job["quantity_required"])
+        if before != job["status"]:
+            events.append({"type": "job.status", "job_id": job_id, "status": job["status"]})
+    publish_events(db, events)
+
+
+def log_production_step(db: Session, job_id: UUID, log_in: ProductionLogCreate) -> ProductionLog:
+    if station_registry.by_id(db, log_in.station_id) is None:
+        raise ValueError("Station not found")
+    progress = _increment_jobs(db, {job_id: log_in.quantity})
+    quantities = {(job_id, log_in.station_id): log_in.quantity}
+    _increment_station_counters(db, quantities)
+    _publish_progress(db, progress, quantities)
     log = ProductionLog(
         job_id=job_id,
         station_id=log_in.station_id,
@@ -82,11 +229,40 @@ def log_production_step(db: Session, job_id: UUID, log_in: ProductionLogCreate)
         quantity=log_in.quantity,
     )
     db.add(log)
-    job.quantity_produced += log_in.quantity
-    if job.quantity_produced >= job.quantity_required:
-        job.status = "COMPLETED"
-    elif job.quantity_produced > 0:
-        job.status = "IN_PROGRESS"
+    db.flush()
+    record_logs(db, [log.id])
     db.commit()
     db.refresh(log)
     return log
+
+
+def log_production_batch(db: Session, logs_in: Sequence[ProductionLogBatchItem]) -> dict:
+    """Apply many scans in one transaction: one multi-row insert and one counter update."""
+    if len(logs_in) > MAX_LOG_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_LOG_BATCH_SIZE} logs per batch")
+    if not logs_in:
+        return {"logs_created": 0, "jobs": []}
+    increments: Dict[UUID, int] = defaultdict(int)
+    quantities: Dict[Tuple[UUID, UUID], int] = defaultdict(int)
+    for log_in in logs_in:
+        if station_registry.by_id(db, log_in.station_id) is None:
+            raise ValueError("Station not found")
+        increments[log_in.job_id] += log_in.quantity
+        quantities[(log_in.job_id, log_in.station_id)] += log_in.quantity
+    progress = _increment_jobs(db, increments)
+    _increment_station_counters(db, quantities)
+    _publish_progress(db, progress, quantities)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "job_id": log_in.job_id,
+            "station_id": log_in.station_id,
+            "user_id": log_in.user_id,
+            "quantity": log_in.quantity,
+        }
+        for log_in in logs_in
+    ]
+    db.execute(insert(ProductionLog.__table__), rows)
+    record_logs(db, [row["id"] for row in rows])
+    db.commit()
+    return {"logs_created": len(logs_in), "jobs": progress}
@@ -0,0 +1,161 @@
+"""Receivables aging and partner exposure.
+
+An order's amount due is its ``grand_total`` less the ``IN`` transactions
+linked to it and the reconciliation allocations accepted for it; orders
+still at ``TEKLIF`` are quotes and owe nothing. Amounts due are bucketed by
+the order's age in UTC calendar days (0-30, 31-60, 61-90, 90+). Incoming
+payments with a partner but no order, less what has been allocated from
+them, are the partner's unapplied credit, as are overpayments on orders.
+Exposure is what is due less that credit.
+
+The whole report is one grouped query over orders and one over unapplied
+payments, joined per partner in the database. It is cached per worker and
+dropped whenever orders, transactions or allocations change, as reported by
+the ``receivables_changed`` notification.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.db.notify import listener
+from app.models.financial_transaction import FinancialTransaction
+from app.models.order import Order
+from app.models.partner import Partner
+from app.services.reconciliation_service import allocated_by_transaction, paid_by_order
+
+RECEIVABLES_CHANNEL = "receivables_changed"
+AGING_BUCKETS = ("days_0_30", "days_31_60", "days_61_90", "days_over_90")
+AGING_CACHE_TTL = 300.0
+
+aging_cache = TTLCache("receivables_aging", max_entries=2, ttl=AGING_CACHE_TTL)
+
+
+def _on_receivables_changed(payload: str) -> None:
+    aging_cache.clear()
+
+
+listener.subscribe(RECEIVABLES_CHANNEL, _on_receivables_changed, on_reset=aging_cache.clear)
+metrics.register("receivables_aging_cache", aging_cache.stats)
+
+
+def _aging_statement(as_of: datetime):
+    paid = paid_by_order()
+    due = Order.grand_total - func.coalesce(paid.c.paid, 0)
+    owed = func.greatest(due, 0)
+    # Ages count UTC calendar days, so an order placed today is 0 days old.
+    start_of_day = as_of.replace(hour=0, minute=0, second=0, microsecond=0)
+    bounds = [start_of_day - timedelta(days=days) for days in (30, 60, 90)]
+    orders = (
+        select(
+            Order.partner_id.label("partner_id"),
+            func.coalesce(func.sum(owed).filter(Order.created_at >= bounds[0]), 0).label("days_0_30"),
+            func.coalesce(
+                func.sum(owed).filter(Order.created_at < bounds[0], Order.created_at >= bounds[1]), 0
+            ).label("days_31_60"),
+            func.coalesce(
+                func.sum(owed).filter(Order.created_at < bounds[1], Order.created_at >= bounds[2]), 0
+            ).label("days_61_90"),
+            func.coalesce(func.sum(owed).filter(Order.created_at < bounds[2]), 0).label("days_over_90"),
+            func.sum(func.greatest(-due, 0)).label("overpaid"),
+            func.count().filter(due > 0).label("open_orders"),
+            func.min(Order.created_at).filter(due > 0).label("oldest_open_order"),
+        )
+        .select_from(Order)
+        .outerjoin(paid, paid.c.order_id == Order.id)
+        .where(Order.status != "TEKLIF")
+        .group_by(Order.partner_id)
+        .subquery()
+    )
+    allocated = allocated_by_transaction()
+    unapplied = (
+        select(
+            FinancialTransaction.partner_id.label("partner_id"),
+            func.sum(FinancialTransaction.amount - func.coalesce(allocated.c.allocated, 0)).label("credit"),
+        )
+        .outerjoin(allocated, allocated.c.transaction_id == FinancialTransaction.id)
+        .where(
+            FinancialTransaction.direction == "IN",
+            FinancialTransaction.partner_id.isnot(None),
+            FinancialTransaction.order_id.is_(None),
+            FinancialTransaction.purchase_order_id.is_(None),
+        )
+        .group_by(FinancialTransaction.partner_id)
+        .subquery()
+    )
+    buckets = [func.coalesce(getattr(orders.c, bucket), 0).label(bucket) for bucket in AGING_BUCKETS]
+    credit = (func.coalesce(orders.c.overpaid, 0) + func.coalesce(unapplied.c.credit, 0)).label("credit")
+    return (
+        select(
+            Partner.id,
+            Partner.name,
+            *buckets,
+            credit,
+            func.coalesce(orders.c.open_orders, 0).label("open_orders"),
+            orders.c.oldest_open_order,
+        )
+        .outerjoin(orders, orders.c.partner_id == Partner.id)
+        .outerjoin(unapplied, unapplied.c.partner_id == Partner.id)
+        .where(
+            or_(
+                orders.c.open_orders > 0,
+                orders.c.overpaid > 0,
+                func.coalesce(unapplied.c.credit, 0) != 0,
+            )
+        )
+    )
+
+
+def _build_report(db: Session, as_of: datetime) -> dict:
+    totals = {bucket: Decimal("0") for bucket in (*AGING_BUCKETS, "total_due", "credit", "exposure")}
+    partners = []
+    for row in db.execute(_aging_statement(as_of)):
+        entry = {
+            "partner_id": row.id,
+            "partner_name": row.name,
+            **{bucket: Decimal(getattr(row, bucket)) for bucket in AGING_BUCKETS},
+            "credit": Decimal(row.credit),
+            "open_orders": row.open_orders,
+            "oldest_open_order": row.oldest_open_order,
+        }
+        entry["total_due"] = sum((entry[bucket] for bucket in AGING_BUCKETS), Decimal("0"))
+        entry["exposure"] = entry["total_due"] - entry["credit"]
+        for key in totals:
+            totals[key] += entry[key]
+        partners.append(entry)
+    partners.sort(key=lambda entry: entry["exposure"], reverse=True)
+    return {
+        "as_of": as_of,
+        "totals": totals,
+        "partners": partners,
+        "by_partner": {entry["partner_id"]: entry for entry in partners},
+    }
+
+
+def receivables_aging(db: Session, partner_id: Optional[UUID] = None, limit: int = 100) -> dict:
+    """The aging report, largest exposure first, or just ``partner_id``'s row."""
+    now = datetime.now(timezone.utc)
+    # Keyed by day so ages move on at midnight even without writes.
+    key = now.date()
+    report = aging_cache.get(key)
+    if report is None:
+        generation = aging_cache.generation
+        report = _build_report(db, now)
+        aging_cache.set(key, report, generation)
+    if partner_id is not None:
+        entry = report["by_partner"].get(partner_id)
+        partners: List[dict] = [entry] if entry is not None else []
+    else:
+        partners = report["partners"][:limit]
+    return {
+        "as_of": report["as_of"],
+        "totals": report["totals"],
+        "partner_count": len(report["partners"]),
+        "partners": partners,
+    }
@@ -0,0 +1,448 @@
+"""Match incoming payments without an order to open orders.
+
+A run loads every ``IN`` transaction that has no ``order_id`` and money not
+yet allocated, plus every order (quotes aside) whose ``grand_total`` is not
+covered by payments, and matches them in memory. Amounts are compared in
+whole cents. Payments are taken oldest first and each one tries, in order:
+
+``reference``  an open order's id appears in the description
+``exact``      an order of the same partner with exactly the amount due
+``combined``   the partner's oldest open orders add up to the payment
+``pair``       two orders of the partner add up to the payment
+``partial``    the partner's order with the smallest amount due above the payment
+``amount``     no partner on the payment, but a single open order with that amount
+
+Orders are indexed by ``(partner, amount due)`` and ``amount due`` in hash
+maps, and per partner both oldest first and in a list sorted by amount due
+for the partial lookups, so each payment costs a few lookups rather than a
+scan. Every match is stored as a ``PROPOSED`` allocation; reviewers accept
+or reject a payment's proposals together. A new run replaces the pending
+proposals and never proposes a rejected pairing again.
+"""
+
+import re
+import time
+import uuid
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db.retry import retry_on_conflict
+from app.models.financial_transaction import FinancialTransaction
+from app.models.order import Order
+from app.models.payment_allocation import PaymentAllocation
+from app.services.event_service import publish_event
+from app.services.financial_service import _lock_transaction
+from app.services.pagination import paginate
+
+RULE_CONFIDENCE = {
+    "reference": Decimal("0.99"),
+    "exact": Decimal("0.95"),
+    "combined": Decimal("0.85"),
+    "pair": Decimal("0.80"),
+    "amount": Decimal("0.60"),
+    "partial": Decimal("0.50"),
+}
+MAX_COMBINED_ORDERS = 10
+MAX_PAIR_CANDIDATES = 500
+RECONCILIATION_LOCK_KEY = 727_002
+
+_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+@dataclass
+class OpenOrder:
+    id: UUID
+    partner_id: UUID
+    due: int  # cents
+    created_at: datetime
+
+
+@dataclass
+class OpenPayment:
+    id: UUID
+    partner_id: Optional[UUID]
+    remaining: int  # cents
+    transaction_date: datetime
+    description: str = ""
+
+
+@dataclass
+class Proposal:
+    transaction_id: UUID
+    order_id: UUID
+    amount: int  # cents
+    rule: str
+
+
+class Reconciler:
+    """In-memory indexes over open orders, consumed as payments are matched.
+
+    Hash entries are never removed: an order's amount due only goes down, so
+    an entry whose amount no longer matches the order is stale and skipped.
+    """
+
+    def __init__(self, orders: Iterable[OpenOrder], rejected: Iterable[Tuple[UUID, UUID]] = ()) -> None:
+        self._orders: Dict[UUID, OpenOrder] = {}
+        self._rejected: Set[Tuple[UUID, UUID]] = set(rejected)
+        self._by_partner_due: Dict[Tuple[UUID, int], List[UUID]] = defaultdict(list)
+        self._by_due: Dict[int, List[UUID]] = defaultdict(list)
+        self._oldest: Dict[UUID, List[UUID]] = defaultdict(list)
+        self._sorted: Dict[UUID, List[Tuple[int, datetime, UUID]]] = defaultdict(list)
+        for order in sorted(orders, key=lambda order: (order.created_at, order.id)):
+            self._orders[order.id] = order
+            self._oldest[order.partner_id].append(order.id)
+            self._sorted[order.partner_id].append((order.due, order.created_at, order.id))
+            self._hash(order)
+        for keys in self._sorted.values():
+            keys.sort()
+
+    def _hash(self, order: OpenOrder) -> None:
+        self._by_partner_due[(order.partner_id, order.due)].append(order.id)
+        self._by_due[order.due].append(order.id)
+
+    def _eligible(self, payment: OpenPayment, order_id: UUID, due: Optional[int] = None) -> bool:
+        order = self._orders.get(order_id)
+        if order is None or order.due <= 0 or (due is not None and order.due != due):
+            return False
+        return (payment.id, order_id) not in self._rejected
+
+    def _allocate(self, payment: OpenPayment, order: OpenOrder, amount: int, rule: str) -> Proposal:
+        keys = self._sorted[order.partner_id]
+        del keys[bisect_left(keys, (order.due, order.created_at, order.id))]
+        order.due -= amount
+        payment.remaining -= amount
+        if order.due > 0:
+            insort(keys, (order.due, order.created_at, order.id))
+            self._hash(order)
+        return Proposal(payment.id, order.id, amount, rule)
+
+    def match(self, payment: OpenPayment) -> List[Proposal]:
+        """Allocate ``payment`` to open orders, updating the indexes; returns the allocations."""
+        proposals = self._by_reference(payment)
+        if proposals or payment.partner_id is None:
+            return proposals or self._by_amount(payment)
+        partner = payment.partner_id
+        for order_id in self._by_partner_due.get((partner, payment.remaining), ()):
+            if self._eligible(payment, order_id, payment.remaining):
+                return [self._allocate(payment, self._orders[order_id], payment.remaining, "exact")]
+        return self._combined(payment) or self._pair(payment) or self._partial(payment)
+
+    def _by_reference(self, payment: OpenPayment) -> List[Proposal]:
+        proposals = []
+        for match in _UUID.finditer(payment.description or ""):
+            order_id = UUID(match.group())
+            if payment.remaining <= 0 or not self._eligible(payment, order_id):
+                continue
+            order = self._orders[order_id]
+            if payment.partner_id is not None and order.partner_id != payment.partner_id:
+                continue
+            proposals.append(self._allocate(payment, order, min(payment.remaining, order.due), "reference"))
+        return proposals
+
+    def _by_amount(self, payment: OpenPayment) -> List[Proposal]:
+        candidates = []
+        for order_id in self._by_due.get(payment.remaining, ()):
+            if self._eligible(payment, order_id, payment.remaining) and order_id not in candidates:
+                candidates.append(order_id)
+                if len(candidates) > 1:
+                    return []
+        if not candidates:
+            return []
+        return [self._allocate(payment, self._orders[candidates[0]], payment.remaining, "amount")]
+
+    def _open_orders(self, payment: OpenPayment, limit: int) -> List[OpenOrder]:
+        oldest = self._oldest.get(payment.partner_id, [])
+        # Settled orders at the front are dropped for good, so later scans start at the first open one.
+        start = 0
+        while start < len(oldest) and self._orders[oldest[start]].due <= 0:
+            start += 1
+        del oldest[:start]
+        orders = []
+        for order_id in oldest:
+            if self._eligible(payment, order_id):
+                orders.append(self._orders[order_id])
+                if len(orders) == limit:
+                    break
+        return orders
+
+    def _combined(self, payment: OpenPayment) -> List[Proposal]:
+        total = 0
+        chosen = []
+        for order in self._open_orders(payment, MAX_COMBINED_ORDERS):
+            total += order.due
+            chosen.append(order)
+            if total >= payment.remaining:
+                break
+        if total != payment.remaining or len(chosen) < 2:
+            return []
+        return [self._allocate(payment, order, order.due, "combined") for order in chosen]
+
+    def _pair(self, payment: OpenPayment) -> List[Proposal]:
+        for first in self._open_orders(payment, MAX_PAIR_CANDIDATES):
+            rest = payment.remaining - first.due
+            if rest <= 0:
+                continue
+            for order_id in self._by_partner_due.get((payment.partner_id, rest), ()):
+                if order_id != first.id and self._eligible(payment, order_id, rest):
+                    second = self._orders[order_id]
+                    return [
+                        self._allocate(payment, first, first.due, "pair"),
+                        self._allocate(payment, second, second.due, "pair"),
+                    ]
+        return []
+
+    def _partial(self, payment: OpenPayment) -> List[Proposal]:
+        keys = self._sorted.get(payment.partner_id, [])
+        for position in range(bisect_left(keys, (payment.remaining,)), len(keys)):
+            due, _, order_id = keys[position]
+            if self._eligible(payment, order_id, due):
+                return [self._allocate(payment, self._orders[order_id], payment.remaining, "partial")]
+        return []
+
+
+def reconcile(
+    payments: Iterable[OpenPayment],
+    orders: Iterable[OpenOrder],
+    rejected: Iterable[Tuple[UUID, UUID]] = (),
+) -> List[Proposal]:
+    """Propose allocations for ``payments``, oldest first, against ``orders``."""
+    reconciler = Reconciler(orders, rejected)
+    proposals = []
+    for payment in sorted(payments, key=lambda payment: (payment.transaction_date, payment.id)):
+        proposals.extend(reconciler.match(payment))
+    return proposals
+
+
+# ---------------------------------------------------------------------------
+# Database side
+# ---------------------------------------------------------------------------
+
+def _cents(amount) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def paid_by_order():
+    """Subquery of ``(order_id, paid)``: direct payments plus accepted allocations."""
+    direct = select(
+        FinancialTransaction.order_id.label("order_id"),
+        FinancialTransaction.amount.label("amount"),
+    ).where(FinancialTransaction.direction == "IN", FinancialTransaction.order_id.isnot(None))
+    allocated = select(PaymentAllocation.order_id, PaymentAllocation.amount).where(
+        PaymentAllocation.status == "ACCEPTED"
+    )
+    payments = union_all(direct, allocated).subquery()
+    return (
+        select(payments.c.order_id, func.sum(payments.c.amount).label("paid"))
+        .group_by(payments.c.order_id)
+        .subquery()
+    )
+
+
+def allocated_by_transaction():
+    """Subquery of ``(transaction_id, allocated)`` over accepted allocations."""
+    return (
+        select(
+            PaymentAllocation.transaction_id,
+            func.sum(PaymentAllocation.amount).label("allocated"),
+        )
+        .where(PaymentAllocation.status == "ACCEPTED")
+        .group_by(PaymentAllocation.transaction_id)
+        .subquery()
+    )
+
+
+def _open_orders(db: Session, order_ids: Optional[List[UUID]] = None) -> List[OpenOrder]:
+    paid = paid_by_order()
+    due = Order.grand_total - func.coalesce(paid.c.paid, 0)
+    query = (
+        db.query(Order.id, Order.partner_id, due, Order.created_at)
+        .outerjoin(paid, paid.c.order_id == Order.id)
+        .filter(Order.status != "TEKLIF", due > 0)
+    )
+    if order_ids is not None:
+        query = query.filter(Order.id.in_(order_ids))
+    return [OpenOrder(order_id, partner_id, _cents(amount), created_at) for order_id, partner_id, amount, created_at in query]
+
+
+def _open_payments(db: Session, transaction_id: Optional[UUID] = None) -> List[OpenPayment]:
+    allocated = allocated_by_transaction()
+    remaining = FinancialTransaction.amount - func.coalesce(allocated.c.allocated, 0)
+    query = (
+        db.query(
+            FinancialTransaction.id,
+            FinancialTransaction.partner_id,
+            remaining,
+            FinancialTransaction.transaction_date,
+            FinancialTransaction.description,
+        )
+        .outerjoin(allocated, allocated.c.transaction_id == FinancialTransaction.id)
+        .filter(
+            FinancialTransaction.direction == "IN",
+            FinancialTransaction.order_id.is_(None),
+            FinancialTransaction.purchase_order_id.is_(None),
+            remaining > 0,
+        )
+    )
+    if transaction_id is not None:
+        query = query.filter(FinancialTransaction.id == transaction_id)
+    return [
+        OpenPayment(payment_id, partner_id, _cents(amount), transaction_date, description or "")
+        for payment_id, partner_id, amount, transaction_date, description in query
+    ]
+
+
+def run_reconciliation(db: Session) -> dict:
+    """Replace the pending proposals with a fresh run over all open payments and orders."""
+    started = time.perf_counter()
+    # One run at a time; a second caller waits and then works on fresh data.
+    db.execute(select(func.pg_advisory_xact_lock(RECONCILIATION_LOCK_KEY)))
+    db.query(PaymentAllocation).filter(PaymentAllocation.status == "PROPOSED").delete(
+        synchronize_session=False
+    )
+    rejected = [
+        (transaction_id, order_id)
+        for transaction_id, order_id in db.query(PaymentAllocation.transaction_id, PaymentAllocation.order_id)
+        .filter(PaymentAllocation.status == "REJECTED")
+    ]
+    payments = _open_payments(db)
+    orders = _open_orders(db)
+    proposals = reconcile(payments, orders, rejected)
+    if proposals:
+        db.execute(
+            insert(PaymentAllocation.__table__),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "transaction_id": proposal.transaction_id,
+                    "order_id": proposal.order_id,
+                    "amount": _from_cents(proposal.amount),
+                    "status": "PROPOSED",
+                    "rule": proposal.rule,
+                    "confidence": RULE_CONFIDENCE[proposal.rule],
+                }
+                for proposal in proposals
+            ],
+        )
+    db.commit()
+    by_rule: Dict[str, int] = defaultdict(int)
+    for proposal in proposals:
+        by_rule[proposal.rule] += 1
+    return {
+        "payments": len(payments),
+        "orders": len(orders),
+        "proposals": len(proposals),
+        "matched_payments": len({proposal.transaction_id for proposal in proposals}),
+        "matched_amount": _from_cents(sum(proposal.amount for proposal in proposals)),
+        "by_rule": dict(by_rule),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def list_proposals(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+    min_confidence: Decimal | None = None,
+) -> List[PaymentAllocation]:
+    query = db.query(PaymentAllocation).filter(PaymentAllocation.status == "PROPOSED")
+    if min_confidence is not None:
+        query = query.filter(PaymentAllocation.confidence >= min_confidence)
+    return paginate(query, PaymentAllocation, page, page_size, cursor)
+
+
+def _check_current(db: Session, transaction: FinancialTransaction, allocations: List[PaymentAllocation]) -> None:
+    """Raise if payments recorded since the run leave too little to allocate."""
+    order_ids = sorted({allocation.order_id for allocation in allocations})
+    # Lock the orders in id order so concurrent reviews serialise on them.
+    db.query(Order.id).filter(Order.id.in_(order_ids)).order_by(Order.id).with_for_update().all()
+    due = {order.id: order.due for order in _open_orders(db, order_ids)}
+    requested: Dict[UUID, int] = defaultdict(int)
+    for allocation in allocations:
+        requested[allocation.order_id] += _cents(allocation.amount)
+    payment = _open_payments(db, transaction.id)
+    remaining = payment[0].remaining if payment else 0
+    if sum(requested.values()) > remaining or any(
+        amount > due.get(order_id, 0) for order_id, amount in requested.items()
+    ):
+        raise ValueError("Proposal is out of date; run reconciliation again")
+
+
+@retry_on_conflict
+def review_payment(db: Session, transaction_id: UUID, accept: bool) -> Optional[List[PaymentAllocation]]:
+    """Accept or reject every proposed allocation of one payment; ``None`` if no such transaction."""
+    transaction = _lock_transaction(db, transaction_id)
+    if not transaction:
+        return None
+    allocations = (
+        db.query(PaymentAllocation)
+        .filter(PaymentAllocation.transaction_id == transaction_id, PaymentAllocation.status == "PROPOSED")
+        .order_by(PaymentAllocation.order_id)
+        .all()
+    )
+    if not allocations:
+        raise ValueError("No proposed allocations for this transaction")
+    if accept:
+        _check_current(db, transaction, allocations)
+    now = datetime.now(timezone.utc)
+    for allocation in allocations:
+        allocation.status = "ACCEPTED" if accept else "REJECTED"
+        allocation.reviewed_at = now
+    if accept:
+        if transaction.partner_id is None:
+            partners = {
+                partner_id
+                for (partner_id,) in db.query(Order.partner_id).filter(
+                    Order.id.in_([allocation.order_id for allocation in allocations])
+                )
+            }
+            if len(partners) == 1:
+                transaction.partner_id = partners.pop()
+        for allocation in allocations:
+            publish_event(
+                db,
+                "payment.created",
+                order_id=allocation.order_id,
+                transaction_id=transaction_id,
+                amount=str(allocation.amount),
+            )
+    db.commit()
+    for allocation in allocations:
+        db.refresh(allocation)
+    return allocations
+
+
+def accept_proposals(db: Session, min_confidence: Decimal) -> dict:
+    """Accept every payment whose proposals all reach ``min_confidence``; stale ones are skipped."""
+    transaction_ids = [
+        transaction_id
+        for (transaction_id,) in db.query(PaymentAllocation.transaction_id)
+        .filter(PaymentAllocation.status == "PROPOSED")
+        .group_by(PaymentAllocation.transaction_id)
+        .having(func.min(PaymentAllocation.confidence) >= min_confidence)
+    ]
+    accepted = skipped = 0
+    for transaction_id in transaction_ids:
+        try:
+            allocations = review_payment(db, transaction_id, accept=True)
+        except ValueError:
+            db.rollback()
+            skipped += 1
+            continue
+        if allocations is None:
+            skipped += 1
+        else:
+            accepted += 1
+    return {"accepted": accepted, "skipped": skipped}
@@ -0,0 +1,294 @@
+"""Station-aware production schedule.
+
+Every open job passes through the stations in ``order_index`` order. Each
+station gets a queue of the jobs that still have pieces to produce there,
+ordered by latest start: the job's due date (its creation plus
+``DEFAULT_LEAD_TIME`` when it has none) minus the hours of work it still needs
+across all stations at their hourly capacity, minus ``PRIORITY_STEP`` per
+priority point. The key does not depend on the current time, so a queue stays
+valid until one of its jobs changes.
+
+Each worker keeps the queues in memory. A trigger on ``production_jobs``
+notifies ``production_job_changed`` with the job id on every insert, update or
+delete (logging progress updates the job too); the scheduler only marks the
+job dirty and re-reads the dirty jobs on its next read. Station changes and
+listener reconnects force a full rebuild.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db.notify import listener
+from app.models.production_job import ProductionJob
+from app.models.production_job_station import ProductionJobStation
+from app.services.station_registry import STATION_CHANNEL, Station, station_registry
+
+JOB_CHANNEL = "production_job_changed"
+DEFAULT_LEAD_TIME = timedelta(days=7)
+PRIORITY_STEP = timedelta(hours=8)
+
+# (job id, quantity required, due date, created at, priority)
+JobRow = Tuple[UUID, int, Optional[datetime], datetime, int]
+# (job id, station id, quantity produced at that station)
+ProgressRow = Tuple[UUID, UUID, int]
+
+
+@dataclass
+class _Job:
+    id: UUID
+    required: int
+    produced: Dict[UUID, int]
+    due: datetime
+    priority: int
+    key: float = 0.0
+
+    def remaining(self, station_id: UUID) -> int:
+        return max(self.required - self.produced.get(station_id, 0), 0)
+
+
+class ProductionScheduler:
+    def __init__(self) -> None:
+        self._stations: List[Station] = []
+        self._jobs: Dict[UUID, _Job] = {}
+        self._queues: Dict[UUID, List[Tuple[float, UUID]]] = {}
+        self._remaining: Dict[UUID, int] = {}
+        self._dirty: Set[UUID] = set()
+        self._stale = True
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._dirty_lock = threading.Lock()
+        self.rebuilds = 0
+        self.refreshed_jobs = 0
+
+    # Notification handlers run on the listener thread and only record what changed.
+    def mark_job(self, payload: str) -> None:
+        with self._dirty_lock:
+            self._dirty.add(UUID(payload))
+
+    def invalidate(self, _payload: str = "") -> None:
+        with self._dirty_lock:
+            self._stale = True
+            self._generation += 1
+
+    def _key(self, job: _Job) -> float:
+        work_hours = sum(
+            job.remaining(station.id) / max(station.capacity_per_hour, 1) for station in self._stations
+        )
+        return (
+            job.due.timestamp()
+            - work_hours * 3600
+            - job.priority * PRIORITY_STEP.total_seconds()
+        )
+
+    def _make_job(self, row: JobRow, produced: Dict[UUID, int]) -> _Job:
+        job_id, required, due_date, created_at, priority = row
+        job = _Job(job_id, required, produced, due_date or created_at + DEFAULT_LEAD_TIME, priority)
+        job.key = self._key(job)
+        return job
+
+    def _unindex(self, job: _Job) -> None:
+        for station in self._stations:
+            remaining = job.remaining(station.id)
+            if remaining:
+                queue = self._queues[station.id]
+                del queue[bisect.bisect_left(queue, (job.key, job.id))]
+                self._remaining[station.id] -= remaining
+
+    def _index(self, job: _Job) -> None:
+        for station in self._stations:
+            remaining = job.remaining(station.id)
+            if remaining:
+                bisect.insort(self._queues[station.id], (job.key, job.id))
+                self._remaining[station.id] += remaining
+
+    def load_rows(
+        self, stations: Sequence[Station], jobs: Iterable[JobRow], progress: Iterable[ProgressRow]
+    ) -> None:
+        """Replace the whole schedule with ``jobs`` (open jobs only) and their progress."""
+        produced: Dict[UUID, Dict[UUID, int]] = defaultdict(dict)
+        for job_id, station_id, quantity in progress:
+            produced[job_id][station_id] = quantity
+        self._stations = list(stations)
+        self._jobs = {row[0]: self._make_job(row, produced.get(row[0], {})) for row in jobs}
+        self._queues = {station.id: [] for station in self._stations}
+        self._remaining = {station.id: 0 for station in self._stations}
+        for job in self._jobs.values():
+            for station in self._stations:
+                remaining = job.remaining(station.id)
+                if remaining:
+                    self._queues[station.id].append((job.key, job.id))
+                    self._remaining[station.id] += remaining
+        for queue in self._queues.values():
+            queue.sort()
+        self.rebuilds += 1
+
+    def apply_rows(
+        self, job_ids: Iterable[UUID], jobs: Iterable[JobRow], progress: Iterable[ProgressRow]
+    ) -> None:
+        """Re-place ``job_ids``; those missing from ``jobs`` are closed or deleted."""
+        produced: Dict[UUID, Dict[UUID, int]] = defaultdict(dict)
+        for job_id, station_id, quantity in progress:
+            produced[job_id][station_id] = quantity
+        rows = {row[0]: row for row in jobs}
+        for job_id in job_ids:
+            old = self._jobs.pop(job_id, None)
+            if old is not None:
+                self._unindex(old)
+            row = rows.get(job_id)
+            if row is not None:
+                job = self._make_job(row, produced.get(job_id, {}))
+                self._jobs[job_id] = job
+                self._index(job)
+            self.refreshed_jobs += 1
+
+    @staticmethod
+    def _is_open(station_count: int):
+        """Jobs with pieces left at some station, judged by the per-station counters.
+
+        The job's own status sums every station's output, so it reads
+        ``COMPLETED`` as soon as the first station alone has cut enough.
+        """
+        finished_stations = (
+            select(func.count())
+            .where(
+                ProductionJobStation.job_id == ProductionJob.id,
+                ProductionJobStation.quantity_produced >= ProductionJob.quantity_required,
+            )
+            .correlate(ProductionJob)
+            .scalar_subquery()
+        )
+        return finished_stations < station_count
+
+    @classmethod
+    def _job_rows(cls, db: Session, station_count: int, job_ids: Optional[Set[UUID]] = None):
+        query = db.query(
+            ProductionJob.id,
+            ProductionJob.quantity_required,
+            ProductionJob.due_date,
+            ProductionJob.created_at,
+            ProductionJob.priority,
+        ).filter(cls._is_open(station_count))
+        if job_ids is not None:
+            query = query.filter(ProductionJob.id.in_(job_ids))
+        return query.all()
+
+    @classmethod
+    def _progress_rows(cls, db: Session, station_count: int, job_ids: Optional[Set[UUID]] = None):
+        query = db.query(
+            ProductionJobStation.job_id,
+            ProductionJobStation.station_id,
+            ProductionJobStation.quantity_produced,
+        )
+        if job_ids is not None:
+            query = query.filter(ProductionJobStation.job_id.in_(job_ids))
+        else:
+            query = query.join(ProductionJob, ProductionJob.id == ProductionJobStation.job_id).filter(
+                cls._is_open(station_count)
+            )
+        return query.all()
+
+    def _sync(self, db: Session) -> None:
+        with self._dirty_lock:
+            job_ids, self._dirty = self._dirty, set()
+            stale, generation = self._stale, self._generation
+        try:
+            if stale:
+                stations = station_registry.all(db)
+                self.load_rows(
+                    stations, self._job_rows(db, len(stations)), self._progress_rows(db, len(stations))
+                )
+                with self._dirty_lock:
+                    # Only fresh if nothing invalidated the schedule while it loaded.
+                    self._stale = generation != self._generation
+            elif job_ids:
+                count = len(self._stations)
+                self.apply_rows(
+                    job_ids, self._job_rows(db, count, job_ids), self._progress_rows(db, count, job_ids)
+                )
+        except Exception:
+            with self._dirty_lock:
+                self._dirty |= job_ids
+            raise
+
+    def schedule(self, db: Session, station_code: str | None = None, limit: int = 50) -> List[dict]:
+        """Per-station queues with estimated start and finish for the first ``limit`` jobs.
+
+        Estimates assume each station works its queue back to back at full
+        capacity from now; ``ready`` tells whether pieces from the previous
+        station are already waiting.
+        """
+        with self._lock:
+            self._sync(db)
+            return self.plan(station_code, limit)
+
+    def plan(self, station_code: str | None = None, limit: int = 50) -> List[dict]:
+        """``schedule`` from the queues as they are, without refreshing them."""
+        now = datetime.now(timezone.utc)
+        plans = []
+        previous: Optional[Station] = None
+        for station in self._stations:
+            if station_code is None or station.code == station_code:
+                plans.append(self._station_plan(station, previous, now, limit))
+            previous = station
+        return plans
+
+    def _station_plan(self, station: Station, previous: Optional[Station], now: datetime, limit: int) -> dict:
+        capacity = max(station.capacity_per_hour, 1)
+        queue = self._queues[station.id]
+        entries = []
+        offset = 0.0
+        for _, job_id in queue[:limit]:
+            job = self._jobs[job_id]
+            remaining = job.remaining(station.id)
+            done_here = job.produced.get(station.id, 0)
+            ready = previous is None or job.produced.get(previous.id, 0) > done_here
+            hours = remaining / capacity
+            start = now + timedelta(hours=offset)
+            finish = now + timedelta(hours=offset + hours)
+            offset += hours
+            entries.append(
+                {
+                    "job_id": job_id,
+                    "remaining": remaining,
+                    "ready": ready,
+                    "due_date": job.due,
+                    "priority": job.priority,
+                    "estimated_start": start,
+                    "estimated_finish": finish,
+                    "late": finish > job.due,
+                }
+            )
+        return {
+            "station_id": station.id,
+            "code": station.code,
+            "name": station.name,
+            "capacity_per_hour": station.capacity_per_hour,
+            "queued_jobs": len(queue),
+            "remaining_pieces": self._remaining[station.id],
+            "backlog_hours": round(self._remaining[station.id] / capacity, 2),
+            "entries": entries,
+        }
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "open_jobs": len(self._jobs),
+            "dirty_jobs": len(self._dirty),
+            "stale": self._stale,
+            "rebuilds": self.rebuilds,
+            "refreshed_jobs": self.refreshed_jobs,
+        }
+
+
+production_scheduler = ProductionScheduler()
+listener.subscribe(JOB_CHANNEL, production_scheduler.mark_job, on_reset=production_scheduler.invalidate)
+listener.subscribe(STATION_CHANNEL, production_scheduler.invalidate)
+metrics.register("production_scheduler", production_scheduler.stats)
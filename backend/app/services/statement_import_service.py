@@ -0,0 +1,233 @@
+"""Service layer for bank statement imports.
+
+Statements arrive as CSV (``date,amount,description[,reference]``, amounts
+signed, dot as decimal separator) or SWIFT MT940, streamed line by line.
+Parsed lines are written in batches: one multi-row insert that skips lines
+already imported, then one balance change for the account covering only the
+rows actually inserted.
+
+Every line gets a hash of the account, its fields and how many identical
+lines came before it in the file. A unique index on the hash makes a
+re-import of the same or an overlapping statement skip what is already there.
+"""
+
+import csv
+import hashlib
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.account import Account
+from app.models.financial_transaction import FinancialTransaction
+from app.services.financial_service import DEFAULT_ORGANIZATION_ID, _adjust_balances, _signed
+from app.services.ledger_service import invalidate_snapshots
+
+STATEMENT_BATCH_SIZE = 1000
+STATEMENT_FORMATS = ("csv", "mt940")
+CSV_FIELDS = ["date", "amount", "description"]
+MAX_REPORTED_ERRORS = 100
+
+# :61: value date, optional entry date, debit/credit mark, optional funds code,
+# amount, transaction type, customer reference, optional bank reference.
+_MT940_LINE = re.compile(
+    r"^(?P<date>\d{6})(?:\d{4})?(?P<mark>RC|RD|C|D)[A-Z]?(?P<amount>\d+,\d*)"
+    r"(?:[NF][A-Z0-9]{3})?(?P<reference>[^/]*)(?://.*)?$"
+)
+
+
+@dataclass
+class StatementLine:
+    transaction_date: datetime
+    direction: str
+    amount: Decimal
+    description: str
+    reference: str = ""
+    line_hash: str = ""
+
+
+def _as_datetime(value: date) -> datetime:
+    return datetime.combine(value, time.min, tzinfo=timezone.utc)
+
+
+class StatementParser:
+    """Turns raw statement lines into ``StatementLine`` objects.
+
+    ``feed`` returns the lines completed so far plus any errors; MT940 entries
+    span several lines, so call ``finish`` at the end of the stream.
+    """
+
+    def __init__(self, fmt: str, account_id: UUID) -> None:
+        if fmt not in STATEMENT_FORMATS:
+            raise ValueError(f"Unsupported statement format: {fmt}")
+        self.fmt = fmt
+        self.account_id = account_id
+        self._header: Optional[List[str]] = None
+        # CSV: physical lines of a record whose quoted field spans a newline.
+        self._record: List[str] = []
+        self._seen: Counter = Counter()
+        self._rows = 0
+        # MT940: the open :61: entry, its description lines, and the tag being continued.
+        self._entry: Optional[Tuple[int, str]] = None
+        self._details: List[str] = []
+        self._tag: Optional[str] = None
+
+    @property
+    def expects_header(self) -> bool:
+        return self.fmt == "csv" and self._header is None
+
+    def feed(self, raw: str) -> Tuple[List[StatementLine], List[str]]:
+        raw = raw.rstrip("\r\n")
+        if self.fmt == "csv":
+            return self._feed_csv(raw)
+        return self._feed_mt940(raw)
+
+    def finish(self) -> Tuple[List[StatementLine], List[str]]:
+        if self.fmt == "mt940":
+            return self._close_entry()
+        if self._record:
+            self._record = []
+            self._rows += 1
+            return [], [f"Row {self._rows}: unterminated quoted field"]
+        return [], []
+
+    def _finalize(self, line: StatementLine) -> StatementLine:
+        key = (
+            f"{self.account_id}|{line.transaction_date.date().isoformat()}|{line.direction}|"
+            f"{line.amount:.2f}|{line.reference}|{line.description}"
+        )
+        self._seen[key] += 1
+        line.line_hash = hashlib.sha256(f"{key}|{self._seen[key]}".encode()).hexdigest()
+        return line
+
+    def _feed_csv(self, raw: str) -> Tuple[List[StatementLine], List[str]]:
+        if not raw.strip() and not self._record:
+            return [], []
+        self._record.append(raw)
+        # An odd number of quotes so far means a quoted field continues on the next line.
+        if sum(part.count('"') for part in self._record) % 2:
+            return [], []
+        record, self._record = self._record, []
+        values = next(csv.reader([f"{part}\n" for part in record]))
+        if self._header is None:
+            header = [value.strip().lower() for value in values]
+            missing = set(CSV_FIELDS) - set(header)
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            self._header = header
+            return [], []
+        self._rows += 1
+        row = dict(zip(self._header, values))
+        try:
+            amount = Decimal(row["amount"].strip())
+            transaction_date = _as_datetime(date.fromisoformat(row["date"].strip()[:10]))
+        except (InvalidOperation, ValueError, KeyError):
+            return [], [f"Row {self._rows}: invalid date or amount"]
+        if amount == 0:
+            return [], [f"Row {self._rows}: amount is zero"]
+        line = StatementLine(
+            transaction_date=transaction_date,
+            direction="IN" if amount > 0 else "OUT",
+            amount=abs(amount),
+            description=row["description"].strip()[:255],
+            reference=(row.get("reference") or "").strip(),
+        )
+        return [self._finalize(line)], []
+
+    def _feed_mt940(self, raw: str) -> Tuple[List[StatementLine], List[str]]:
+        line = raw.strip()
+        if not line:
+            return [], []
+        if not line.startswith(":"):
+            if line.startswith("-") or line.startswith("{"):
+                return self._close_entry()
+            # Continuation of the previous field.
+            if self._entry is not None and self._tag == "86":
+                self._details.append(line)
+            return [], []
+        tag, _, value = line[1:].partition(":")
+        if tag == "86":
+            self._tag = "86"
+            if self._entry is not None:
+                self._details.append(value)
+            return [], []
+        completed = self._close_entry()
+        self._tag = tag
+        if tag == "61":
+            self._rows += 1
+            self._entry = (self._rows, value)
+        return completed
+
+    def _close_entry(self) -> Tuple[List[StatementLine], List[str]]:
+        if self._entry is None:
+            return [], []
+        row, value = self._entry
+        details = " ".join(part.strip() for part in self._details)
+        self._entry, self._details, self._tag = None, [], None
+        match = _MT940_LINE.match(value)
+        if match is None:
+            return [], [f"Entry {row}: unrecognised :61: line"]
+        try:
+            value_date = datetime.strptime(match["date"], "%y%m%d").date()
+            amount = Decimal(match["amount"].replace(",", "."))
+        except (ValueError, InvalidOperation):
+            return [], [f"Entry {row}: invalid date or amount"]
+        # Reversals flip the direction of the entry they reverse.
+        direction = "IN" if match["mark"] in ("C", "RD") else "OUT"
+        reference = match["reference"].strip()
+        line = StatementLine(
+            transaction_date=_as_datetime(value_date),
+            direction=direction,
+            amount=amount,
+            description=(details or reference)[:255],
+            reference=reference,
+        )
+        return [self._finalize(line)], []
+
+
+def import_statement_batch(db: Session, account_id: UUID, lines: List[StatementLine]) -> Tuple[int, int]:
+    """Insert ``lines`` skipping known hashes and adjust the balance once; returns (imported, duplicates)."""
+    if not lines:
+        return 0, 0
+    transactions = FinancialTransaction.__table__
+    statement = (
+        pg_insert(transactions)
+        .values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "organization_id": DEFAULT_ORGANIZATION_ID,
+                    "account_id": account_id,
+                    "direction": line.direction,
+                    "amount": line.amount,
+                    "transaction_date": line.transaction_date,
+                    "description": line.description,
+                    "line_hash": line.line_hash,
+                }
+                for line in lines
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=[transactions.c.line_hash],
+            index_where=transactions.c.line_hash.isnot(None),
+        )
+        .returning(transactions.c.direction, transactions.c.amount, transactions.c.transaction_date)
+    )
+    inserted = db.execute(statement).all()
+    if inserted:
+        delta = sum((_signed(direction, amount) for direction, amount, _ in inserted), Decimal("0"))
+        _adjust_balances(db, {account_id: delta})
+        invalidate_snapshots(db, account_id, min(transaction_date for _, _, transaction_date in inserted))
+    db.commit()
+    return len(inserted), len(lines) - len(inserted)
+
+
+def account_exists(db: Session, account_id: UUID) -> bool:
+    return db.query(Account.id).filter(Account.id == account_id).first() is not None
@@ -0,0 +1,97 @@
+"""Per-process registry of production stations.
+
+Stations are seeded by migration ``0002`` and change rarely, so each worker
+keeps them in memory keyed by ``code``, ``id`` and ``order_index``. A trigger
+on ``production_stations`` sends a ``station_changed`` notification on every
+change; the registry then reloads lazily on its next lookup.
+"""
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db.notify import listener
+from app.models.production_station import ProductionStation
+
+STATION_CHANNEL = "station_changed"
+
+
+@dataclass(frozen=True)
+class Station:
+    id: UUID
+    code: str
+    name: str
+    order_index: int
+    capacity_per_hour: int
+
+
+class StationRegistry:
+    def __init__(self) -> None:
+        self._by_code: Dict[str, Station] = {}
+        self._by_id: Dict[UUID, Station] = {}
+        self._by_order_index: Dict[int, List[Station]] = {}
+        self._ordered: List[Station] = []
+        self._stale = True
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def load(self, db: Session) -> None:
+        generation = self._generation
+        rows = db.query(ProductionStation).order_by(ProductionStation.order_index, ProductionStation.code).all()
+        stations = [
+            Station(row.id, row.code, row.name, row.order_index, row.capacity_per_hour)
+            for row in rows
+        ]
+        with self._lock:
+            self._by_code = {station.code: station for station in stations}
+            self._by_id = {station.id: station for station in stations}
+            # order_index is not unique, so stations sharing one are all kept.
+            by_order_index: Dict[int, List[Station]] = defaultdict(list)
+            for station in stations:
+                by_order_index[station.order_index].append(station)
+            self._by_order_index = dict(by_order_index)
+            self._ordered = stations
+            # A change notified while the rows were read leaves the registry stale.
+            self._stale = generation != self._generation
+            self.loads += 1
+
+    def invalidate(self, _payload: str = "") -> None:
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._stale:
+            self.load(db)
+
+    def by_code(self, db: Session, code: str) -> Optional[Station]:
+        self._ensure_loaded(db)
+        return self._by_code.get(code)
+
+    def by_id(self, db: Session, station_id: UUID) -> Optional[Station]:
+        self._ensure_loaded(db)
+        return self._by_id.get(station_id)
+
+    def by_order_index(self, db: Session, order_index: int) -> List[Station]:
+        """Stations at ``order_index``, by code."""
+        self._ensure_loaded(db)
+        return list(self._by_order_index.get(order_index, ()))
+
+    def all(self, db: Session) -> List[Station]:
+        """Stations in production order, ties by code."""
+        self._ensure_loaded(db)
+        return list(self._ordered)
+
+    def stats(self) -> Dict[str, object]:
+        return {"stations": len(self._by_code), "loads": self.loads, "stale": self._stale}
+
+
+station_registry = StationRegistry()
+listener.subscribe(STATION_CHANNEL, station_registry.invalidate, on_reset=station_registry.invalidate)
+metrics.register("station_registry", station_registry.stats)
@@ -1,27 +1,103 @@
 """Service layer for user operations."""
 
 import uuid
+from dataclasses import dataclass
 from typing import Optional
+from uuid import UUID
 
-from passlib.hash import bcrypt
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.passwords import password_hasher
+from app.db.notify import listener
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 DEFAULT_ORGANIZATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 DEFAULT_ROLE_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+USER_CHANNEL = "user_changed"
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as of loading, safe to share between requests."""
+
+    id: UUID
+    organization_id: UUID
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    role_id: UUID
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            organization_id=user.organization_id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role_id=user.role_id,
+            is_active=user.is_active,
+        )
+
+
+# Authenticated users by id. Entries are dropped when the row changes, through
+# the user_changed notification, and expire after a short TTL otherwise.
+principal_cache = TTLCache(
+    "principals",
+    max_entries=settings.principal_cache_max_entries,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    principal_cache.invalidate(user_id)
+
+
+def _on_user_changed(payload: str) -> None:
+    invalidate_principal(UUID(payload))
+
+
+listener.subscribe(USER_CHANNEL, _on_user_changed, on_reset=principal_cache.clear)
+metrics.register("principal_cache", principal_cache.stats)
+
+
+def cached_principal(user_id: UUID) -> Optional[Principal]:
+    return principal_cache.get(user_id)
+
+
+def load_principal(db: Session, user_id: UUID) -> Optional[Principal]:
+    """Read the user and cache it; ``None`` if there is no such user."""
+    generation = principal_cache.generation
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal, generation)
+    return principal
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user_in: UserCreate) -> User:
+async def create_user(db: Session, user_in: UserCreate) -> User:
+    hashed_password = await password_hasher.hash(user_in.password)
+    return await run_in_threadpool(_insert_user, db, user_in, hashed_password)
+
+
+def _insert_user(db: Session, user_in: UserCreate, hashed_password: str) -> User:
     user = User(
         organization_id=DEFAULT_ORGANIZATION_ID,
         email=user_in.email,
-        hashed_password=bcrypt.hash(user_in.password),
+        hashed_password=hashed_password,
         first_name=user_in.first_name,
         last_name=user_in.last_name,
         role_id=DEFAULT_ROLE_ID,
@@ -33,10 +109,21 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+def _update_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """The user if ``password`` matches; hashes made with other rounds are redone on the way."""
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return None
-    if not bcrypt.verify(password, user.hashed_password):
+    valid, needs_rehash = await password_hasher.verify(password, user.hashed_password)
+    if not valid:
         return None
+    if needs_rehash:
+        hashed_password = await password_hasher.hash(password)
+        await run_in_threadpool(_update_password_hash, db, user, hashed_password)
     return user
@@ -0,0 +1,42 @@
+"""Take and verify account balance snapshots.
+
+Run daily from cron, and ``rebuild`` once after migration ``0010``::
+
+    python -m app.workers.balance_snapshots take
+    python -m app.workers.balance_snapshots verify
+    python -m app.workers.balance_snapshots rebuild
+"""
+
+import argparse
+import json
+
+from app.db.session import SessionLocal
+from app.services.ledger_service import take_balance_snapshots, verify_balance_snapshots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain account balance snapshots.")
+    parser.add_argument(
+        "command",
+        choices=["take", "verify", "rebuild"],
+        help="take new snapshots, check them against the ledger, or check and replace wrong ones",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "take":
+            print(f"snapshots written: {take_balance_snapshots(db)}")
+        else:
+            report = verify_balance_snapshots(db, rebuild=args.command == "rebuild")
+            print(json.dumps(report, indent=2))
+            if args.command == "verify" and (
+                report["accounts_with_bad_snapshots"] or report["accounts_with_balance_drift"]
+            ):
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Purge expired idempotency keys.
+
+Run daily from cron::
+
+    python -m app.workers.idempotency_keys purge
+"""
+
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.idempotency_service import purge_expired_keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain idempotency keys.")
+    parser.add_argument("command", choices=["purge"], help="delete keys past their expiry")
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"keys purged: {purge_expired_keys(db)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Maintain the monthly partitions of ``production_logs``.
+
+Run from cron, e.g. daily::
+
+    python -m app.workers.log_partitions ensure --months-ahead 3
+    python -m app.workers.log_partitions archive --before 2025-01-01
+    python -m app.workers.log_partitions list
+"""
+
+import argparse
+from datetime import date
+
+from app.db.session import SessionLocal
+from app.services.log_partition_service import (
+    MONTHS_AHEAD,
+    archive_log_partitions,
+    ensure_log_partitions,
+    list_log_partitions,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain production_logs partitions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create partitions for this month and the next ones")
+    ensure.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="detach months ending on or before a date")
+    archive.add_argument("--before", type=date.fromisoformat, required=True)
+    archive.add_argument("--drop", action="store_true", help="drop instead of moving to the archive schema")
+    commands.add_parser("list", help="show attached month partitions")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "ensure":
+            created = ensure_log_partitions(db, args.months_ahead)
+            print("created: " + (", ".join(created) or "none"))
+        elif args.command == "archive":
+            archived = archive_log_partitions(db, args.before, args.drop)
+            print(("dropped: " if args.drop else "archived: ") + (", ".join(archived) or "none"))
+        else:
+            for partition in list_log_partitions(db):
+                print(f"{partition['name']}\t{partition['month']:%Y-%m}\t~{partition['estimated_rows']} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Outbox worker process.
+
+Run one or more alongside the API::
+
+    python -m app.workers.outbox_worker --batch-size 200
+
+Each worker claims events with ``FOR UPDATE SKIP LOCKED``, so they never
+process the same event twice, and backs off while the outbox is empty.
+"""
+
+import argparse
+import logging
+import signal
+import time
+
+from app.db.session import SessionLocal
+from app.services import production_service  # noqa: F401  # registers the job handler
+from app.services.outbox_service import OUTBOX_BATCH_SIZE, process_outbox_batch, stats
+
+logger = logging.getLogger("outbox_worker")
+
+
+def run(batch_size: int, idle_sleep: float, max_idle_sleep: float, report_every: float) -> None:
+    running = True
+
+    def _stop(*_args) -> None:
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    sleep = idle_sleep
+    last_report = time.monotonic()
+    while running:
+        db = SessionLocal()
+        try:
+            claimed = process_outbox_batch(db, batch_size)
+        except Exception:
+            logger.exception("Outbox batch failed")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+        if time.monotonic() - last_report >= report_every:
+            logger.info(
+                "processed=%d failed=%d batches=%d last_lag=%.2fs max_lag=%.2fs last_batch=%.3fs",
+                stats.processed,
+                stats.failed,
+                stats.batches,
+                stats.last_lag_seconds,
+                stats.max_lag_seconds,
+                stats.last_batch_seconds,
+            )
+            last_report = time.monotonic()
+        if claimed:
+            sleep = idle_sleep
+            continue
+        time.sleep(sleep)
+        sleep = min(sleep * 2, max_idle_sleep)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process transactional outbox events.")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    parser.add_argument("--idle-sleep", type=float, default=0.1)
+    parser.add_argument("--max-idle-sleep", type=float, default=2.0)
+    parser.add_argument("--report-every", type=float, default=30.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    run(args.batch_size, args.idle_sleep, args.max_idle_sleep, args.report_every)
+
+
+if __name__ == "__main__":
+    main()
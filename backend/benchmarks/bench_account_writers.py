@@ -0,0 +1,133 @@
+"""Concurrent writers on one account: throughput and balance correctness.
+
+Run from ``backend/`` against a development database::
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_account_writers --writers 50
+
+A scratch account receives ``--writes`` transactions from each writer, a
+mix of IN and OUT with some edits and deletes. The final balance must equal
+the sum of the surviving transactions. Everything is removed afterwards.
+"""
+
+import argparse
+import random
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy import case, create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.models.account import Account
+from app.models.financial_transaction import FinancialTransaction
+from app.schemas.financial import AccountCreate, FinancialTransactionCreate, FinancialTransactionUpdate
+from app.services.financial_service import (
+    create_account,
+    create_transaction,
+    delete_account,
+    delete_transaction,
+    update_transaction,
+)
+
+MARKER = "bench_account_writers"
+
+
+def writer(Session, seed, account_id, writes, latencies, errors, lock):
+    rng = random.Random(seed)
+    db = Session()
+    mine = []
+    local = []
+    try:
+        for _ in range(writes):
+            started = time.perf_counter()
+            roll = rng.random()
+            if mine and roll < 0.1:
+                update_transaction(
+                    db,
+                    rng.choice(mine),
+                    FinancialTransactionUpdate(amount=Decimal(rng.randint(1, 500)) / 4),
+                )
+            elif mine and roll < 0.15:
+                delete_transaction(db, mine.pop(rng.randrange(len(mine))))
+            else:
+                transaction = create_transaction(
+                    db,
+                    FinancialTransactionCreate(
+                        account_id=account_id,
+                        direction=rng.choice(["IN", "IN", "OUT"]),
+                        amount=Decimal(rng.randint(1, 100000)) / 100,
+                        description=MARKER,
+                    ),
+                )
+                mine.append(transaction.id)
+            local.append(time.perf_counter() - started)
+    except Exception as exc:  # pragma: no cover - reported below
+        errors.append(repr(exc))
+    finally:
+        db.close()
+    with lock:
+        latencies.extend(local)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=100, help="operations per writer")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(get_settings().database_url, pool_size=args.writers, max_overflow=0)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    db = Session()
+    account = create_account(db, AccountCreate(name=MARKER))
+    account_id = account.id
+    db.close()
+
+    latencies, errors, lock = [], [], threading.Lock()
+    threads = [
+        threading.Thread(target=writer, args=(Session, args.seed + n, account_id, args.writes, latencies, errors, lock))
+        for n in range(args.writers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    db = Session()
+    balance = db.query(Account.current_balance).filter(Account.id == account_id).scalar()
+    signed = func.sum(
+        case(
+            (FinancialTransaction.direction == "IN", FinancialTransaction.amount),
+            else_=-FinancialTransaction.amount,
+        )
+    )
+    expected = db.query(signed).filter(FinancialTransaction.account_id == account_id).scalar() or Decimal("0")
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    print(
+        f"{args.writers} writers, {len(latencies)} operations in {elapsed:.2f}s "
+        f"({len(latencies) / elapsed:.0f} ops/s, p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms), "
+        f"errors={len(errors)}"
+    )
+    for error in errors[:5]:
+        print("  ", error)
+    print(f"balance {balance} expected {expected}")
+
+    db.query(FinancialTransaction).filter(FinancialTransaction.account_id == account_id).delete()
+    db.commit()
+    delete_account(db, account_id)
+    db.close()
+
+    if Decimal(balance) != Decimal(expected):
+        raise SystemExit("Balance does not match the transactions")
+    print("balance matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark the cutting planner on realistic piece distributions.
+
+Needs no database; run from ``backend/``::
+
+    python -m benchmarks.bench_cut_plans --pieces 500 2000 5000
+"""
+
+import argparse
+import random
+import time
+
+from app.services.cutting_service import (
+    DEFAULT_SHEET_HEIGHT,
+    DEFAULT_SHEET_WIDTH,
+    pack_pieces,
+    plan_cache,
+    plan_sheets,
+)
+
+# Common insulated glass unit and window lite sizes in millimetres.
+WINDOW_SIZES = [(1200, 1500), (600, 1500), (900, 1200), (450, 600), (1000, 2100), (800, 1400)]
+
+
+def standard_windows(rng, count):
+    """Few distinct sizes in high quantities: a housing project."""
+    return [rng.choice(WINDOW_SIZES) for _ in range(count)]
+
+
+def mixed_dealer_book(rng, count):
+    """Mostly window sizes with made-to-measure pieces mixed in."""
+    sizes = []
+    for _ in range(count):
+        if rng.random() < 0.6:
+            sizes.append(rng.choice(WINDOW_SIZES))
+        else:
+            sizes.append((rng.randrange(300, 2400, 10), rng.randrange(300, 2000, 10)))
+    return sizes
+
+
+def facade_panels(rng, count):
+    """Large facade panels with small infill lites."""
+    sizes = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            sizes.append((rng.randrange(2000, 3200, 50), rng.randrange(1500, 3000, 50)))
+        else:
+            sizes.append((rng.randrange(200, 900, 10), rng.randrange(200, 900, 10)))
+    return sizes
+
+
+def uniform_random(rng, count):
+    return [(rng.randint(150, 3000), rng.randint(150, 2500)) for _ in range(count)]
+
+
+DISTRIBUTIONS = {
+    "standard_windows": standard_windows,
+    "mixed_dealer_book": mixed_dealer_book,
+    "facade_panels": facade_panels,
+    "uniform_random": uniform_random,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pieces", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--kerf", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sheet_area = DEFAULT_SHEET_WIDTH * DEFAULT_SHEET_HEIGHT
+    print(f"{'distribution':<20}{'pieces':>8}{'sheets':>8}{'lower':>7}{'waste %':>9}{'seconds':>9}")
+    for name, generate in DISTRIBUTIONS.items():
+        for count in args.pieces:
+            sizes = generate(random.Random(args.seed), count)
+            started = time.perf_counter()
+            result = pack_pieces(sizes, kerf=args.kerf)
+            elapsed = time.perf_counter() - started
+            used = sum(result.used_area)
+            lower_bound = -(-sum(w * h for w, h in sizes) // sheet_area)
+            waste = 100 * (1 - used / (result.sheet_count * sheet_area))
+            print(f"{name:<20}{count:>8}{result.sheet_count:>8}{lower_bound:>7}{waste:>9.2f}{elapsed:>9.3f}")
+
+    sizes = mixed_dealer_book(random.Random(args.seed), max(args.pieces))
+    plan_sheets(sizes, kerf=args.kerf)
+    started = time.perf_counter()
+    plan_sheets(list(reversed(sizes)), kerf=args.kerf)
+    print(f"memoized re-plan of {len(sizes)} pieces: {time.perf_counter() - started:.4f}s {plan_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare the per-item order path with the bulk import path.
+
+Run from ``backend/`` against a scratch database (rows are left behind)::
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_order_import --orders 200 --lines 20
+"""
+
+import argparse
+import time
+import uuid
+from decimal import Decimal
+
+from app.db.session import SessionLocal
+from app.schemas.order import OrderCreate
+from app.schemas.order_item import OrderItemCreate
+from app.schemas.partner import PartnerCreate
+from app.schemas.product import ProductCreate
+from app.services.order_import_service import OrderBatcher, import_order_batch
+from app.services.order_service import create_order
+from app.services.partner_service import create_partner
+from app.services.product_service import create_product
+
+
+def _lines(partner_id, product_ids, orders, lines):
+    for order_no in range(orders):
+        for line_no in range(lines):
+            yield {
+                "order_ref": f"bench-{order_no}",
+                "partner_id": str(partner_id),
+                "status": "SIPARIS",
+                "product_id": str(product_ids[line_no % len(product_ids)]),
+                "width": 400 + line_no * 10,
+                "height": 600 + line_no * 5,
+                "quantity": 1 + line_no % 4,
+            }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        suffix = uuid.uuid4().hex[:8]
+        partner = create_partner(
+            db, PartnerCreate(type="CUSTOMER", name=f"Bench {suffix}", email=f"bench-{suffix}@example.com")
+        )
+        product_ids = [
+            create_product(db, ProductCreate(name=f"Bench glass {n}", base_price_sqm=Decimal("125.50"))).id
+            for n in range(5)
+        ]
+        rows = list(_lines(partner.id, product_ids, args.orders, args.lines))
+
+        started = time.perf_counter()
+        for order_no in range(args.orders):
+            order_rows = rows[order_no * args.lines:(order_no + 1) * args.lines]
+            create_order(
+                db,
+                OrderCreate(
+                    partner_id=partner.id,
+                    status="SIPARIS",
+                    order_items=[OrderItemCreate(**row) for row in order_rows],
+                ),
+            )
+        per_item = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batcher = OrderBatcher()
+        imported = 0
+        for row in rows:
+            batch = batcher.add(row)
+            if batch:
+                imported += sum(r.success for r in import_order_batch(db, batch))
+        imported += sum(r.success for r in import_order_batch(db, batcher.flush()))
+        bulk = time.perf_counter() - started
+    finally:
+        db.close()
+
+    total = args.orders * args.lines
+    print(f"{args.orders} orders x {args.lines} lines ({total} items)")
+    print(f"per-item create_order : {per_item:8.3f}s  {total / per_item:10.0f} items/s")
+    print(f"bulk import           : {bulk:8.3f}s  {total / bulk:10.0f} items/s  ({imported} orders ok)")
+    print(f"speed-up              : {per_item / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
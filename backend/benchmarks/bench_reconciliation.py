@@ -0,0 +1,82 @@
+"""Benchmark the in-memory payment reconciliation.
+
+Needs no database; run from ``backend/``::
+
+    python -m benchmarks.bench_reconciliation --items 10000 100000
+
+Each size builds that many open orders and that many payments: exact
+amounts, several orders paid at once, partial payments, payments quoting the
+order id, partner-less payments and some that match nothing.
+"""
+
+import argparse
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.services.reconciliation_service import OpenOrder, OpenPayment, reconcile
+
+
+def synthetic_items(rng, count):
+    now = datetime.now(timezone.utc)
+    partners = [uuid.uuid4() for _ in range(max(count // 20, 1))]
+    orders = [
+        OpenOrder(
+            uuid.uuid4(),
+            rng.choice(partners),
+            rng.randint(1000, 500000),
+            now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        )
+        for _ in range(count)
+    ]
+    by_partner = {}
+    for order in sorted(orders, key=lambda order: order.created_at):
+        by_partner.setdefault(order.partner_id, []).append(order)
+    payments = []
+    for n in range(count):
+        order = rng.choice(orders)
+        roll = rng.random()
+        partner = order.partner_id
+        description = ""
+        if roll < 0.4:
+            amount = order.due
+        elif roll < 0.55:
+            amount = sum(other.due for other in by_partner[partner][:3])
+        elif roll < 0.7:
+            amount = rng.randint(100, order.due)
+        elif roll < 0.8:
+            amount, description = order.due, f"Payment for order {order.id}"
+        elif roll < 0.9:
+            amount, partner = order.due, None
+        else:
+            amount = rng.randint(100, 1000000)
+        payments.append(
+            OpenPayment(uuid.uuid4(), partner, amount, now - timedelta(minutes=n), description)
+        )
+    return payments, orders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for count in args.items:
+        rng = random.Random(args.seed)
+        payments, orders = synthetic_items(rng, count)
+        started = time.perf_counter()
+        proposals = reconcile(payments, orders)
+        elapsed = time.perf_counter() - started
+        matched = len({proposal.transaction_id for proposal in proposals})
+        rules = Counter(proposal.rule for proposal in proposals)
+        print(
+            f"{count} orders x {count} payments: {elapsed:.2f}s, "
+            f"{matched} payments matched with {len(proposals)} allocations {dict(rules)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the in-memory production schedule.
+
+Needs no database; run from ``backend/``::
+
+    python -m benchmarks.bench_schedule --jobs 10000 50000 --updates 1000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services.scheduling_service import ProductionScheduler
+from app.services.station_registry import Station
+
+STATIONS = [
+    Station(uuid.uuid4(), "CAM_KESIM", "Cam Kesim", 1, 120),
+    Station(uuid.uuid4(), "RODAJ", "Rodaj", 2, 80),
+    Station(uuid.uuid4(), "TEMPER", "Temper", 3, 60),
+    Station(uuid.uuid4(), "PRES", "Pres", 4, 90),
+]
+
+
+def synthetic_rows(rng, count):
+    now = datetime.now(timezone.utc)
+    jobs, progress = [], []
+    for _ in range(count):
+        job_id = uuid.uuid4()
+        required = rng.randint(1, 200)
+        due = now + timedelta(hours=rng.randint(-48, 24 * 30)) if rng.random() < 0.7 else None
+        created = now - timedelta(hours=rng.randint(0, 24 * 14))
+        jobs.append((job_id, required, due, created, rng.choice([0, 0, 0, 1, 2])))
+        done = required
+        for station in STATIONS:
+            done = rng.randint(0, done) if rng.random() < 0.5 else 0
+            if done:
+                progress.append((job_id, station.id, done))
+    return jobs, progress
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for count in args.jobs:
+        rng = random.Random(args.seed)
+        jobs, progress = synthetic_rows(rng, count)
+        scheduler = ProductionScheduler()
+
+        started = time.perf_counter()
+        scheduler.load_rows(STATIONS, jobs, progress)
+        load_seconds = time.perf_counter() - started
+
+        # Incremental refresh: a log lands on a random job, as the notification would report it.
+        changed = rng.sample(jobs, min(args.updates, len(jobs)))
+        started = time.perf_counter()
+        for row in changed:
+            station = rng.choice(STATIONS)
+            scheduler.apply_rows([row[0]], [row], [(row[0], station.id, rng.randint(0, row[1]))])
+        update_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        plans = scheduler.plan(limit=100)
+        plan_seconds = time.perf_counter() - started
+
+        queued = sum(plan["queued_jobs"] for plan in plans)
+        print(
+            f"jobs={count} queued={queued} load={load_seconds:.3f}s "
+            f"updates={len(changed)} in {update_seconds:.3f}s "
+            f"({1e6 * update_seconds / max(len(changed), 1):.0f}us each) plan={plan_seconds * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
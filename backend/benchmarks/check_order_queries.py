@@ -0,0 +1,62 @@
+"""Assert that the order endpoints run a constant number of queries.
+
+Run from ``backend/`` against a database holding at least a few hundred
+orders (``bench_order_import`` creates them)::
+
+    DATABASE_URL=postgresql://... python -m benchmarks.check_order_queries
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, engine
+from app.schemas.order import OrderPublic
+from app.services.order_service import get_order, get_orders
+
+
+@contextmanager
+def count_queries():
+    counter = {"queries": 0}
+
+    def _count(*_args, **_kwargs):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
+def _serialize(orders):
+    # Serialise like the endpoint does so lazy loads would be counted too.
+    return [OrderPublic.from_orm(order) for order in orders]
+
+
+def main() -> None:
+    counts = {}
+    for page_size in (1, 10, 100):
+        db = SessionLocal()
+        try:
+            with count_queries() as counter:
+                orders = get_orders(db, page=1, page_size=page_size)
+                _serialize(orders)
+            counts[page_size] = (len(orders), counter["queries"])
+            if orders:
+                with count_queries() as counter:
+                    _serialize([get_order(db, orders[0].id)])
+                counts[f"detail/{page_size}"] = (1, counter["queries"])
+        finally:
+            db.close()
+
+    for key, (rows, queries) in counts.items():
+        print(f"{key!s:>12}: {rows:4d} orders, {queries} queries")
+    list_counts = {queries for key, (_, queries) in counts.items() if isinstance(key, int)}
+    assert len(list_counts) == 1, f"list query count depends on page size: {counts}"
+    assert max(queries for _, queries in counts.values()) <= 2, f"expected at most 2 queries: {counts}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Shift-change login storm against a running server.
+
+Start the API, then from ``backend/``::
+
+    python -m benchmarks.login_storm --base-url http://localhost:8000 --users 200 --register
+    python -m benchmarks.login_storm --base-url http://localhost:8000 --users 200 --concurrency 100
+
+Every user logs in once, ``--concurrency`` at a time, while a probe keeps
+calling a cheap endpoint to show whether the rest of the API stalls. Logins
+refused with 503 are retried after ``Retry-After``, as a client would. The
+server's ``password_hashing`` metrics are printed at the end.
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+EMAIL = "storm{:05d}@example.com"
+PASSWORD = "login-storm-password"
+
+
+def post(url, body):
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, dict(response.headers)
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers)
+
+
+def login(base_url, n):
+    started = time.perf_counter()
+    refused = 0
+    while True:
+        code, headers = post(f"{base_url}/api/auth/login", {"email": EMAIL.format(n), "password": PASSWORD})
+        if code != 503:
+            return code, time.perf_counter() - started, refused
+        refused += 1
+        time.sleep(float(headers.get("Retry-After", "1")))
+
+
+def probe(base_url, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/api/metrics/", timeout=60) as response:
+            response.read()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.05)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000 if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--register", action="store_true", help="create the storm users first")
+    args = parser.parse_args()
+
+    if args.register:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(
+                pool.map(
+                    lambda n: post(f"{args.base_url}/api/auth/register", {"email": EMAIL.format(n), "password": PASSWORD})[0],
+                    range(args.users),
+                )
+            )
+        print(f"registered {codes.count(200)}, already present {codes.count(400)}")
+        return
+
+    stop, probe_latencies = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(args.base_url, stop, probe_latencies))
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda n: login(args.base_url, n), range(args.users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+
+    login_latencies = [latency for _, latency, _ in results]
+    failed = sum(1 for code, _, _ in results if code != 200)
+    refused = sum(refusals for _, _, refusals in results)
+    print(
+        f"{args.users} logins in {elapsed:.2f}s ({args.users / elapsed:.1f}/s), failed={failed}, 503 retries={refused}"
+    )
+    print(f"login  p50 {percentile(login_latencies, 0.5):.0f}ms  p99 {percentile(login_latencies, 0.99):.0f}ms")
+    print(
+        f"probe  p50 {percentile(probe_latencies, 0.5):.0f}ms  p99 {percentile(probe_latencies, 0.99):.0f}ms "
+        f"({len(probe_latencies)} calls)"
+    )
+    with urllib.request.urlopen(f"{args.base_url}/api/metrics/", timeout=60) as response:
+        print(json.dumps(json.load(response).get("password_hashing"), indent=2))
+
+
+if __name__ == "__main__":
+    main()
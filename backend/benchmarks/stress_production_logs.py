@@ -0,0 +1,193 @@
+"""Stress concurrent scans against a few jobs and check no increment is lost.
+
+Run from ``backend/`` against a database that has production jobs, stations
+and at least one user::
+
+    DATABASE_URL=postgresql://... python -m benchmarks.stress_production_logs --workers 16
+
+Workers mix single scans and batches over the same jobs. At the end every
+job's ``quantity_produced`` must have grown by exactly the quantity logged
+for it, and by the sum of its new log rows. Unless ``--keep`` is given, the
+run is undone afterwards: its logs are deleted and taken back out of the
+per-station counters and the hourly and daily rollups, and the jobs get their
+old quantity and status back (the dashboard's job counters follow through
+their trigger). Rollup first/last completion times stay widened, and rollup
+rows left with no logs are deleted.
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import and_, delete, func, select, update
+
+from app.db.session import SessionLocal
+from app.models.production_job import ProductionJob
+from app.models.production_job_station import ProductionJobStation
+from app.models.production_log import ProductionLog
+from app.models.production_rollup import ProductionRollupDaily, ProductionRollupHourly
+from app.models.production_station import ProductionStation
+from app.models.user import User
+from app.schemas.production import ProductionLogBatchItem, ProductionLogCreate
+from app.services.production_service import log_production_batch, log_production_step
+
+
+def worker(seed, job_ids, station_ids, user_id, iterations, batch_size, sent, errors, lock):
+    rng = random.Random(seed)
+    db = SessionLocal()
+    local = Counter()
+    try:
+        for _ in range(iterations):
+            if rng.random() < 0.3:
+                job_id = rng.choice(job_ids)
+                quantity = rng.randint(1, 5)
+                log_in = ProductionLogCreate(
+                    station_id=rng.choice(station_ids), user_id=user_id, quantity=quantity
+                )
+                log_production_step(db, job_id, log_in)
+                local[job_id] += quantity
+            else:
+                logs = [
+                    ProductionLogBatchItem(
+                        job_id=rng.choice(job_ids),
+                        station_id=rng.choice(station_ids),
+                        user_id=user_id,
+                        quantity=rng.randint(1, 5),
+                    )
+                    for _ in range(batch_size)
+                ]
+                log_production_batch(db, logs)
+                for log_in in logs:
+                    local[log_in.job_id] += log_in.quantity
+    except Exception as exc:  # pragma: no cover - reported below
+        errors.append(repr(exc))
+    finally:
+        db.close()
+    with lock:
+        sent.update(local)
+
+
+def revert(db, jobs, started_at) -> None:
+    """Undo the run: every write ``log_production_*`` made for its logs."""
+    job_ids = [job.id for job in jobs]
+    run_logs = and_(ProductionLog.job_id.in_(job_ids), ProductionLog.created_at >= started_at)
+    per_station = (
+        select(
+            ProductionLog.job_id,
+            ProductionLog.station_id,
+            func.sum(ProductionLog.quantity).label("quantity"),
+        )
+        .where(run_logs)
+        .group_by(ProductionLog.job_id, ProductionLog.station_id)
+        .subquery()
+    )
+    db.execute(
+        update(ProductionJobStation)
+        .where(
+            ProductionJobStation.job_id == per_station.c.job_id,
+            ProductionJobStation.station_id == per_station.c.station_id,
+        )
+        .values(quantity_produced=ProductionJobStation.quantity_produced - per_station.c.quantity)
+    )
+    for unit, model in (("hour", ProductionRollupHourly), ("day", ProductionRollupDaily)):
+        bucket = func.date_trunc(unit, ProductionLog.completed_at)
+        per_bucket = (
+            select(
+                bucket.label("bucket_start"),
+                ProductionLog.station_id,
+                ProductionLog.user_id,
+                func.sum(ProductionLog.quantity).label("quantity"),
+                func.count().label("log_count"),
+            )
+            .where(run_logs)
+            .group_by(bucket, ProductionLog.station_id, ProductionLog.user_id)
+            .subquery()
+        )
+        db.execute(
+            update(model)
+            .where(
+                model.bucket_start == per_bucket.c.bucket_start,
+                model.station_id == per_bucket.c.station_id,
+                model.user_id == per_bucket.c.user_id,
+            )
+            .values(
+                quantity=model.quantity - per_bucket.c.quantity,
+                log_count=model.log_count - per_bucket.c.log_count,
+            )
+        )
+        db.execute(delete(model).where(model.log_count <= 0))
+    db.execute(delete(ProductionLog).where(run_logs))
+    for job in jobs:
+        db.execute(
+            update(ProductionJob)
+            .where(ProductionJob.id == job.id)
+            .values(quantity_produced=job.quantity_produced, status=job.status)
+        )
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=5, help="number of jobs to contend on")
+    parser.add_argument("--keep", action="store_true", help="keep the generated logs and counters")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    jobs = db.query(ProductionJob.id, ProductionJob.quantity_produced, ProductionJob.status).limit(args.jobs).all()
+    station_ids = [station_id for (station_id,) in db.query(ProductionStation.id)]
+    user_id = db.query(User.id).limit(1).scalar()
+    if not jobs or not station_ids or user_id is None:
+        raise SystemExit("Need at least one production job, station and user")
+    job_ids = [job.id for job in jobs]
+    before = {job.id: job.quantity_produced for job in jobs}
+    started_at = db.query(func.now()).scalar()
+    db.close()
+
+    sent, errors, lock = Counter(), [], threading.Lock()
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(seed, job_ids, station_ids, user_id, args.iterations, args.batch_size, sent, errors, lock),
+        )
+        for seed in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    after = dict(db.query(ProductionJob.id, ProductionJob.quantity_produced).filter(ProductionJob.id.in_(job_ids)))
+    logged = dict(
+        db.query(ProductionLog.job_id, func.sum(ProductionLog.quantity))
+        .filter(ProductionLog.job_id.in_(job_ids), ProductionLog.created_at >= started_at)
+        .group_by(ProductionLog.job_id)
+    )
+    lost = {
+        job_id: sent[job_id] - (after[job_id] - before[job_id])
+        for job_id in job_ids
+        if after[job_id] - before[job_id] != sent[job_id] or logged.get(job_id, 0) != sent[job_id]
+    }
+    scans = sum(sent.values())
+    print(f"{args.workers} workers, {scans} pieces over {len(job_ids)} jobs in {elapsed:.2f}s, errors={len(errors)}")
+    for error in errors[:5]:
+        print("  ", error)
+
+    if not args.keep:
+        revert(db, jobs, started_at)
+    db.close()
+
+    if lost:
+        raise SystemExit(f"Lost increments: {lost}")
+    print("no lost increments")
+
+
+if __name__ == "__main__":
+    main()